@@ -1,12 +1,19 @@
 from json import JSONDecodeError
+from typing import Optional
 
 from fastapi import APIRouter, Depends, Form, HTTPException, Request
 from pydantic import ValidationError
-from starlette.responses import JSONResponse, RedirectResponse, Response
+from starlette.responses import (
+    JSONResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
 from starlette.templating import Jinja2Templates
 
 from backend.app import dependencies
 from backend.app.services import Services
+from storage.models.abstract import UpdateResult
 
 router = APIRouter(prefix="/admin")
 INTERFACE_TAG = "Admin Interface"
@@ -100,6 +107,33 @@ async def get_revision_info(
     return JSONResponse(content=response_content)
 
 
+@router.get("/revision/history", tags=[API_TAG], response_class=JSONResponse)
+async def get_revision_history(
+    request: Request,
+    limit: Optional[int] = None,
+    services: Services = Depends(dependencies.services),
+) -> JSONResponse:
+    require_admin_session(request)
+
+    if limit is not None and limit < 0:
+        raise HTTPException(status_code=400, detail="'limit' must not be negative.")
+    entries = await services.storage.get_revision_history(limit)
+    response_content = {"revisions": [entry.to_json() for entry in entries]}
+    return JSONResponse(content=response_content)
+
+
+@router.get("/lookups", tags=[API_TAG], response_class=JSONResponse)
+async def get_lookup_statistics(
+    request: Request,
+    services: Services = Depends(dependencies.services),
+) -> JSONResponse:
+    require_admin_session(request)
+
+    response_content = services.storage.lookup_statistics.to_json()
+    response_content["admission"] = services.range_admission.to_json()
+    return JSONResponse(content=response_content)
+
+
 @router.post("/revision/start", tags=[API_TAG], response_class=JSONResponse)
 async def request_storage_update(
     request: Request,
@@ -111,6 +145,34 @@ async def request_storage_update(
     return JSONResponse(content=response_content)
 
 
+@router.post("/revision/refresh", tags=[API_TAG], response_class=JSONResponse)
+async def refresh_storage_range(
+    request: Request,
+    services: Services = Depends(dependencies.services),
+) -> JSONResponse:
+    require_admin_session(request)
+
+    try:
+        body_json = await request.json()
+    except (ValidationError, JSONDecodeError):
+        raise HTTPException(
+            status_code=400, detail="Invalid body format: JSON is expected."
+        )
+    for field in ["first_prefix", "last_prefix"]:
+        if field not in body_json:
+            raise HTTPException(
+                status_code=400, detail=f"'{field}' field is required in the JSON body."
+            )
+    try:
+        result = await services.storage.refresh(
+            body_json["first_prefix"], body_json["last_prefix"]
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    response_content = {"result": result.value}
+    return JSONResponse(content=response_content)
+
+
 @router.post("/revision/pause", tags=[API_TAG], response_class=JSONResponse)
 async def request_storage_update_pause(
     request: Request,
@@ -133,3 +195,86 @@ async def request_storage_update_cancellation(
         "response": services.storage.request_update_cancellation().value
     }
     return JSONResponse(content=response_content)
+
+
+@router.get("/generations", tags=[API_TAG], response_class=JSONResponse)
+async def get_generations(
+    request: Request,
+    services: Services = Depends(dependencies.services),
+) -> JSONResponse:
+    require_admin_session(request)
+
+    response_content = {
+        "active": services.storage.active_generation,
+        "retained": services.storage.retained_generations,
+    }
+    return JSONResponse(content=response_content)
+
+
+@router.post("/generations/rollback", tags=[API_TAG], response_class=JSONResponse)
+async def rollback_storage(
+    request: Request,
+    services: Services = Depends(dependencies.services),
+) -> JSONResponse:
+    require_admin_session(request)
+
+    try:
+        body_json = await request.json()
+    except (ValidationError, JSONDecodeError):
+        raise HTTPException(
+            status_code=400, detail="Invalid body format: JSON is expected."
+        )
+    if "generation" not in body_json:
+        raise HTTPException(
+            status_code=400, detail="'generation' field is required in the JSON body."
+        )
+    generation = body_json["generation"]
+    if not isinstance(generation, int) or isinstance(generation, bool):
+        raise HTTPException(
+            status_code=400, detail="'generation' field must be an integer."
+        )
+    response_content = {"result": (await services.storage.rollback(generation)).value}
+    return JSONResponse(content=response_content)
+
+
+@router.get("/replication/manifest", tags=[API_TAG], response_class=JSONResponse)
+async def get_replication_manifest(
+    request: Request,
+    services: Services = Depends(dependencies.services),
+) -> JSONResponse:
+    require_admin_session(request)
+
+    manifest = await services.storage.get_manifest()
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="There is no active dataset.")
+    return JSONResponse(content=manifest.to_json())
+
+
+@router.get("/replication/files/{name}", tags=[API_TAG])
+async def get_replication_file(
+    name: str,
+    generation: int,
+    request: Request,
+    services: Services = Depends(dependencies.services),
+) -> StreamingResponse:
+    require_admin_session(request)
+
+    try:
+        content = services.storage.stream_dataset_file(name, generation)
+    except ValueError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    return StreamingResponse(content, media_type="application/octet-stream")
+
+
+@router.post("/replication/pull", tags=[API_TAG], response_class=JSONResponse)
+async def replicate_storage(
+    request: Request,
+    services: Services = Depends(dependencies.services),
+) -> JSONResponse:
+    require_admin_session(request)
+
+    result = await services.storage.replicate()
+    response_content = {"result": result.value}
+    if result == UpdateResult.FAILED:
+        response_content["error_message"] = services.storage.replication_error_message
+    return JSONResponse(content=response_content)
@@ -1,3 +1,5 @@
+import logging
+import time
 from json import JSONDecodeError
 
 from fastapi import APIRouter, Depends, HTTPException, Request
@@ -7,9 +9,17 @@ from starlette.templating import Jinja2Templates
 
 from backend.app import dependencies
 from backend.app.services import Services
+from backend.services.admission_controller import OverloadError
+from backend.services.shard_router import ShardRouter
+from storage.models.abstract import PrefixNotOwnedError
+from storage.models.lookup import LookupTrace
 
 router = APIRouter()
 
+SERVER_TIMING_HEADER: str = "Server-Timing"
+
+logger = logging.getLogger(__name__)
+
 
 @router.get("/", tags=["Client interface"], response_class=HTMLResponse)
 async def get_main_page(
@@ -20,13 +30,49 @@ async def get_main_page(
 
 @router.get("/range/{prefix}", tags=["Client API"], response_class=PlainTextResponse)
 async def get_range(
-    prefix: str, services: Services = Depends(dependencies.services)
+    prefix: str, request: Request, services: Services = Depends(dependencies.services)
 ) -> PlainTextResponse:
+    start_time = time.perf_counter()
+    trace = LookupTrace() if services.is_server_timing_enabled else None
     try:
-        records = await services.storage.get_range(prefix)
-        return PlainTextResponse(records, status_code=200)
+        async with services.range_admission.admit():
+            if trace is None:
+                records = await services.storage.get_range(prefix)
+            else:
+                with trace.activate():
+                    records = await services.storage.get_range(prefix)
+        if trace is None:
+            return PlainTextResponse(records, status_code=200)
+        server_timing = trace.to_server_timing(time.perf_counter() - start_time)
+        return PlainTextResponse(
+            records, status_code=200, headers={SERVER_TIMING_HEADER: server_timing}
+        )
+    except PrefixNotOwnedError as error:
+        if ShardRouter.FORWARDED_HEADER in request.headers:
+            return PlainTextResponse(str(error), status_code=421)
+        try:
+            status_code, content, headers = (
+                await services.shard_router.forward_range_request(
+                    error.shard_index, error.hash_prefix
+                )
+            )
+        except Exception:
+            logger.exception(
+                f"Failed to forward a range request to shard {error.shard_index}."
+            )
+            return PlainTextResponse(
+                f"The node of shard {error.shard_index} is unavailable.",
+                status_code=502,
+            )
+        return PlainTextResponse(content, status_code=status_code, headers=headers)
     except ValueError as error:
         return PlainTextResponse(str(error), status_code=400)
+    except OverloadError as error:
+        return PlainTextResponse(
+            str(error),
+            status_code=503,
+            headers={"Retry-After": str(error.retry_after)},
+        )
 
 
 @router.post("/strength", tags=["Client API"], response_class=JSONResponse)
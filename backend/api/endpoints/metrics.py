@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+from starlette.responses import PlainTextResponse
+
+from backend.app import dependencies
+from backend.app.services import Services
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", tags=["Monitoring API"], response_class=PlainTextResponse)
+async def get_metrics(
+    services: Services = Depends(dependencies.services),
+) -> PlainTextResponse:
+    metrics = services.storage.metrics + services.range_admission.metrics
+    return PlainTextResponse(
+        "".join(metric.to_prometheus() for metric in metrics),
+        media_type=PROMETHEUS_CONTENT_TYPE,
+    )
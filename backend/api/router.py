@@ -1,8 +1,9 @@
 from fastapi import APIRouter
 
-from backend.api.endpoints import admin, client, docs
+from backend.api.endpoints import admin, client, docs, metrics
 
 router = APIRouter()
 router.include_router(docs.router)
 router.include_router(client.router)
 router.include_router(admin.router)
+router.include_router(metrics.router)
@@ -1,3 +1,6 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import Depends, FastAPI
 from starlette.middleware.httpsredirect import HTTPSRedirectMiddleware
 from starlette.staticfiles import StaticFiles
@@ -7,12 +10,22 @@ from backend.app.dependencies import services
 from backend.app.environment import EnvVar
 
 
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """
+    Release the resources of the services when the application shuts down.
+    :param _: The application.
+    """
+    yield
+    await services().close()
+
+
 def create_app() -> FastAPI:
     """
     Create a FastAPI application.
     :return: An application.
     """
-    app = FastAPI(openapi_url=None, docs_url=None, redoc_url=None)
+    app = FastAPI(openapi_url=None, docs_url=None, redoc_url=None, lifespan=lifespan)
     if EnvVar.App.HTTPS_ONLY.get():
         app.add_middleware(HTTPSRedirectMiddleware)
     app.include_router(router, dependencies=[Depends(services)])
@@ -136,6 +136,21 @@ class EnvVar:
         HTTPS_ONLY: BoolEnvVar = BoolEnvVar("HTTPS_ONLY")
         """Whether to forbid all unsecured connections"""
 
+        RANGE_CONCURRENCY: IntEnvVar = IntEnvVar("RANGE_CONCURRENCY")
+        """Maximum number of concurrently handled range requests (0 for no limit)"""
+
+        RANGE_QUEUE_SIZE: IntEnvVar = IntEnvVar("RANGE_QUEUE_SIZE")
+        """Maximum number of range requests waiting to be handled"""
+
+        SHARD_NODES: StrEnvVar = StrEnvVar("SHARD_NODES")
+        """Comma-separated base URLs of all nodes in the order of the prefix shards they store"""
+
+        SHARD_INDEX: IntEnvVar = IntEnvVar("SHARD_INDEX")
+        """Index of the prefix shard stored by this node in the list of shard nodes"""
+
+        IS_SERVER_TIMING_ENABLED: BoolEnvVar = BoolEnvVar("IS_SERVER_TIMING_ENABLED")
+        """Whether range responses report lookup phase timings in the Server-Timing header"""
+
     class Admin:
         """Administrator variables."""
 
@@ -147,6 +162,9 @@ class EnvVar:
         PASSWORD: StrEnvVar = StrEnvVar("ADMIN_PASSWORD")
         """Password for administration"""
 
+        SESSION_SECRET: StrEnvVar = StrEnvVar("ADMIN_SESSION_SECRET")
+        """Secret key to sign admin session tokens"""
+
     class Storage:
         """Storage variables."""
 
@@ -170,3 +188,55 @@ class EnvVar:
 
         IS_TEXT: BoolEnvVar = BoolEnvVar("IS_STORAGE_TEXT")
         """Whether to use a text implementation of storage"""
+
+        IS_INCREMENTAL: BoolEnvVar = BoolEnvVar("IS_STORAGE_INCREMENTAL")
+        """Whether revisions reuse unchanged data of the active dataset"""
+
+        PURGE_FILE_RATE: IntEnvVar = IntEnvVar("STORAGE_PURGE_FILE_RATE")
+        """Maximum number of old data files removed per second (0 for no limit)"""
+
+        PURGE_BYTE_RATE: IntEnvVar = IntEnvVar("STORAGE_PURGE_BYTE_RATE")
+        """Maximum size of old data files in bytes removed per second (0 for no limit)"""
+
+        WRITE_BYTE_RATE: IntEnvVar = IntEnvVar("STORAGE_WRITE_BYTE_RATE")
+        """Maximum size of revision data in bytes written per second (0 for no limit)"""
+
+        WRITE_BATCH_SIZE: IntEnvVar = IntEnvVar("STORAGE_WRITE_BATCH_SIZE")
+        """Size of buffered revision data in bytes written to a file at once"""
+
+        LOOKUP_LATENCY_TARGET: FloatEnvVar = FloatEnvVar(
+            "STORAGE_LOOKUP_LATENCY_TARGET"
+        )
+        """Lookup latency in seconds above which revision writes are slowed down (0 for none)"""
+
+        IS_IN_PLACE: BoolEnvVar = BoolEnvVar("IS_STORAGE_IN_PLACE")
+        """Whether revisions replace data files of the active dataset one by one"""
+
+        RETAINED_GENERATIONS: IntEnvVar = IntEnvVar("STORAGE_RETAINED_GENERATIONS")
+        """Number of previous datasets retained for rollback"""
+
+        IS_POPULARITY_ORDERED: BoolEnvVar = BoolEnvVar("IS_STORAGE_POPULARITY_ORDERED")
+        """Whether revisions prepare the most requested prefixes first"""
+
+        HOT_PREFIXES: IntEnvVar = IntEnvVar("STORAGE_HOT_PREFIXES")
+        """Number of the most requested prefixes refreshed periodically (0 for none)"""
+
+        HOT_REFRESH_INTERVAL: FloatEnvVar = FloatEnvVar("STORAGE_HOT_REFRESH_INTERVAL")
+        """Time in seconds between refreshes of the most requested prefixes"""
+
+        IS_ON_DEMAND_BOOTSTRAP: BoolEnvVar = BoolEnvVar(
+            "IS_STORAGE_ON_DEMAND_BOOTSTRAP"
+        )
+        """Whether ranges are requested on demand until the first dataset is prepared"""
+
+        IS_MULTI_PROCESS: BoolEnvVar = BoolEnvVar("IS_STORAGE_MULTI_PROCESS")
+        """Whether the storage is shared by several application worker processes"""
+
+        LOOKUP_PROFILE_RATE: FloatEnvVar = FloatEnvVar("STORAGE_LOOKUP_PROFILE_RATE")
+        """Fraction of lookups profiled and dumped to the resource directory (0 for none)"""
+
+        REPLICATION_SOURCE: StrEnvVar = StrEnvVar("STORAGE_REPLICATION_SOURCE")
+        """Base URL of the node whose active dataset is pulled during replication"""
+
+        REPLICATION_PASSWORD: StrEnvVar = StrEnvVar("STORAGE_REPLICATION_PASSWORD")
+        """Admin password of the node whose active dataset is pulled during replication"""
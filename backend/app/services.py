@@ -1,6 +1,9 @@
 from backend.app.environment import EnvVar
+from backend.services.admission_controller import AdmissionController
 from backend.services.auth import AuthService
 from backend.services.password_strength_checker import PasswordStrengthChecker
+from backend.services.replication_client import ReplicationClient
+from backend.services.shard_router import ShardRouter
 from devops.common.utils import get_numeric_type, get_storage_file_quantity
 from storage.implementations.binary_storage import BinaryPwnedStorage
 from storage.implementations.mocked_requester import MockedPwnedRequester
@@ -8,7 +11,8 @@ from storage.implementations.requester import PwnedRequester
 from storage.implementations.storage_base import PwnedStorageBase
 from storage.implementations.text_storage import TextPwnedStorage
 from storage.models.abstract import PwnedStorage
-from storage.models.settings import BinaryPwnedStorageSettings
+from storage.models.settings import BinaryPwnedStorageSettings, RevisionSettings
+from storage.models.shard import PrefixShard
 
 
 class Services:
@@ -16,7 +20,26 @@ class Services:
         """Initialize a new ServiceManager instance."""
         self.__auth_service: AuthService = AuthService()
         self.__strength_checker: PasswordStrengthChecker = PasswordStrengthChecker()
-        self.__storage: PwnedStorage = build_pwned_storage()
+        shard_nodes = EnvVar.App.SHARD_NODES.get_nullable()
+        self.__shard_router: ShardRouter = ShardRouter(
+            shard_nodes and shard_nodes.split(","),
+            EnvVar.App.SHARD_INDEX.get_or_default(0),
+        )
+        self.__storage: PwnedStorage = build_pwned_storage(self.__shard_router.shard)
+        self.__range_admission: AdmissionController = AdmissionController(
+            EnvVar.App.RANGE_CONCURRENCY.get_or_default(0) or None,
+            EnvVar.App.RANGE_QUEUE_SIZE.get_or_default(
+                AdmissionController.DEFAULT_QUEUE_SIZE
+            ),
+        )
+        self.__is_server_timing_enabled: bool = (
+            EnvVar.App.IS_SERVER_TIMING_ENABLED.get_or_default(False)
+        )
+
+    async def close(self) -> None:
+        """Release the resources held by the services."""
+        await self.__shard_router.close()
+        await self.__storage.close()
 
     @property
     def auth(self) -> AuthService:
@@ -26,6 +49,30 @@ class Services:
         """
         return self.__auth_service
 
+    @property
+    def is_server_timing_enabled(self) -> bool:
+        """
+        Check if range responses report lookup phase timings.
+        :return: True if the Server-Timing header is sent, False otherwise.
+        """
+        return self.__is_server_timing_enabled
+
+    @property
+    def range_admission(self) -> AdmissionController:
+        """
+        Get the admission controller for range requests.
+        :return: The admission controller.
+        """
+        return self.__range_admission
+
+    @property
+    def shard_router(self) -> ShardRouter:
+        """
+        Get the router of range requests to the nodes that store other shards.
+        :return: The shard router.
+        """
+        return self.__shard_router
+
     @property
     def storage(self) -> PwnedStorage:
         """
@@ -43,12 +90,19 @@ class Services:
         return self.__strength_checker
 
 
-def build_pwned_storage() -> PwnedStorage:
+def build_pwned_storage(shard: PrefixShard = PrefixShard()) -> PwnedStorage:
     """
     Build a Pwned storage instance.
+    :param shard: The slice of the prefix space whose ranges are stored.
     :return: A PwnedStorage instance.
     """
     user_agent = EnvVar.Storage.USER_AGENT.get()
+    replication_source = EnvVar.Storage.REPLICATION_SOURCE.get_nullable()
+    dataset_source = (
+        ReplicationClient(replication_source, EnvVar.Storage.REPLICATION_PASSWORD.get())
+        if replication_source
+        else None
+    )
     is_mocked = EnvVar.Storage.IS_MOCKED.get_or_default(False)
     requester = (
         MockedPwnedRequester(user_agent) if is_mocked else PwnedRequester(user_agent)
@@ -58,8 +112,58 @@ def build_pwned_storage() -> PwnedStorage:
     coroutine_quantity = EnvVar.Storage.COROUTINES.get_or_default(
         PwnedStorageBase.DEFAULT_REVISION_COROUTINE_QUANTITY
     )
+    revision_settings = RevisionSettings(
+        EnvVar.Storage.IS_INCREMENTAL.get_or_default(
+            RevisionSettings.DEFAULT_IS_INCREMENTAL
+        ),
+        purge_file_rate=EnvVar.Storage.PURGE_FILE_RATE.get_or_default(
+            RevisionSettings.DEFAULT_PURGE_FILE_RATE
+        )
+        or None,
+        purge_byte_rate=EnvVar.Storage.PURGE_BYTE_RATE.get_or_default(
+            RevisionSettings.DEFAULT_PURGE_BYTE_RATE
+        )
+        or None,
+        write_byte_rate=EnvVar.Storage.WRITE_BYTE_RATE.get_or_default(0) or None,
+        write_batch_size=EnvVar.Storage.WRITE_BATCH_SIZE.get_or_default(
+            RevisionSettings.DEFAULT_WRITE_BATCH_SIZE
+        ),
+        lookup_latency_target=EnvVar.Storage.LOOKUP_LATENCY_TARGET.get_or_default(0)
+        or None,
+        is_in_place=EnvVar.Storage.IS_IN_PLACE.get_or_default(
+            RevisionSettings.DEFAULT_IS_IN_PLACE
+        ),
+        retained_generation_quantity=EnvVar.Storage.RETAINED_GENERATIONS.get_or_default(
+            RevisionSettings.DEFAULT_RETAINED_GENERATION_QUANTITY
+        ),
+        is_popularity_ordered=EnvVar.Storage.IS_POPULARITY_ORDERED.get_or_default(
+            RevisionSettings.DEFAULT_IS_POPULARITY_ORDERED
+        ),
+        hot_prefix_quantity=EnvVar.Storage.HOT_PREFIXES.get_or_default(
+            RevisionSettings.DEFAULT_HOT_PREFIX_QUANTITY
+        ),
+        hot_refresh_interval=EnvVar.Storage.HOT_REFRESH_INTERVAL.get_or_default(
+            RevisionSettings.DEFAULT_HOT_REFRESH_INTERVAL
+        ),
+        is_on_demand_bootstrap=EnvVar.Storage.IS_ON_DEMAND_BOOTSTRAP.get_or_default(
+            RevisionSettings.DEFAULT_IS_ON_DEMAND_BOOTSTRAP
+        ),
+        is_multi_process=EnvVar.Storage.IS_MULTI_PROCESS.get_or_default(
+            RevisionSettings.DEFAULT_IS_MULTI_PROCESS
+        ),
+        lookup_profile_rate=EnvVar.Storage.LOOKUP_PROFILE_RATE.get_or_default(
+            RevisionSettings.DEFAULT_LOOKUP_PROFILE_RATE
+        ),
+    )
     if is_text:
-        return TextPwnedStorage(resource_dir, requester, coroutine_quantity)
+        return TextPwnedStorage(
+            resource_dir,
+            requester,
+            coroutine_quantity,
+            revision_settings,
+            shard,
+            dataset_source,
+        )
     file_quantity_number = EnvVar.Storage.FILES.get_or_default(
         BinaryPwnedStorageSettings.DEFAULT_FILE_QUANTITY.value
     )
@@ -69,4 +173,12 @@ def build_pwned_storage() -> PwnedStorage:
     )
     occasion_type = get_numeric_type(occasion_bytes)
     settings = BinaryPwnedStorageSettings(file_quantity, occasion_type)
-    return BinaryPwnedStorage(resource_dir, requester, coroutine_quantity, settings)
+    return BinaryPwnedStorage(
+        resource_dir,
+        requester,
+        coroutine_quantity,
+        settings,
+        revision_settings,
+        shard,
+        dataset_source,
+    )
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from storage.models.metrics import Metric, MetricType
+
+
+class OverloadError(Exception):
+    """Error that describes a request rejected because of overload."""
+
+    def __init__(self, retry_after: int):
+        """
+        Initialize a new OverloadError instance.
+        :param retry_after: The time in seconds after which the request should be retried.
+        """
+        super().__init__("The service is overloaded.")
+        self.retry_after: int = retry_after
+
+
+class AdmissionController:
+    """
+    Limits the quantity of concurrently handled requests.
+    Requests above the limit wait in a bounded queue, and requests that do not fit the queue are rejected at once.
+    """
+
+    DEFAULT_QUEUE_SIZE: int = 256
+    """The default maximum quantity of requests waiting to be handled."""
+
+    RETRY_AFTER_SECONDS: int = 1
+    """The time in seconds after which rejected requests should be retried."""
+
+    def __init__(
+        self,
+        concurrency_limit: Optional[int] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        """
+        Initialize a new AdmissionController instance.
+
+        :param concurrency_limit: The maximum quantity of concurrently handled requests. Not limited by default.
+        :param queue_size: The maximum quantity of requests waiting to be handled.
+        """
+        self.__queue_size: int = queue_size
+        self.__semaphore: Optional[asyncio.Semaphore] = (
+            None if concurrency_limit is None else asyncio.Semaphore(concurrency_limit)
+        )
+        self.__waiting_quantity: int = 0
+        self.__queued_quantity: int = 0
+        self.__shed_quantity: int = 0
+        self.__queue_seconds: float = 0
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """
+        Wait until a request can be handled and hold its place until it is handled.
+        :raises OverloadError: If the queue is full.
+        """
+        if self.__semaphore is None:
+            yield
+            return
+        if self.__semaphore.locked():
+            if self.__waiting_quantity >= self.__queue_size:
+                self.__shed_quantity += 1
+                raise OverloadError(self.RETRY_AFTER_SECONDS)
+            self.__waiting_quantity += 1
+            self.__queued_quantity += 1
+            start_time = time.perf_counter()
+            try:
+                await self.__semaphore.acquire()
+            finally:
+                self.__waiting_quantity -= 1
+                self.__queue_seconds += time.perf_counter() - start_time
+        else:
+            await self.__semaphore.acquire()
+        try:
+            yield
+        finally:
+            self.__semaphore.release()
+
+    def to_json(self) -> Dict:
+        """
+        Get the admission statistics.
+        :return: The statistics as JSON.
+        """
+        return {
+            "waiting_requests": self.__waiting_quantity,
+            "queued_requests": self.__queued_quantity,
+            "shed_requests": self.__shed_quantity,
+            "queue_seconds": round(self.__queue_seconds, 3),
+        }
+
+    @property
+    def metrics(self) -> List[Metric]:
+        """
+        Get the admission metrics.
+        :return: The metrics.
+        """
+        return [
+            Metric.single(
+                "admission_waiting_requests",
+                MetricType.GAUGE,
+                "Quantity of requests waiting to be handled.",
+                self.__waiting_quantity,
+            ),
+            Metric.single(
+                "admission_queued_requests_total",
+                MetricType.COUNTER,
+                "Quantity of requests that have waited to be handled.",
+                self.__queued_quantity,
+            ),
+            Metric.single(
+                "admission_shed_requests_total",
+                MetricType.COUNTER,
+                "Quantity of requests rejected because of overload.",
+                self.__shed_quantity,
+            ),
+            Metric.single(
+                "admission_queue_seconds_total",
+                MetricType.COUNTER,
+                "Time requests have waited to be handled.",
+                self.__queue_seconds,
+            ),
+        ]
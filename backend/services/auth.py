@@ -7,6 +7,13 @@ from starlette.requests import Request
 from starlette.responses import Response
 
 from backend.app.environment import EnvVar
+from storage.auxiliary.filetools import (
+    is_file,
+    join_paths,
+    make_dir_if_not_exists,
+    read,
+    write_if_not_exists,
+)
 
 
 class AuthService:
@@ -16,9 +23,14 @@ class AuthService:
     DEFAULT_ADMIN_SESSION_LIFETIME_IN_MINUTES = 60
     """The default administrator session lifetime in minutes."""
 
+    SESSION_SECRET_FILE = "session-secret.key"
+    """The file in the storage resource directory with the generated session secret key."""
+
     def __init__(self):
         """Initialize a new AuthService instance."""
-        self.__session_secret_key: str = secrets.token_hex(32)
+        self.__session_secret_key: str = (
+            EnvVar.Admin.SESSION_SECRET.get_nullable() or self.__load_session_secret()
+        )
         self.__is_https_only: bool = EnvVar.App.HTTPS_ONLY.get()
         self.__admin_session_lifetime: int = (
             60
@@ -89,6 +101,17 @@ class AuthService:
         """
         return self.__encoded_admin_password == self.__encode_password(password)
 
+    def __load_session_secret(self) -> str:
+        # Worker processes share the storage resource directory,
+        # so the first worker generates the key and the others read it.
+        # Otherwise a session created by one worker would be rejected by the others.
+        resource_dir = EnvVar.Storage.RESOURCE_DIR.get()
+        make_dir_if_not_exists(resource_dir)
+        secret_file_path = join_paths(resource_dir, self.SESSION_SECRET_FILE)
+        if not is_file(secret_file_path):
+            write_if_not_exists(secret_file_path, secrets.token_hex(32).encode("utf-8"))
+        return read(secret_file_path)
+
     @staticmethod
     def __encode_password(password: str) -> str:
         return hashlib.sha256(password.encode("utf-8")).hexdigest()
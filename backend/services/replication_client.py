@@ -0,0 +1,60 @@
+from typing import AsyncIterator, Optional
+
+import aiohttp
+
+from backend.services.auth import AuthService
+from storage.models.abstract import PwnedDatasetSource
+from storage.models.manifest import DatasetManifest
+
+
+class ReplicationClient(PwnedDatasetSource):
+    """Pulls the active dataset published by the admin API of another node."""
+
+    CHUNK_SIZE: int = 1024 * 1024
+    """The size in bytes of the pieces in which dataset files are received."""
+
+    def __init__(self, source_url: str, admin_password: str):
+        """
+        Initialize a new ReplicationClient instance.
+
+        :param source_url: The base URL of the node that publishes its dataset.
+        :param admin_password: The admin password of the node.
+        """
+        self.__source_url: str = source_url.rstrip("/")
+        self.__admin_password: str = admin_password
+        self.__token: Optional[str] = None
+
+    async def get_manifest(self) -> DatasetManifest:
+        async with aiohttp.ClientSession() as session:
+            # Each replication starts with the manifest, so the token is renewed for every replication.
+            self.__token = await self.__authenticate(session)
+            async with session.get(
+                f"{self.__source_url}/admin/replication/manifest",
+                headers={AuthService.SESSION_TOKEN_COOKIE_NAME: self.__token},
+            ) as response:
+                response.raise_for_status()
+                manifest = DatasetManifest.from_json(await response.json())
+        if manifest is None:
+            raise ValueError("The dataset source has sent an invalid manifest.")
+        return manifest
+
+    async def stream_file(self, name: str, generation: int) -> AsyncIterator[bytes]:
+        if self.__token is None:
+            raise RuntimeError("The manifest has to be received first.")
+        async with aiohttp.ClientSession() as session:
+            async with session.get(
+                f"{self.__source_url}/admin/replication/files/{name}",
+                params={"generation": str(generation)},
+                headers={AuthService.SESSION_TOKEN_COOKIE_NAME: self.__token},
+            ) as response:
+                response.raise_for_status()
+                async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                    yield chunk
+
+    async def __authenticate(self, session: aiohttp.ClientSession) -> str:
+        async with session.post(
+            f"{self.__source_url}/admin/auth",
+            json={"password": self.__admin_password},
+        ) as response:
+            response.raise_for_status()
+            return (await response.json())["token"]
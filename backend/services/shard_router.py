@@ -0,0 +1,66 @@
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+from storage.models.shard import PrefixShard
+
+
+class ShardRouter:
+    """
+    Routes range requests to the nodes that store the shards of their prefixes.
+    The shard map is static: the node at each position of the node list stores the shard with the same index.
+    """
+
+    FORWARDED_HEADER: str = "X-Shard-Forwarded"
+    """The header that marks requests forwarded by another node, which are never forwarded again."""
+
+    TIMEOUT_SECONDS: float = 10
+    """The time in seconds after which a forwarded request fails."""
+
+    def __init__(self, node_urls: Optional[List[str]] = None, shard_index: int = 0):
+        """
+        Initialize a new ShardRouter instance.
+
+        :param node_urls: The base URLs of all nodes in the order of their shards. The storage is not sharded by default.
+        :param shard_index: The index of the shard stored by this node.
+        """
+        self.__node_urls: List[str] = [url.rstrip("/") for url in node_urls or [""]]
+        self.__shard: PrefixShard = PrefixShard(shard_index, len(self.__node_urls))
+        self.__session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def shard(self) -> PrefixShard:
+        """
+        Get the shard stored by this node.
+        :return: The shard.
+        """
+        return self.__shard
+
+    async def forward_range_request(
+        self, shard_index: int, hash_prefix: str
+    ) -> Tuple[int, str, Dict[str, str]]:
+        """
+        Forward a range request to the node that stores a shard.
+
+        :param shard_index: The index of the shard that contains the prefix.
+        :param hash_prefix: The hash prefix.
+        :return: The status code, body and relevant headers of the node response.
+        """
+        url = f"{self.__node_urls[shard_index]}/range/{hash_prefix}"
+        if self.__session is None or self.__session.closed:
+            self.__session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.TIMEOUT_SECONDS)
+            )
+        async with self.__session.get(
+            url, headers={self.FORWARDED_HEADER: str(self.__shard.index)}
+        ) as response:
+            headers = dict()
+            if "Retry-After" in response.headers:
+                headers["Retry-After"] = response.headers["Retry-After"]
+            return response.status, await response.text(), headers
+
+    async def close(self) -> None:
+        """Close the connections to other nodes."""
+        if self.__session is not None and not self.__session.closed:
+            await self.__session.close()
+        self.__session = None
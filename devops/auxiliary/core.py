@@ -2,10 +2,10 @@ import asyncio
 import sys
 import time
 from enum import Enum
-from typing import List, Union
+from typing import List, Optional, Union
 
-from storage.models.abstract import PwnedStorage
-from storage.models.revision import Revision, RevisionStatus
+from storage.models.abstract import PwnedStorage, RollbackResult, UpdateResult
+from storage.models.revision import Revision, RevisionStatus, RevisionThroughput
 
 CONSOLE_UPDATE_INTERVAL: float = 1
 """The interval between console updates in seconds."""
@@ -89,11 +89,42 @@ def convert_seconds(seconds: int) -> str:
     hours = seconds // 3600
     minutes = (seconds // 60) % 60
     seconds = seconds % 60
-    hour_string = f"" if hours == 0 else "{hours}:"
+    hour_string = f"" if hours == 0 else f"{hours}:"
     minute_string = f"{minutes:0{0 if hours == 0 else 2}d}"
     return f"{hour_string}{minute_string}:{seconds:02d}"
 
 
+def format_revision_throughput(throughput: RevisionThroughput) -> str:
+    """
+    Format the throughput of a revision as a single line.
+    The shares of the time spent on the network, on processing and on write throttling
+    show what limits the preparation.
+
+    :param throughput: The throughput of a revision.
+    :return: A formatted throughput line.
+    """
+    parts = [
+        f"{throughput.prefix_rate:.1f} prefixes/s",
+        f"{throughput.record_rate:.0f} records/s",
+    ]
+    total_seconds = (
+        throughput.network_seconds
+        + throughput.processing_seconds
+        + throughput.throttle_seconds
+    )
+    if total_seconds > 0:
+        parts.append(
+            f"network {100 * throughput.network_seconds / total_seconds:.0f}%"
+            f" / processing {100 * throughput.processing_seconds / total_seconds:.0f}%"
+            f" / throttle {100 * throughput.throttle_seconds / total_seconds:.0f}%"
+        )
+    if throughput.range_error_quantity > 0:
+        parts.append(f"{throughput.range_error_quantity} errors")
+    if throughput.eta_seconds is not None:
+        parts.append(f"ETA {convert_seconds(throughput.eta_seconds)}")
+    return ", ".join(parts)
+
+
 def print_revision_information(
     revision: Revision, previous_status: RevisionStatus
 ) -> None:
@@ -143,6 +174,11 @@ def print_revision_information(
         )
         write(stylize_text(" Prepare new data: ", style))
         write(stylize_text(f"{progress}%", [TextStyle.BOLD, style]))
+        if not is_completed and revision.throughput is not None:
+            throughput_line = format_revision_throughput(revision.throughput)
+            write(stylize_text(f" ({throughput_line})", TextStyle.PALE_GRAY))
+        # The rest of a previously written longer line is erased.
+        write("\x1B[K")
         if is_completed:
             write("\n")
             console_status = RevisionStatus.TRANSITION
@@ -186,3 +222,142 @@ async def watch_and_print_revision(storage: PwnedStorage) -> None:
         ]:
             break
         await asyncio.sleep(CONSOLE_UPDATE_INTERVAL)
+
+
+def print_generations(
+    active_generation: Optional[int], retained_generations: List[int]
+) -> None:
+    """
+    Print the generations of the active and retained datasets.
+
+    :param active_generation: The generation of the active dataset.
+    :param retained_generations: The generations of the retained datasets.
+    """
+
+    def __format_generation(generation: Optional[int]) -> str:
+        if generation is None:
+            return "unknown"
+        return f"{generation} ({time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(generation))})"
+
+    write(stylize_text("Active: ", TextStyle.BOLD))
+    write(__format_generation(active_generation))
+    write("\n")
+    write(stylize_text("Retained:", TextStyle.BOLD))
+    write("\n")
+    if not retained_generations:
+        write(stylize_text("  none", TextStyle.PALE_GRAY))
+        write("\n")
+    for generation in retained_generations:
+        write(f"  {__format_generation(generation)}")
+        write("\n")
+
+
+def print_rollback_result(result: RollbackResult) -> None:
+    """
+    Print the result of a rollback.
+    :param result: The rollback result.
+    """
+    if result == RollbackResult.DONE:
+        write(stylize_text("[DONE]", [TextStyle.BOLD, TextStyle.GREEN]))
+    elif result == RollbackResult.NOT_FOUND:
+        write(
+            stylize_text(
+                "[NOT FOUND] No dataset of this generation is retained.",
+                [TextStyle.BOLD, TextStyle.RED],
+            )
+        )
+    else:
+        write(
+            stylize_text(
+                "[BUSY] The revision has to be completed or cancelled first.",
+                [TextStyle.BOLD, TextStyle.YELLOW],
+            )
+        )
+    write("\n")
+
+
+def print_refresh_result(result: UpdateResult) -> None:
+    """
+    Print the result of a prefix range refresh.
+    :param result: The refresh result.
+    """
+    if result == UpdateResult.DONE:
+        write(stylize_text("[DONE]", [TextStyle.BOLD, TextStyle.GREEN]))
+    elif result == UpdateResult.BUSY:
+        write(
+            stylize_text(
+                "[BUSY] The storage is being updated.",
+                [TextStyle.BOLD, TextStyle.YELLOW],
+            )
+        )
+    else:
+        write(
+            stylize_text(
+                "[FAILED] The ranges could not be refreshed or the storage has no data yet.",
+                [TextStyle.BOLD, TextStyle.RED],
+            )
+        )
+    write("\n")
+
+
+def print_export_result(is_exported: bool) -> None:
+    """
+    Print the result of a dataset export.
+    :param is_exported: Whether the dataset has been exported.
+    """
+    if is_exported:
+        write(stylize_text("[DONE]", [TextStyle.BOLD, TextStyle.GREEN]))
+    else:
+        write(
+            stylize_text(
+                "[FAILED] The storage has no data yet.",
+                [TextStyle.BOLD, TextStyle.RED],
+            )
+        )
+    write("\n")
+
+
+def print_import_result(
+    result: UpdateResult, error_message: Optional[str] = None
+) -> None:
+    """
+    Print the result of a dataset import.
+
+    :param result: The import result.
+    :param error_message: The reason why the import has failed.
+    """
+    if result == UpdateResult.DONE:
+        write(stylize_text("[DONE]", [TextStyle.BOLD, TextStyle.GREEN]))
+    elif result == UpdateResult.BUSY:
+        write(
+            stylize_text(
+                "[BUSY] The storage is being updated.",
+                [TextStyle.BOLD, TextStyle.YELLOW],
+            )
+        )
+    else:
+        write(
+            stylize_text(
+                f"[FAILED] {error_message or 'The archive cannot be imported.'}",
+                [TextStyle.BOLD, TextStyle.RED],
+            )
+        )
+    write("\n")
+
+
+def print_opening_error(message: str) -> None:
+    """
+    Print the reason why an existing storage cannot be opened.
+    :param message: The reason.
+    """
+    write(stylize_text(f"[FAILED] {message}", [TextStyle.BOLD, TextStyle.RED]))
+    write("\n")
+
+
+def print_conversion_error(message: str) -> None:
+    """
+    Print the reason why a storage cannot be converted.
+    :param message: The reason.
+    """
+    write(stylize_text(f"[FAILED] {message}", [TextStyle.BOLD, TextStyle.RED]))
+    write("\n")
@@ -1,38 +1,323 @@
 import asyncio
+import json
+import sys
+from contextlib import redirect_stdout
+from json import JSONDecodeError
+from typing import Optional, Sequence
 
-from devops.auxiliary.core import watch_and_print_revision
+from devops.auxiliary.core import (
+    print_conversion_error,
+    print_export_result,
+    print_generations,
+    print_import_result,
+    print_opening_error,
+    print_refresh_result,
+    print_rollback_result,
+    watch_and_print_revision,
+)
+from storage.auxiliary.filetools import is_file, join_paths, read
 from storage.implementations.binary_storage import BinaryPwnedStorage
+from storage.implementations.hash_file_reader import PwnedHashFileReader
 from storage.implementations.mocked_requester import MockedPwnedRequester
 from storage.implementations.requester import PwnedRequester
+from storage.implementations.storage_base import PwnedStorageBase
+from storage.implementations.storage_reader import PwnedStorageReader
 from storage.implementations.text_storage import TextPwnedStorage
+from storage.models.abstract import PwnedRangeProvider
 from storage.models.settings import (
     BinaryPwnedStorageSettings,
     NumericType,
+    RevisionSettings,
     StorageFileQuantity,
 )
+from storage.models.shard import PrefixShard
 
 
 async def update_storage(
     resource_dir: str,
-    user_agent: str,
+    user_agent: Optional[str],
     revision_coroutine_quantity: int,
     is_mocked_requester: bool,
     is_text_implementation: bool,
     file_quantity: StorageFileQuantity,
     occasion_numeric_type: NumericType,
+    is_incremental: bool = RevisionSettings.DEFAULT_IS_INCREMENTAL,
+    import_file: Optional[str] = None,
+    purge_file_rate: Optional[int] = RevisionSettings.DEFAULT_PURGE_FILE_RATE,
+    purge_byte_rate: Optional[int] = RevisionSettings.DEFAULT_PURGE_BYTE_RATE,
+    write_byte_rate: Optional[int] = None,
+    write_batch_size: int = RevisionSettings.DEFAULT_WRITE_BATCH_SIZE,
+    is_in_place: bool = RevisionSettings.DEFAULT_IS_IN_PLACE,
+    retained_generation_quantity: int = RevisionSettings.DEFAULT_RETAINED_GENERATION_QUANTITY,
+    refreshed_prefixes: Optional[Sequence[str]] = None,
+    is_popularity_ordered: bool = RevisionSettings.DEFAULT_IS_POPULARITY_ORDERED,
+    refreshed_hot_prefix_quantity: Optional[int] = None,
+    shard: PrefixShard = PrefixShard(),
 ) -> None:
     """Update Pwned storage."""
     settings = BinaryPwnedStorageSettings(file_quantity, occasion_numeric_type)
-    requester = (
-        MockedPwnedRequester(user_agent)
-        if is_mocked_requester
-        else PwnedRequester(user_agent)
+    revision_settings = RevisionSettings(
+        is_incremental,
+        purge_file_rate=purge_file_rate,
+        purge_byte_rate=purge_byte_rate,
+        write_byte_rate=write_byte_rate,
+        write_batch_size=write_batch_size,
+        is_in_place=is_in_place,
+        retained_generation_quantity=retained_generation_quantity,
+        is_popularity_ordered=is_popularity_ordered,
     )
+    if import_file is not None:
+        requester: PwnedRangeProvider = PwnedHashFileReader(import_file)
+    elif is_mocked_requester:
+        requester = MockedPwnedRequester(user_agent)
+    else:
+        requester = PwnedRequester(user_agent)
     storage = (
-        TextPwnedStorage(resource_dir, requester, revision_coroutine_quantity)
+        TextPwnedStorage(
+            resource_dir,
+            requester,
+            revision_coroutine_quantity,
+            revision_settings,
+            shard,
+        )
+        if is_text_implementation
+        else BinaryPwnedStorage(
+            resource_dir,
+            requester,
+            revision_coroutine_quantity,
+            settings,
+            revision_settings,
+            shard,
+        )
+    )
+    try:
+        if refreshed_prefixes is not None:
+            print_refresh_result(await storage.refresh(*refreshed_prefixes))
+            return
+        if refreshed_hot_prefix_quantity is not None:
+            print_refresh_result(
+                await storage.refresh_hot_prefixes(refreshed_hot_prefix_quantity)
+            )
+            return
+        await asyncio.gather(storage.update(), watch_and_print_revision(storage))
+        await storage.wait_for_purge()
+    finally:
+        await storage.close()
+
+
+NO_STORAGE_MESSAGE = "The directory contains no storage."
+"""The reason why a storage cannot be opened from a directory without implementation info."""
+
+INVALID_IMPLEMENTATION_MESSAGE = "The implementation info of the storage is invalid."
+"""The reason why a storage cannot be opened from a directory with invalid implementation info."""
+
+
+async def rollback_storage(resource_dir: str, generation: Optional[int]) -> None:
+    """Roll Pwned storage back to a retained dataset or list retained datasets."""
+    # The storage is opened with the settings it was built with,
+    # since other settings would make it discard its state.
+    storage = open_offline_storage(resource_dir)
+    if storage is None:
+        print_opening_error(NO_STORAGE_MESSAGE)
+        return
+    try:
+        if generation is None:
+            print_generations(storage.active_generation, storage.retained_generations)
+            return
+        print_rollback_result(await storage.rollback(generation))
+        await storage.wait_for_purge()
+    finally:
+        await storage.close()
+
+
+ARCHIVE_STREAM_PATH = "-"
+"""The archive path that stands for the standard input or output."""
+
+
+async def export_storage(resource_dir: str, archive_path: str) -> None:
+    """Export the active dataset of Pwned storage to an archive."""
+    storage = open_offline_storage(resource_dir)
+    if storage is None:
+        with redirect_stdout(sys.stderr):
+            print_opening_error(NO_STORAGE_MESSAGE)
+        return
+    try:
+        if archive_path == ARCHIVE_STREAM_PATH:
+            is_exported = await storage.export_archive(sys.stdout.buffer)
+            sys.stdout.buffer.flush()
+            # The standard output carries the archive.
+            with redirect_stdout(sys.stderr):
+                print_export_result(is_exported)
+            return
+        with open(archive_path, "wb") as archive:
+            is_exported = await storage.export_archive(archive)
+        print_export_result(is_exported)
+    finally:
+        await storage.close()
+
+
+async def import_storage(
+    resource_dir: str,
+    archive_path: str,
+    is_text_implementation: bool,
+    file_quantity: StorageFileQuantity,
+    occasion_numeric_type: NumericType,
+    retained_generation_quantity: int = RevisionSettings.DEFAULT_RETAINED_GENERATION_QUANTITY,
+    shard: PrefixShard = PrefixShard(),
+) -> None:
+    """
+    Import an archive to Pwned storage and make the imported dataset active.
+    The implementation options are used only if the directory contains no storage yet,
+    an existing storage is opened with the settings it was built with.
+    """
+    revision_settings = RevisionSettings(
+        retained_generation_quantity=retained_generation_quantity
+    )
+    if is_file(join_paths(resource_dir, PwnedStorageBase.IMPLEMENTATION_FILE)):
+        # The archive is checked against the stored settings,
+        # since other settings would make the storage discard its state.
+        storage = open_offline_storage(resource_dir, revision_settings)
+        if storage is None:
+            print_opening_error(INVALID_IMPLEMENTATION_MESSAGE)
+            return
+    else:
+        storage = create_offline_storage(
+            resource_dir,
+            is_text_implementation,
+            file_quantity,
+            occasion_numeric_type,
+            shard,
+            revision_settings,
+        )
+    try:
+        if archive_path == ARCHIVE_STREAM_PATH:
+            result = await storage.import_archive(sys.stdin.buffer)
+        else:
+            with open(archive_path, "rb") as archive:
+                result = await storage.import_archive(archive)
+        print_import_result(result, storage.replication_error_message)
+        await storage.wait_for_purge()
+    finally:
+        await storage.close()
+
+
+async def convert_storage(
+    source_resource_dir: str,
+    resource_dir: str,
+    revision_coroutine_quantity: int,
+    is_text_implementation: bool,
+    file_quantity: StorageFileQuantity,
+    occasion_numeric_type: NumericType,
+    write_batch_size: int = RevisionSettings.DEFAULT_WRITE_BATCH_SIZE,
+    shard: PrefixShard = PrefixShard(),
+) -> None:
+    """Build Pwned storage from the active dataset of another storage with other settings."""
+    source_storage = open_offline_storage(source_resource_dir)
+    if source_storage is None:
+        print_conversion_error("The source directory contains no storage.")
+        return
+    try:
+        if source_storage.active_generation is None:
+            print_conversion_error("The source storage has no data yet.")
+            return
+        if not source_storage.shard.covers(shard):
+            print_conversion_error(
+                "The source storage does not contain the whole shard."
+            )
+            return
+        settings = BinaryPwnedStorageSettings(file_quantity, occasion_numeric_type)
+        revision_settings = RevisionSettings(write_batch_size=write_batch_size)
+        reader = PwnedStorageReader(source_storage)
+        storage = (
+            TextPwnedStorage(
+                resource_dir,
+                reader,
+                revision_coroutine_quantity,
+                revision_settings,
+                shard,
+            )
+            if is_text_implementation
+            else BinaryPwnedStorage(
+                resource_dir,
+                reader,
+                revision_coroutine_quantity,
+                settings,
+                revision_settings,
+                shard,
+            )
+        )
+        try:
+            await asyncio.gather(storage.update(), watch_and_print_revision(storage))
+            await storage.wait_for_purge()
+        finally:
+            await storage.close()
+    finally:
+        await source_storage.close()
+
+
+def open_offline_storage(
+    resource_dir: str, revision_settings: RevisionSettings = RevisionSettings()
+) -> Optional[PwnedStorageBase]:
+    """Create Pwned storage with the settings an existing storage was built with."""
+    implementation_file_path = join_paths(
+        resource_dir, PwnedStorageBase.IMPLEMENTATION_FILE
+    )
+    if not is_file(implementation_file_path):
+        return None
+    try:
+        implementation_info = json.loads(read(implementation_file_path))
+    except JSONDecodeError:
+        return None
+    if not isinstance(implementation_info, dict):
+        return None
+    name = implementation_info.get(PwnedStorageBase.IMPLEMENTATION_NAME_KEY)
+    shard = PrefixShard.from_json(implementation_info.get(PwnedStorageBase.SHARD_KEY))
+    if shard is None:
+        return None
+    if name == TextPwnedStorage.__name__:
+        return create_offline_storage(
+            resource_dir,
+            True,
+            BinaryPwnedStorageSettings.DEFAULT_FILE_QUANTITY,
+            BinaryPwnedStorageSettings.DEFAULT_OCCASION_NUMERIC_TYPE,
+            shard,
+            revision_settings,
+        )
+    settings = BinaryPwnedStorageSettings.from_dict(implementation_info)
+    if name != BinaryPwnedStorage.__name__ or settings is None:
+        return None
+    return create_offline_storage(
+        resource_dir,
+        False,
+        StorageFileQuantity(settings.file_quantity),
+        settings.occasion_numeric_type,
+        shard,
+        revision_settings,
+    )
+
+
+def create_offline_storage(
+    resource_dir: str,
+    is_text_implementation: bool,
+    file_quantity: StorageFileQuantity,
+    occasion_numeric_type: NumericType,
+    shard: PrefixShard = PrefixShard(),
+    revision_settings: RevisionSettings = RevisionSettings(),
+) -> PwnedStorageBase:
+    """Create Pwned storage that does not request any range."""
+    settings = BinaryPwnedStorageSettings(file_quantity, occasion_numeric_type)
+    # No range is requested, since the storage is not updated.
+    requester = MockedPwnedRequester("")
+    return (
+        TextPwnedStorage(
+            resource_dir, requester, revision_settings=revision_settings, shard=shard
+        )
         if is_text_implementation
         else BinaryPwnedStorage(
-            resource_dir, requester, revision_coroutine_quantity, settings
+            resource_dir,
+            requester,
+            settings=settings,
+            revision_settings=revision_settings,
+            shard=shard,
         )
     )
-    await asyncio.gather(storage.update(), watch_and_print_revision(storage))
@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+
+from devops.auxiliary import programs
+from devops.common.utils import (
+    NUMERIC_TYPE_INT_OPTIONS,
+    STORAGE_FILE_QUANTITY_INT_OPTIONS,
+    get_numeric_type,
+    get_storage_file_quantity,
+)
+from storage.implementations.storage_base import PwnedStorageBase
+from storage.models.settings import BinaryPwnedStorageSettings, RevisionSettings
+from storage.models.shard import PrefixShard
+
+if __name__ == "__main__":
+    default_revision_coroutine_quantity = (
+        PwnedStorageBase.DEFAULT_REVISION_COROUTINE_QUANTITY
+    )
+    default_file_quantity = BinaryPwnedStorageSettings.DEFAULT_FILE_QUANTITY.value
+    default_occasion_byte_number = (
+        BinaryPwnedStorageSettings.DEFAULT_OCCASION_NUMERIC_TYPE.value
+    )
+    default_write_batch_size = RevisionSettings.DEFAULT_WRITE_BATCH_SIZE
+
+    parser = argparse.ArgumentParser(
+        description="Build the Pwned leak record storage with other settings"
+        " from the active dataset of an existing storage instead of the Pwned API."
+    )
+    parser.add_argument(
+        "source_resource_dir",
+        type=str,
+        help="The directory where the data of the existing storage is located."
+        " Its settings are detected automatically.",
+    )
+    parser.add_argument(
+        "resource_dir",
+        type=str,
+        help="The directory to store data of the new storage (recommended to be empty).",
+    )
+    parser.add_argument(
+        "-c",
+        "--revision-coroutines",
+        type=int,
+        choices=range(1, 1024 + 1),
+        metavar="NUMBER",
+        default=default_revision_coroutine_quantity,
+        help="The number of coroutines for reading ranges and writing data files."
+        f" Default: {default_revision_coroutine_quantity}.",
+    )
+    parser.add_argument(
+        "-t",
+        "--text-implementation",
+        action="store_true",
+        help="Whether to use a text implementation of the new storage. The binary implementation is used by default.",
+    )
+    parser.add_argument(
+        "-f",
+        "--files",
+        type=int,
+        choices=STORAGE_FILE_QUANTITY_INT_OPTIONS,
+        default=default_file_quantity,
+        help="The number of files (batches) to store data (for binary implementation)."
+        f" Default: {default_file_quantity}.",
+    )
+    parser.add_argument(
+        "-b",
+        "--occasion-bytes",
+        type=int,
+        choices=NUMERIC_TYPE_INT_OPTIONS,
+        default=default_occasion_byte_number,
+        help="The size of the stored leak occasion unsigned number in bytes (for binary implementation)."
+        f" Default: {default_occasion_byte_number}.",
+    )
+    parser.add_argument(
+        "--shard",
+        type=int,
+        nargs=2,
+        metavar=("INDEX", "QUANTITY"),
+        default=(0, 1),
+        help="Store only the ranges of the hash prefixes of the shard INDEX."
+        " The prefix space is split into QUANTITY consecutive shards. Default: 0 1.",
+    )
+    parser.add_argument(
+        "--write-batch-size",
+        type=int,
+        metavar="NUMBER",
+        default=default_write_batch_size,
+        help="The size of buffered data in bytes written to a file at once."
+        f" Default: {default_write_batch_size}.",
+    )
+
+    args = parser.parse_args()
+    asyncio.run(
+        programs.convert_storage(
+            args.source_resource_dir,
+            args.resource_dir,
+            args.revision_coroutines,
+            args.text_implementation,
+            get_storage_file_quantity(args.files),
+            get_numeric_type(args.occasion_bytes),
+            args.write_batch_size,
+            PrefixShard(*args.shard),
+        )
+    )
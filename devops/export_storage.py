@@ -0,0 +1,23 @@
+import argparse
+import asyncio
+
+from devops.auxiliary import programs
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export the active dataset of the Pwned leak record storage to an archive."
+        " The storage is opened with the implementation options it was built with."
+    )
+    parser.add_argument(
+        "resource_dir",
+        type=str,
+        help="The directory where the storage data is located.",
+    )
+    parser.add_argument(
+        "archive",
+        type=str,
+        help="The path of the created archive file or - to write the archive to the standard output.",
+    )
+
+    args = parser.parse_args()
+    asyncio.run(programs.export_storage(args.resource_dir, args.archive))
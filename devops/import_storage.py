@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+
+from devops.auxiliary import programs
+from devops.common.utils import (
+    NUMERIC_TYPE_INT_OPTIONS,
+    STORAGE_FILE_QUANTITY_INT_OPTIONS,
+    get_numeric_type,
+    get_storage_file_quantity,
+)
+from storage.models.settings import BinaryPwnedStorageSettings, RevisionSettings
+from storage.models.shard import PrefixShard
+
+if __name__ == "__main__":
+    default_file_quantity = BinaryPwnedStorageSettings.DEFAULT_FILE_QUANTITY.value
+    default_occasion_byte_number = (
+        BinaryPwnedStorageSettings.DEFAULT_OCCASION_NUMERIC_TYPE.value
+    )
+    default_retained_generation_quantity = (
+        RevisionSettings.DEFAULT_RETAINED_GENERATION_QUANTITY
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Import an archive of a dataset to the Pwned leak record storage and make the dataset active."
+        " An existing storage is opened with the implementation options it was built with."
+    )
+    parser.add_argument(
+        "resource_dir",
+        type=str,
+        help="The directory where the storage data is located.",
+    )
+    parser.add_argument(
+        "archive",
+        type=str,
+        help="The path of the archive file or - to read the archive from the standard input.",
+    )
+    parser.add_argument(
+        "-t",
+        "--text-implementation",
+        action="store_true",
+        help="Whether the storage uses the text implementation. The binary implementation is used by default."
+        " The implementation options are used only if the directory contains no storage yet.",
+    )
+    parser.add_argument(
+        "-f",
+        "--files",
+        type=int,
+        choices=STORAGE_FILE_QUANTITY_INT_OPTIONS,
+        default=default_file_quantity,
+        help="The number of files (batches) the storage data is stored in (for binary implementation)."
+        f" Default: {default_file_quantity}.",
+    )
+    parser.add_argument(
+        "-b",
+        "--occasion-bytes",
+        type=int,
+        choices=NUMERIC_TYPE_INT_OPTIONS,
+        default=default_occasion_byte_number,
+        help="The size of the stored leak occasion unsigned number in bytes (for binary implementation)."
+        f" Default: {default_occasion_byte_number}.",
+    )
+    parser.add_argument(
+        "--shard",
+        type=int,
+        nargs=2,
+        metavar=("INDEX", "QUANTITY"),
+        default=(0, 1),
+        help="The shard INDEX whose ranges the storage stores."
+        " The prefix space is split into QUANTITY consecutive shards. Default: 0 1.",
+    )
+
+    parser.add_argument(
+        "--retained-generations",
+        type=int,
+        metavar="NUMBER",
+        default=default_retained_generation_quantity,
+        help="The number of previous datasets retained for rollback."
+        f" Default: {default_retained_generation_quantity}.",
+    )
+
+    args = parser.parse_args()
+    asyncio.run(
+        programs.import_storage(
+            args.resource_dir,
+            args.archive,
+            args.text_implementation,
+            get_storage_file_quantity(args.files),
+            get_numeric_type(args.occasion_bytes),
+            args.retained_generations,
+            PrefixShard(*args.shard),
+        )
+    )
@@ -0,0 +1,25 @@
+import argparse
+import asyncio
+
+from devops.auxiliary import programs
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Roll the Pwned leak record storage back to a retained dataset."
+        " The storage is opened with the implementation options it was built with."
+    )
+    parser.add_argument(
+        "resource_dir",
+        type=str,
+        help="The directory where the storage data is located.",
+    )
+    parser.add_argument(
+        "generation",
+        type=int,
+        nargs="?",
+        help="The generation of the retained dataset to make active. "
+        "The active and retained generations are listed if it is omitted.",
+    )
+
+    args = parser.parse_args()
+    asyncio.run(programs.rollback_storage(args.resource_dir, args.generation))
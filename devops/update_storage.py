@@ -9,7 +9,8 @@ from devops.common.utils import (
     get_storage_file_quantity,
 )
 from storage.implementations.storage_base import PwnedStorageBase
-from storage.models.settings import BinaryPwnedStorageSettings
+from storage.models.settings import BinaryPwnedStorageSettings, RevisionSettings
+from storage.models.shard import PrefixShard
 
 if __name__ == "__main__":
     default_revision_coroutine_quantity = (
@@ -19,6 +20,12 @@ if __name__ == "__main__":
     default_occasion_byte_number = (
         BinaryPwnedStorageSettings.DEFAULT_OCCASION_NUMERIC_TYPE.value
     )
+    default_purge_file_rate = RevisionSettings.DEFAULT_PURGE_FILE_RATE
+    default_purge_byte_rate = RevisionSettings.DEFAULT_PURGE_BYTE_RATE
+    default_write_batch_size = RevisionSettings.DEFAULT_WRITE_BATCH_SIZE
+    default_retained_generation_quantity = (
+        RevisionSettings.DEFAULT_RETAINED_GENERATION_QUANTITY
+    )
 
     parser = argparse.ArgumentParser(
         description="Update the Pwned leak record storage."
@@ -31,7 +38,8 @@ if __name__ == "__main__":
     parser.add_argument(
         "user_agent",
         type=str,
-        help="The user agent header value to be sent to the Pwned API. "
+        nargs="?",
+        help="The user agent header value to be sent to the Pwned API (required unless a file is imported). "
         "For more details, see: https://haveibeenpwned.com/API/v2#UserAgent",
     )
     parser.add_argument(
@@ -75,7 +83,97 @@ if __name__ == "__main__":
         f" Default: {default_occasion_byte_number}.",
     )
 
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        action="store_true",
+        help="Whether to reuse unchanged data of the active dataset instead of rewriting it.",
+    )
+    parser.add_argument(
+        "--in-place",
+        action="store_true",
+        help="Whether to replace data files of the active dataset one by one instead of preparing a new dataset"
+        " (for binary implementation). Requires free space for a single data file instead of a whole dataset.",
+    )
+    parser.add_argument(
+        "--refresh",
+        type=str,
+        nargs=2,
+        metavar=("FIRST_PREFIX", "LAST_PREFIX"),
+        help="Request only the ranges of the given hash prefixes (e.g. 0ABCD 0ABFF) again"
+        " and replace the affected data of the active dataset instead of updating the whole storage.",
+    )
+    parser.add_argument(
+        "--refresh-hot",
+        type=int,
+        metavar="NUMBER",
+        help="Request only the ranges of the given number of the most requested hash prefixes again"
+        " and replace their data of the active dataset instead of updating the whole storage.",
+    )
+    parser.add_argument(
+        "--popularity-ordered",
+        action="store_true",
+        help="Whether to update the most requested hash prefixes first.",
+    )
+    parser.add_argument(
+        "--import-file",
+        type=str,
+        metavar="PATH",
+        help="The downloaded Pwned hash file (SHA-1, ordered by hash) to build the storage from instead of the API.",
+    )
+    parser.add_argument(
+        "--shard",
+        type=int,
+        nargs=2,
+        metavar=("INDEX", "QUANTITY"),
+        default=(0, 1),
+        help="Store only the ranges of the hash prefixes of the shard INDEX."
+        " The prefix space is split into QUANTITY consecutive shards. Default: 0 1.",
+    )
+
+    parser.add_argument(
+        "--purge-file-rate",
+        type=int,
+        metavar="NUMBER",
+        default=default_purge_file_rate or 0,
+        help="The maximum number of old data files removed per second (0 for no limit)."
+        f" Default: {default_purge_file_rate or 0}.",
+    )
+    parser.add_argument(
+        "--purge-byte-rate",
+        type=int,
+        metavar="NUMBER",
+        default=default_purge_byte_rate or 0,
+        help="The maximum size of old data files in bytes removed per second (0 for no limit)."
+        f" Default: {default_purge_byte_rate or 0}.",
+    )
+    parser.add_argument(
+        "--write-byte-rate",
+        type=int,
+        metavar="NUMBER",
+        default=0,
+        help="The maximum size of revision data in bytes written per second (0 for no limit). Default: 0.",
+    )
+    parser.add_argument(
+        "--write-batch-size",
+        type=int,
+        metavar="NUMBER",
+        default=default_write_batch_size,
+        help="The size of buffered revision data in bytes written to a file at once."
+        f" Default: {default_write_batch_size}.",
+    )
+    parser.add_argument(
+        "--retained-generations",
+        type=int,
+        metavar="NUMBER",
+        default=default_retained_generation_quantity,
+        help="The number of previous datasets retained for rollback."
+        f" Default: {default_retained_generation_quantity}.",
+    )
+
     args = parser.parse_args()
+    if args.user_agent is None and args.import_file is None:
+        parser.error("the user_agent argument is required unless --import-file is used")
     asyncio.run(
         programs.update_storage(
             args.resource_dir,
@@ -85,5 +183,17 @@ if __name__ == "__main__":
             args.text_implementation,
             get_storage_file_quantity(args.files),
             get_numeric_type(args.occasion_bytes),
+            args.incremental,
+            args.import_file,
+            args.purge_file_rate or None,
+            args.purge_byte_rate or None,
+            args.write_byte_rate or None,
+            args.write_batch_size,
+            args.in_place,
+            args.retained_generations,
+            args.refresh,
+            args.popularity_ordered,
+            args.refresh_hot,
+            PrefixShard(*args.shard),
         )
     )
@@ -77,6 +77,164 @@ def remove_file(path: str) -> None:
         os.remove(path)
 
 
+def list_dir(path: str) -> List[str]:
+    """
+    List names of the entries in a directory.
+
+    :param path: The directory path.
+    :return: The entry names.
+    """
+    return os.listdir(path)
+
+
+def append_file(path: str, source_path: str) -> None:
+    """
+    Append the contents of a file to another file.
+    The target file is restored to its original size if the operation fails.
+
+    :param path: The path to the file to be appended to.
+    :param source_path: The path to the file to be appended.
+    """
+    with open(path, "ab") as file:
+        original_size = file.tell()
+        try:
+            with open(source_path, "rb") as source_file:
+                shutil.copyfileobj(source_file, file)
+        except Exception:
+            file.truncate(original_size)
+            raise
+
+
+def get_file_size(path: str) -> int:
+    """
+    Get the size of a file.
+
+    :param path: The file path.
+    :return: The size of the file in bytes.
+    """
+    return os.path.getsize(path)
+
+
+def truncate_file(path: str, size: int) -> None:
+    """
+    Truncate a file to the specified size.
+
+    :param path: The file path.
+    :param size: The new size of the file in bytes.
+    """
+    os.truncate(path, size)
+
+
+def get_link_count(path: str) -> int:
+    """
+    Get the quantity of hard links to a file.
+
+    :param path: The file path.
+    :return: The quantity of hard links.
+    """
+    return os.stat(path).st_nlink
+
+
+def link_file(path: str, source_path: str) -> None:
+    """
+    Create a hard link to a file or copy the file if hard links are not supported.
+    An existing file at the target path is replaced.
+
+    :param path: The path to the link to be created.
+    :param source_path: The path to the linked file.
+    """
+    remove_file(path)
+    try:
+        os.link(source_path, path)
+    except OSError:
+        shutil.copyfile(source_path, path)
+
+
+def copy_file(path: str, source_path: str) -> None:
+    """
+    Copy a file. An existing file at the target path is replaced.
+
+    :param path: The path to the copy.
+    :param source_path: The path to the copied file.
+    """
+    shutil.copyfile(source_path, path)
+
+
+def replace_file(path: str, source_path: str) -> None:
+    """
+    Replace a file with another file so that the path refers to either the previous file or the new one.
+    The new file is committed to disk before the replacement.
+
+    :param path: The path to the replaced file.
+    :param source_path: The path to the new file.
+    """
+    sync_file(source_path)
+    os.replace(source_path, path)
+    # The source path is left as is if both paths refer to the same file.
+    remove_file(source_path)
+
+
+def sync_file(path: str) -> None:
+    """
+    Commit the buffered data of a file to disk.
+    :param path: The file path.
+    """
+    with open(path, "rb") as file:
+        os.fsync(file.fileno())
+
+
+def sync_dir(path: str) -> None:
+    """
+    Commit the entries of a directory to disk if the platform supports it.
+    :param path: The directory path.
+    """
+    if os.name != "posix":
+        return
+    descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def write_atomically(path: str, content: bytes) -> None:
+    """
+    Write bytes to a file so that the file contains either its previous content or the new one.
+
+    :param path: The file path.
+    :param content: The content to write.
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+def write_if_not_exists(path: str, content: bytes) -> bool:
+    """
+    Write bytes to a new file so that concurrent writers never replace each other's content
+    and readers never see a partially written file.
+
+    :param path: The file path.
+    :param content: The content to write.
+    :return: True if the file has been written, False if it already exists.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+    try:
+        os.link(temp_path, path)
+    except FileExistsError:
+        return False
+    finally:
+        remove_file(temp_path)
+    return True
+
+
 def read(path: str, binary=False, encoding: Optional[Encoding] = None) -> str:
     """
     Read the contents of a file.
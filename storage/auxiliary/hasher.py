@@ -9,3 +9,17 @@ def sha1(text: str) -> str:
     :return: The hexadecimal representation of the SHA-1 hash value in uppercase.
     """
     return hashlib.sha1(text.encode(encoding="ascii")).hexdigest().upper()
+
+
+def sha256_file(path: str) -> str:
+    """
+    Calculate the SHA-256 checksum of a file.
+
+    :param path: The file path.
+    :return: The hexadecimal representation of the checksum in lowercase.
+    """
+    checksum = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            checksum.update(chunk)
+    return checksum.hexdigest()
@@ -0,0 +1,199 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from json import JSONDecodeError
+from typing import Dict, List, Optional, Tuple
+
+from storage.auxiliary.filetools import (
+    is_dir,
+    is_file,
+    join_paths,
+    list_dir,
+    make_dir_if_not_exists,
+    read,
+    remove_file,
+    write_atomically,
+)
+from storage.auxiliary.processes import is_process_running
+
+logger = logging.getLogger(__name__)
+
+
+class CommandChannel:
+    """
+    Passes commands from processes sharing a directory to the process that executes them.
+    Each command and each result is written to its own file, so that processes never write the same file.
+    """
+
+    REQUEST_FILE_EXTENSION: str = "request"
+    """The extension of command files."""
+
+    RESULT_FILE_EXTENSION: str = "result"
+    """The extension of command result files."""
+
+    ACKNOWLEDGEMENT_FILE_EXTENSION: str = "ack"
+    """The extension of the files where processes acknowledge the state they have switched to."""
+
+    POLLING_INTERVAL_SECONDS: float = 0.1
+    """Time in seconds between checks for a command result."""
+
+    STALE_RESULT_SECONDS: float = 3600
+    """Time in seconds after which the results nobody has received are removed."""
+
+    class __JsonKeys:
+        ACTION = "action"
+        ARGUMENTS = "arguments"
+        IS_AWAITED = "awaited"
+
+    def __init__(self, command_dir: str):
+        """
+        Initialize a new CommandChannel instance.
+        :param command_dir: The path to the directory for command files.
+        """
+        self.__command_dir: str = command_dir
+
+    def send(
+        self, action: str, arguments: Optional[Dict] = None, is_awaited: bool = False
+    ) -> str:
+        """
+        Send a command.
+
+        :param action: The name of the action to perform.
+        :param arguments: The JSON arguments of the action.
+        :param is_awaited: Whether the result of the command is going to be awaited with receive_result.
+        :return: The command identifier.
+        """
+        make_dir_if_not_exists(self.__command_dir)
+        command_id = f"{time.time_ns()}-{os.getpid()}"
+        command = {
+            self.__JsonKeys.ACTION: action,
+            self.__JsonKeys.ARGUMENTS: arguments or dict(),
+            self.__JsonKeys.IS_AWAITED: is_awaited,
+        }
+        write_atomically(
+            self.__get_path(command_id, self.REQUEST_FILE_EXTENSION),
+            json.dumps(command).encode(),
+        )
+        return command_id
+
+    async def receive_result(
+        self, command_id: str, timeout_seconds: float
+    ) -> Optional[Dict]:
+        """
+        Wait for the result of an awaited command.
+        If the result is not received in time, the command is withdrawn unless it has already been taken.
+
+        :param command_id: The command identifier.
+        :param timeout_seconds: The maximum time in seconds to wait for the result.
+        :return: The JSON result or None if it has not been received in time.
+        """
+        result_path = self.__get_path(command_id, self.RESULT_FILE_EXTENSION)
+        deadline = time.monotonic() + timeout_seconds
+        while not is_file(result_path):
+            if time.monotonic() >= deadline:
+                remove_file(self.__get_path(command_id, self.REQUEST_FILE_EXTENSION))
+                return None
+            await asyncio.sleep(self.POLLING_INTERVAL_SECONDS)
+        result = json.loads(read(result_path))
+        remove_file(result_path)
+        return result
+
+    def take_commands(self) -> List[Tuple[str, str, Dict, bool]]:
+        """
+        Take all sent commands in the order they were sent.
+        :return: The identifier, action, arguments and awaited flag of each command.
+        """
+        commands = list()
+        if not is_dir(self.__command_dir):
+            return commands
+        request_suffix = f".{self.REQUEST_FILE_EXTENSION}"
+        result_suffix = f".{self.RESULT_FILE_EXTENSION}"
+        for name in sorted(list_dir(self.__command_dir)):
+            if name.endswith(result_suffix):
+                self.__remove_if_stale(join_paths(self.__command_dir, name))
+            if not name.endswith(request_suffix):
+                continue
+            path = join_paths(self.__command_dir, name)
+            try:
+                command = json.loads(read(path))
+            except (OSError, JSONDecodeError):
+                logger.exception(f"Failed to read the command file {path}.")
+                continue
+            finally:
+                remove_file(path)
+            if not isinstance(command, dict):
+                continue
+            commands.append(
+                (
+                    name[: -len(request_suffix)],
+                    command.get(self.__JsonKeys.ACTION),
+                    command.get(self.__JsonKeys.ARGUMENTS, dict()),
+                    command.get(self.__JsonKeys.IS_AWAITED, False),
+                )
+            )
+        return commands
+
+    def send_result(self, command_id: str, result: Dict) -> None:
+        """
+        Send the result of an awaited command.
+
+        :param command_id: The command identifier.
+        :param result: The JSON result.
+        """
+        write_atomically(
+            self.__get_path(command_id, self.RESULT_FILE_EXTENSION),
+            json.dumps(result).encode(),
+        )
+
+    def acknowledge(self, state: Dict) -> None:
+        """
+        Record the state the current process has switched to.
+        :param state: The JSON state.
+        """
+        make_dir_if_not_exists(self.__command_dir)
+        write_atomically(
+            self.__get_path(str(os.getpid()), self.ACKNOWLEDGEMENT_FILE_EXTENSION),
+            json.dumps(state).encode(),
+        )
+
+    def withdraw_acknowledgement(self) -> None:
+        """Remove the state recorded by the current process."""
+        remove_file(
+            self.__get_path(str(os.getpid()), self.ACKNOWLEDGEMENT_FILE_EXTENSION)
+        )
+
+    def get_acknowledgements(self) -> List[Dict]:
+        """
+        Get the states recorded by the running processes.
+        The states of the processes that have exited are removed.
+        :return: The JSON states.
+        """
+        acknowledgements = list()
+        if not is_dir(self.__command_dir):
+            return acknowledgements
+        acknowledgement_suffix = f".{self.ACKNOWLEDGEMENT_FILE_EXTENSION}"
+        for name in list_dir(self.__command_dir):
+            if not name.endswith(acknowledgement_suffix):
+                continue
+            path = join_paths(self.__command_dir, name)
+            process_id = name[: -len(acknowledgement_suffix)]
+            if not process_id.isdigit() or not is_process_running(int(process_id)):
+                remove_file(path)
+                continue
+            try:
+                acknowledgements.append(json.loads(read(path)))
+            except (OSError, JSONDecodeError):
+                continue
+        return acknowledgements
+
+    def __remove_if_stale(self, path: str) -> None:
+        try:
+            if time.time() - os.path.getmtime(path) > self.STALE_RESULT_SECONDS:
+                remove_file(path)
+        except OSError:
+            pass
+
+    def __get_path(self, command_id: str, extension: str) -> str:
+        return join_paths(self.__command_dir, f"{command_id}.{extension}")
@@ -0,0 +1,142 @@
+import os
+import threading
+from typing import Callable, List
+
+from storage.auxiliary.filetools import is_file, sync_file
+
+
+class DataFileWriter:
+    """
+    Buffered writer that appends prefix ranges to a data file.
+    A range is reported as written only after all its data has been passed to the operating system.
+    """
+
+    DEFAULT_BATCH_SIZE: int = 64 * 1024
+    """The default size of buffered data in bytes after which the buffer is written to the file."""
+
+    COPY_BLOCK_SIZE: int = 1024 * 1024
+    """The size of blocks in bytes in which data is copied from other files."""
+
+    def __init__(
+        self,
+        path: str,
+        on_range_written: Callable[[int], None],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        """
+        Initialize a new DataFileWriter instance.
+
+        :param path: The path to the data file.
+        :param on_range_written: The callback that receives the prefix index of each written range.
+        :param batch_size: The size of buffered data in bytes after which the buffer is written to the file.
+        """
+        self.__path: str = path
+        self.__file = open(path, "ab", buffering=0)
+        self.__file_size: int = self.__file.tell()
+        self.__on_range_written: Callable[[int], None] = on_range_written
+        self.__batch_size: int = batch_size
+        self.__buffer: bytearray = bytearray()
+        self.__buffered_prefix_indices: List[int] = list()
+        self.__range_position: int = self.__file_size
+        self.__descriptor_lock: threading.Lock = threading.Lock()
+
+    def __enter__(self) -> "DataFileWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def start_range(self) -> None:
+        """Indicate that the data of a new range is going to be written."""
+        self.__range_position = self.__file_size + len(self.__buffer)
+
+    def write(self, data: bytes) -> None:
+        """
+        Write data of the current range.
+        :param data: The data.
+        """
+        self.__buffer += data
+        if len(self.__buffer) >= self.__batch_size:
+            self.flush()
+
+    def finish_range(self, prefix_index: int) -> None:
+        """
+        Indicate that all data of the current range has been written.
+        :param prefix_index: The prefix index of the range.
+        """
+        self.__buffered_prefix_indices.append(prefix_index)
+        if not self.__buffer:
+            self.flush()
+
+    def copy(self, source_path: str, position: int, size: int) -> None:
+        """
+        Write data of the current range copied from another file.
+        The data is written directly to the file, and no range is reported as written
+        until the next range is finished, so the method may be called from another thread.
+
+        :param source_path: The path to the source file.
+        :param position: The position of the data in the source file in bytes.
+        :param size: The size of the data in bytes.
+        """
+        self.__write_buffer()
+        with open(source_path, "rb", buffering=0) as source_file:
+            source_file.seek(position)
+            while size > 0:
+                data = source_file.read(min(self.COPY_BLOCK_SIZE, size))
+                if not data:
+                    raise EOFError("The source file is shorter than expected.")
+                self.__write_all(data)
+                size -= len(data)
+
+    def discard_range(self) -> None:
+        """Discard all data of the current range."""
+        if self.__range_position >= self.__file_size:
+            del self.__buffer[self.__range_position - self.__file_size :]
+            return
+        self.__buffer.clear()
+        self.__file.truncate(self.__range_position)
+        self.__file_size = self.__range_position
+
+    def flush(self) -> None:
+        """Write all buffered data to the file."""
+        self.__write_buffer()
+        for prefix_index in self.__buffered_prefix_indices:
+            self.__on_range_written(prefix_index)
+        self.__buffered_prefix_indices.clear()
+
+    def sync(self) -> None:
+        """
+        Commit the data written to the file to disk. Buffered data is not written.
+        The method may be called from another thread, also after the file is closed.
+        """
+        with self.__descriptor_lock:
+            descriptor = None if self.__file.closed else os.dup(self.__file.fileno())
+        if descriptor is None:
+            # The file may be removed after it is closed, for example, once its segment is merged.
+            if is_file(self.__path):
+                sync_file(self.__path)
+            return
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    def close(self) -> None:
+        """Write all buffered data and close the file."""
+        try:
+            self.flush()
+        finally:
+            with self.__descriptor_lock:
+                self.__file.close()
+
+    def __write_buffer(self) -> None:
+        self.__write_all(self.__buffer)
+        self.__buffer.clear()
+
+    def __write_all(self, data: bytes) -> None:
+        view = memoryview(data)
+        written_size = 0
+        while written_size < len(view):
+            written_size += self.__file.write(view[written_size:])
+        view.release()
+        self.__file_size += written_size
@@ -0,0 +1,181 @@
+import asyncio
+from typing import Callable, Optional
+
+from storage.auxiliary.filetools import get_file_size, link_file
+from storage.auxiliary.implementations.data_file_writer import DataFileWriter
+from storage.auxiliary.implementations.record_search import PwnedRecordSearch
+from storage.auxiliary.numeration import number_to_hex_code
+from storage.models.pwned import PWNED_PREFIX_CAPACITY
+
+
+class DataSegmentBuilder:
+    """
+    Builds a data file segment from received ranges and unchanged ranges of the previous data file.
+    Consecutive unchanged ranges are copied at once, and the previous data file is linked as a whole
+    if all its ranges are unchanged.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        file_first_prefix_index: int,
+        file_end_prefix_index: int,
+        on_range_written: Callable[[int], None],
+        record_search: PwnedRecordSearch,
+        previous_data_file_path: Optional[str] = None,
+        on_data_written: Optional[Callable[[int], None]] = None,
+        batch_size: int = DataFileWriter.DEFAULT_BATCH_SIZE,
+    ):
+        """
+        Initialize a new DataSegmentBuilder instance.
+
+        :param path: The path to the segment.
+        :param file_first_prefix_index: The index of the first prefix of the data file.
+        :param file_end_prefix_index: The index of the prefix following the last prefix of the data file.
+        :param on_range_written: The callback that receives the prefix index of each written range.
+        :param record_search: The record search for the previous data file.
+        :param previous_data_file_path: The path to the previous data file if ranges may be reused.
+        :param on_data_written: The callback that receives the size of each written piece of data in bytes.
+        :param batch_size: The size of buffered data in bytes after which it is written to the segment.
+        """
+        self.__path: str = path
+        self.__file_first_prefix_index: int = file_first_prefix_index
+        self.__file_end_prefix_index: int = file_end_prefix_index
+        self.__on_range_written: Callable[[int], None] = on_range_written
+        self.__record_search: PwnedRecordSearch = record_search
+        self.__previous_data_file_path: Optional[str] = previous_data_file_path
+        self.__on_data_written: Optional[Callable[[int], None]] = on_data_written
+        self.__batch_size: int = batch_size
+        self.__writer: Optional[DataFileWriter] = None
+        self.__reused_first_prefix_index: Optional[int] = None
+        self.__reused_end_prefix_index: Optional[int] = None
+        self.__is_closed: bool = False
+
+    @property
+    def is_closed(self) -> bool:
+        """
+        Check if the segment is closed.
+        :return: True if the segment is closed, False otherwise.
+        """
+        return self.__is_closed
+
+    async def start_range(self) -> None:
+        """Indicate that the data of a new received range is going to be written."""
+        await self.__write_reused_ranges()
+        self.__get_writer().start_range()
+
+    def write(self, data: bytes) -> None:
+        """
+        Write data of the current received range.
+        :param data: The data.
+        """
+        self.__writer.write(data)
+        self.__count_written(len(data))
+
+    def finish_range(self, prefix_index: int) -> None:
+        """
+        Indicate that all data of the current received range has been written.
+        :param prefix_index: The prefix index of the range.
+        """
+        self.__writer.finish_range(prefix_index)
+
+    def discard_range(self) -> None:
+        """Discard all data of the current received range."""
+        self.__writer.discard_range()
+
+    async def write_range(self, prefix_index: int, data: bytes) -> None:
+        """
+        Write all data of a received range.
+
+        :param prefix_index: The prefix index of the range.
+        :param data: The data.
+        """
+        await self.start_range()
+        self.write(data)
+        self.finish_range(prefix_index)
+
+    def reuse_range(self, prefix_index: int) -> None:
+        """
+        Indicate that a range is unchanged and has to be taken from the previous data file.
+        :param prefix_index: The prefix index of the range.
+        """
+        if self.__reused_first_prefix_index is None:
+            self.__reused_first_prefix_index = prefix_index
+        self.__reused_end_prefix_index = prefix_index + 1
+
+    async def close(self) -> None:
+        """Write all remaining data and close the segment."""
+        try:
+            if (
+                self.__writer is None
+                and self.__reused_first_prefix_index == self.__file_first_prefix_index
+                and self.__reused_end_prefix_index == self.__file_end_prefix_index
+            ):
+                link_file(self.__path, self.__previous_data_file_path)
+                self.__count_reused_ranges()
+            else:
+                await self.__write_reused_ranges()
+        finally:
+            if self.__writer is not None:
+                self.__writer.close()
+            self.__is_closed = True
+
+    def sync(self) -> None:
+        """
+        Commit the written data of the segment to disk.
+        The method may be called from another thread, also after the segment is closed.
+        """
+        writer = self.__writer
+        if writer is not None:
+            writer.sync()
+
+    def __get_writer(self) -> DataFileWriter:
+        if self.__writer is None:
+            self.__writer = DataFileWriter(
+                self.__path, self.__on_range_written, self.__batch_size
+            )
+        return self.__writer
+
+    async def __write_reused_ranges(self) -> None:
+        if self.__reused_first_prefix_index is None:
+            return
+        position = self.__find_position(self.__reused_first_prefix_index)
+        size = self.__find_position(self.__reused_end_prefix_index) - position
+        writer = self.__get_writer()
+        writer.start_range()
+        try:
+            await asyncio.to_thread(
+                writer.copy, self.__previous_data_file_path, position, size
+            )
+        except Exception:
+            writer.discard_range()
+            raise
+        self.__count_written(size)
+        for prefix_index in range(
+            self.__reused_first_prefix_index, self.__reused_end_prefix_index
+        ):
+            writer.finish_range(prefix_index)
+        self.__reused_first_prefix_index = None
+        self.__reused_end_prefix_index = None
+
+    def __count_written(self, size: int) -> None:
+        if self.__on_data_written is not None:
+            self.__on_data_written(size)
+
+    def __count_reused_ranges(self) -> None:
+        for prefix_index in range(
+            self.__reused_first_prefix_index, self.__reused_end_prefix_index
+        ):
+            self.__on_range_written(prefix_index)
+        self.__reused_first_prefix_index = None
+        self.__reused_end_prefix_index = None
+
+    def __find_position(self, prefix_index: int) -> int:
+        if prefix_index == self.__file_first_prefix_index:
+            return 0
+        if prefix_index == self.__file_end_prefix_index:
+            return get_file_size(self.__previous_data_file_path)
+        return self.__record_search.find_range_position(
+            number_to_hex_code(prefix_index, PWNED_PREFIX_CAPACITY),
+            self.__previous_data_file_path,
+        )
@@ -0,0 +1,134 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+from typing import BinaryIO, Dict, Iterator, Tuple
+
+from storage.models.manifest import DatasetFile
+
+
+class DatasetArchiveWriter:
+    """
+    Writes dataset files to a tar archive stream strictly sequentially,
+    so the archive can be sent to a pipe or an object storage upload as it is written.
+    """
+
+    def __init__(self, archive: BinaryIO):
+        """
+        Initialize a new DatasetArchiveWriter instance.
+        :param archive: The writable binary stream of the archive.
+        """
+        self.__tar: tarfile.TarFile = tarfile.open(fileobj=archive, mode="w|")
+
+    def write_json(self, name: str, content: Dict) -> None:
+        """
+        Write a JSON member to the archive.
+
+        :param name: The member name.
+        :param content: The JSON content.
+        """
+        data = json.dumps(content).encode()
+        member = tarfile.TarInfo(name)
+        member.size = len(data)
+        self.__tar.addfile(member, io.BytesIO(data))
+
+    def write_file(self, path: str) -> DatasetFile:
+        """
+        Write a file to the archive under its base name.
+
+        :param path: The file path.
+        :return: The description of the written file content.
+        """
+        with open(path, "rb") as file:
+            # The size is taken from the opened file, since the path may be replaced in the meantime.
+            stat = os.fstat(file.fileno())
+            member = tarfile.TarInfo(os.path.basename(path))
+            member.size = stat.st_size
+            member.mtime = int(stat.st_mtime)
+            reader = _ChecksumReader(file)
+            self.__tar.addfile(member, reader)
+        return DatasetFile(member.name, member.size, reader.checksum)
+
+    def close(self) -> None:
+        """Finish the archive. The stream itself is not closed."""
+        self.__tar.close()
+
+
+class DatasetArchiveReader:
+    """Reads the members of a tar archive stream written by DatasetArchiveWriter strictly sequentially."""
+
+    COPY_CHUNK_SIZE: int = 1024 * 1024
+    """The size in bytes of the pieces in which member content is copied."""
+
+    def __init__(self, archive: BinaryIO):
+        """
+        Initialize a new DatasetArchiveReader instance.
+        :param archive: The readable binary stream of the archive.
+        """
+        self.__tar: tarfile.TarFile = tarfile.open(fileobj=archive, mode="r|")
+
+    def members(self) -> Iterator[Tuple[str, BinaryIO]]:
+        """
+        Iterate over the members of the archive.
+        Content of a member can only be read until the next member is requested.
+
+        :return: An iterator over the names and contents of the members.
+        :raises ValueError: If the archive contains anything but regular files.
+        """
+        for member in self.__tar:
+            if not member.isfile():
+                raise ValueError(f"The archive member {member.name} is not a file.")
+            yield member.name, self.__tar.extractfile(member)
+
+    @staticmethod
+    def read_json(content: BinaryIO) -> Dict:
+        """
+        Read JSON content of a member.
+
+        :param content: The content of the member.
+        :return: The JSON content.
+        """
+        return json.load(content)
+
+    def copy_file(self, name: str, content: BinaryIO, path: str) -> DatasetFile:
+        """
+        Copy content of a member to a file.
+
+        :param name: The name of the member.
+        :param content: The content of the member.
+        :param path: The path of the created file.
+        :return: The description of the copied file content.
+        """
+        reader = _ChecksumReader(content)
+        with open(path, "wb") as file:
+            shutil.copyfileobj(reader, file, self.COPY_CHUNK_SIZE)
+        return DatasetFile(name, reader.size, reader.checksum)
+
+    def close(self) -> None:
+        """Stop reading the archive. The stream itself is not closed."""
+        self.__tar.close()
+
+
+class _ChecksumReader:
+    """Calculates the SHA-256 checksum of the content read from a file."""
+
+    def __init__(self, file: BinaryIO):
+        self.__file: BinaryIO = file
+        self.__checksum = hashlib.sha256()
+        self.__size: int = 0
+
+    @property
+    def checksum(self) -> str:
+        return self.__checksum.hexdigest()
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.__file.read(size)
+        self.__checksum.update(chunk)
+        self.__size += len(chunk)
+        return chunk
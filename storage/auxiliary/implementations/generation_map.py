@@ -0,0 +1,78 @@
+import os
+from typing import List, Optional
+
+from storage.auxiliary.filetools import is_file, read
+
+
+class DataFileGenerationMap:
+    """
+    Persistent map of data file indices to the generations of their data.
+    Each generation is written to its own place in the map file, so that recording a replaced data file
+    does not require rewriting the whole map.
+    """
+
+    GENERATION_SIZE: int = 8
+    """The size of a stored generation in bytes."""
+
+    __UNKNOWN_GENERATION: int = 0
+
+    def __init__(self, path: str):
+        """
+        Initialize a new DataFileGenerationMap instance.
+        :param path: The path to the map file.
+        """
+        self.__path: str = path
+
+    def get(self, file_index: int) -> Optional[int]:
+        """
+        Get the generation of a data file.
+
+        :param file_index: The index of the data file.
+        :return: The generation or None if it is unknown.
+        """
+        if not is_file(self.__path):
+            return None
+        with open(self.__path, "rb") as file:
+            file.seek(file_index * self.GENERATION_SIZE)
+            content = file.read(self.GENERATION_SIZE)
+        return self.__parse(content)
+
+    def set(self, file_index: int, generation: int) -> None:
+        """
+        Set the generation of a data file.
+
+        :param file_index: The index of the data file.
+        :param generation: The generation.
+        """
+        descriptor = os.open(self.__path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            os.pwrite(
+                descriptor,
+                generation.to_bytes(self.GENERATION_SIZE, "big", signed=False),
+                file_index * self.GENERATION_SIZE,
+            )
+        finally:
+            os.close(descriptor)
+
+    def find(self, generation: int) -> List[int]:
+        """
+        Find data files of a generation.
+
+        :param generation: The generation.
+        :return: The indices of the data files.
+        """
+        if not is_file(self.__path):
+            return list()
+        content = read(self.__path, binary=True)
+        return [
+            offset // self.GENERATION_SIZE
+            for offset in range(0, len(content), self.GENERATION_SIZE)
+            if self.__parse(content[offset : offset + self.GENERATION_SIZE])
+            == generation
+        ]
+
+    def __parse(self, content: bytes) -> Optional[int]:
+        if len(content) != self.GENERATION_SIZE:
+            return None
+        generation = int.from_bytes(content, "big", signed=False)
+        return None if generation == self.__UNKNOWN_GENERATION else generation
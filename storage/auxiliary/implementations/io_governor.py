@@ -0,0 +1,132 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class IOGovernor:
+    """
+    Limits the rate of revision writes.
+    The rate is halved while lookups are slower than the target latency and then gradually restored.
+    """
+
+    MIN_WRITE_BYTE_RATE: float = 64 * 1024
+    """The minimum write rate in bytes per second that backoff can lead to."""
+
+    BACKOFF_INTERVAL_SECONDS: float = 1
+    """The minimum time in seconds between consecutive backoffs."""
+
+    RECOVERY_SECONDS: float = 30
+    """The time in seconds during which a halved rate is restored if lookups are fast enough."""
+
+    MEASUREMENT_INTERVAL_SECONDS: float = 1
+    """The interval in seconds in which the actual write rate is measured."""
+
+    def __init__(
+        self,
+        write_byte_rate: Optional[int] = None,
+        lookup_latency_target: Optional[float] = None,
+    ):
+        """
+        Initialize a new IOGovernor instance.
+
+        :param write_byte_rate: The maximum write rate in bytes per second. Not limited by default.
+        :param lookup_latency_target: The lookup latency in seconds above which writes are slowed down.
+          Writes are not slowed down because of lookups by default.
+        """
+        self.__max_write_byte_rate: Optional[float] = write_byte_rate
+        self.__lookup_latency_target: Optional[float] = lookup_latency_target
+        self.__write_byte_rate: Optional[float] = write_byte_rate
+        self.__available_bytes: float = 0
+        self.__refill_time: float = time.monotonic()
+        self.__backoff_time: float = 0
+        self.__backoff_write_byte_rate: float = 0
+        self.__measured_write_byte_rate: float = 0
+        self.__measurement_start_time: float = time.monotonic()
+        self.__measured_bytes: int = 0
+        self.__written_byte_quantity: int = 0
+
+    @property
+    def written_byte_quantity(self) -> int:
+        """
+        Get the total size of the counted written data.
+        :return: The size in bytes.
+        """
+        return self.__written_byte_quantity
+
+    @property
+    def write_byte_rate(self) -> Optional[float]:
+        """
+        Get the current maximum write rate.
+        :return: The write rate in bytes per second or None if writes are not limited.
+        """
+        return self.__write_byte_rate
+
+    def count_written(self, size: int) -> None:
+        """
+        Count written data.
+        :param size: The size of the data in bytes.
+        """
+        self.__refill()
+        self.__available_bytes -= size
+        self.__written_byte_quantity += size
+        now = time.monotonic()
+        self.__measured_bytes += size
+        elapsed_seconds = now - self.__measurement_start_time
+        if elapsed_seconds >= self.MEASUREMENT_INTERVAL_SECONDS:
+            self.__measured_write_byte_rate = self.__measured_bytes / elapsed_seconds
+            self.__measurement_start_time = now
+            self.__measured_bytes = 0
+
+    def observe_lookup(self, latency: float) -> None:
+        """
+        Take the latency of a lookup into account.
+        :param latency: The latency in seconds.
+        """
+        if self.__lookup_latency_target is None:
+            return
+        if latency <= self.__lookup_latency_target:
+            return
+        now = time.monotonic()
+        if now - self.__backoff_time < self.BACKOFF_INTERVAL_SECONDS:
+            return
+        self.__refill()
+        current_rate = self.__write_byte_rate or max(
+            self.__measured_write_byte_rate, self.MIN_WRITE_BYTE_RATE
+        )
+        if self.__write_byte_rate is None:
+            self.__backoff_write_byte_rate = current_rate
+        self.__write_byte_rate = max(current_rate / 2, self.MIN_WRITE_BYTE_RATE)
+        self.__available_bytes = min(self.__available_bytes, 0)
+        self.__backoff_time = now
+
+    async def throttle(self) -> None:
+        """Wait until writes are allowed by the current write rate."""
+        self.__refill()
+        if self.__write_byte_rate is None or self.__available_bytes >= 0:
+            return
+        await asyncio.sleep(-self.__available_bytes / self.__write_byte_rate)
+
+    def __refill(self) -> None:
+        now = time.monotonic()
+        elapsed_seconds = now - self.__refill_time
+        self.__refill_time = now
+        if self.__write_byte_rate is None:
+            self.__available_bytes = 0
+            return
+        self.__available_bytes = min(
+            self.__available_bytes + elapsed_seconds * self.__write_byte_rate,
+            self.__write_byte_rate,
+        )
+        if now - self.__backoff_time < self.BACKOFF_INTERVAL_SECONDS:
+            return
+        self.__restore(elapsed_seconds)
+
+    def __restore(self, elapsed_seconds: float) -> None:
+        if self.__write_byte_rate == self.__max_write_byte_rate:
+            return
+        reference_rate = self.__max_write_byte_rate or self.__backoff_write_byte_rate
+        self.__write_byte_rate += (
+            reference_rate * elapsed_seconds / self.RECOVERY_SECONDS
+        )
+        if self.__write_byte_rate >= reference_rate:
+            self.__write_byte_rate = self.__max_write_byte_rate
@@ -0,0 +1,56 @@
+import os
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class LeaderLock:
+    """
+    Exclusive file lock that elects a single leader among processes sharing a directory.
+    The lock is released by the operating system when the process holding it exits.
+    If the platform does not support file locks, the lock is always acquired.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize a new LeaderLock instance.
+        :param path: The path to the lock file.
+        """
+        self.__path: str = path
+        self.__descriptor: Optional[int] = None
+
+    @property
+    def is_acquired(self) -> bool:
+        """
+        Check if the lock is held by this instance.
+        :return: True if the lock is acquired, False otherwise.
+        """
+        return self.__descriptor is not None
+
+    def try_acquire(self) -> bool:
+        """
+        Acquire the lock unless it is held by another instance.
+        :return: True if the lock is acquired, False otherwise.
+        """
+        if self.is_acquired:
+            return True
+        descriptor = os.open(self.__path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(descriptor)
+                return False
+        self.__descriptor = descriptor
+        return True
+
+    def release(self) -> None:
+        """Release the lock if it is held by this instance."""
+        if self.__descriptor is None:
+            return
+        # Closing the descriptor releases the lock.
+        os.close(self.__descriptor)
+        self.__descriptor = None
@@ -0,0 +1,140 @@
+import cProfile
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, Optional, TypeVar
+
+from storage.auxiliary.filetools import (
+    join_paths,
+    list_dir,
+    make_dir_if_not_exists,
+    remove_file,
+    write,
+)
+
+TResult = TypeVar("TResult")
+
+logger = logging.getLogger(__name__)
+
+
+class LookupProfiler:
+    """
+    Profiles a random sample of lookups and periodically dumps the aggregated profile
+    together with the stacks of all threads.
+    Dumps are made by a separate thread, so the stacks show what a blocked event loop is doing.
+    """
+
+    DUMP_INTERVAL_SECONDS: float = 60
+    """The time in seconds between dumps."""
+
+    RETAINED_DUMP_QUANTITY: int = 20
+    """The quantity of the latest dump files kept in the dump directory."""
+
+    PROFILE_FILE_EXTENSION: str = ".prof"
+    """The extension of the files with profiles in the pstats format."""
+
+    STACK_FILE_EXTENSION: str = ".stacks.txt"
+    """The extension of the files with thread stacks."""
+
+    def __init__(self, dump_dir: str, sample_rate: float):
+        """
+        Initialize a new LookupProfiler instance.
+
+        :param dump_dir: The directory where dumps are written.
+        :param sample_rate: The fraction of lookups to profile, from 0 to 1.
+        """
+        self.__dump_dir: str = dump_dir
+        self.__sample_rate: float = sample_rate
+        self.__stats: Optional[pstats.Stats] = None
+        self.__stats_lock: threading.Lock = threading.Lock()
+        # Only one profiler can be active in a process at a time since Python 3.12.
+        self.__profile_lock: threading.Lock = threading.Lock()
+        self.__stop_event: threading.Event = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def run(self, function: Callable[..., TResult], *args) -> TResult:
+        """
+        Call a function and profile the call if it is sampled.
+
+        :param function: The function.
+        :param args: The arguments of the function.
+        :return: The result of the function.
+        """
+        if random.random() >= self.__sample_rate:
+            return function(*args)
+        if not self.__profile_lock.acquire(blocking=False):
+            return function(*args)
+        try:
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(function, *args)
+            finally:
+                with self.__stats_lock:
+                    if self.__stats is None:
+                        self.__stats = pstats.Stats(profile)
+                    else:
+                        self.__stats.add(profile)
+        finally:
+            self.__profile_lock.release()
+
+    def start(self) -> None:
+        """Start dumping periodically."""
+        if self.__thread is not None:
+            return
+        self.__thread = threading.Thread(
+            target=self.__dump_periodically, name="lookup-profiler", daemon=True
+        )
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Stop dumping periodically."""
+        self.__stop_event.set()
+
+    def dump(self) -> None:
+        """Write the profile of the lookups sampled since the previous dump and the current stacks of all threads."""
+        with self.__stats_lock:
+            stats = self.__stats
+            self.__stats = None
+        make_dir_if_not_exists(self.__dump_dir)
+        name = f"{time.time_ns()}-{os.getpid()}"
+        if stats is not None:
+            stats.dump_stats(
+                join_paths(self.__dump_dir, name + self.PROFILE_FILE_EXTENSION)
+            )
+        write(
+            join_paths(self.__dump_dir, name + self.STACK_FILE_EXTENSION),
+            self.__format_stacks(),
+            overwrite=True,
+        )
+        self.__remove_old_dumps()
+
+    def __dump_periodically(self) -> None:
+        while not self.__stop_event.wait(self.DUMP_INTERVAL_SECONDS):
+            try:
+                self.dump()
+            except Exception:
+                logger.exception("Failed to dump lookup profiles.")
+
+    @staticmethod
+    def __format_stacks() -> str:
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        sections = list()
+        for thread_id, frame in sys._current_frames().items():
+            sections.append(
+                f"Thread {thread_names.get(thread_id, thread_id)}:\n"
+                + "".join(traceback.format_stack(frame))
+            )
+        return "\n".join(sections)
+
+    def __remove_old_dumps(self) -> None:
+        for extension in [self.PROFILE_FILE_EXTENSION, self.STACK_FILE_EXTENSION]:
+            names = sorted(
+                name for name in list_dir(self.__dump_dir) if name.endswith(extension)
+            )
+            for name in names[: -self.RETAINED_DUMP_QUANTITY]:
+                remove_file(join_paths(self.__dump_dir, name))
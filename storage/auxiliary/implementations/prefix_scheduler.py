@@ -0,0 +1,68 @@
+from collections import deque
+from typing import Deque, List, Optional, Set
+
+from storage.auxiliary.models.prefix_chunk import PrefixChunk
+
+
+class PrefixScheduler:
+    """Distributes prefix chunks between preparation coroutines on demand."""
+
+    def __init__(
+        self,
+        chunks: List[PrefixChunk],
+        split_alignment: int = 1,
+        is_alignment_strict: bool = False,
+    ):
+        """
+        Initialize a new PrefixScheduler instance.
+
+        :param chunks: The chunks to be prepared.
+        :param split_alignment: The preferred multiple for the first prefix index of split chunks.
+        :param is_alignment_strict: Whether the first prefix index of split chunks must be a multiple of the alignment.
+        """
+        self.__queued_chunks: Deque[PrefixChunk] = deque(
+            chunk for chunk in chunks if not chunk.is_prepared
+        )
+        self.__taken_chunks: Set[PrefixChunk] = set()
+        self.__split_alignment: int = split_alignment
+        self.__is_alignment_strict: bool = is_alignment_strict
+
+    def take(self) -> Optional[PrefixChunk]:
+        """
+        Take a chunk to be prepared.
+        If there are no queued chunks, the largest taken chunk is split and its detached part is taken.
+
+        :return: The chunk or None if there is nothing left to share.
+        """
+        if self.__queued_chunks:
+            chunk = self.__queued_chunks.popleft()
+        else:
+            chunk = self.__split_largest_taken_chunk()
+            if chunk is None:
+                return None
+        self.__taken_chunks.add(chunk)
+        return chunk
+
+    def release(self, chunk: PrefixChunk) -> None:
+        """
+        Release a previously taken chunk after its preparation has finished or stopped.
+        The chunk is queued again if it still has unprepared prefixes.
+
+        :param chunk: The chunk.
+        """
+        self.__taken_chunks.discard(chunk)
+        if not chunk.is_prepared:
+            self.__queued_chunks.appendleft(chunk)
+
+    def __split_largest_taken_chunk(self) -> Optional[PrefixChunk]:
+        for chunk in sorted(
+            self.__taken_chunks,
+            key=lambda chunk: chunk.unprepared_prefix_quantity,
+            reverse=True,
+        ):
+            detached_chunk = chunk.split(
+                self.__split_alignment, self.__is_alignment_strict
+            )
+            if detached_chunk is not None or not self.__is_alignment_strict:
+                return detached_chunk
+        return None
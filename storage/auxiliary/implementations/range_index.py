@@ -0,0 +1,124 @@
+import mmap
+import os
+import struct
+import threading
+from typing import BinaryIO, Optional, Tuple
+
+from storage.models.pwned import PWNED_PREFIX_CAPACITY
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class RangeIndex:
+    """
+    Memory-mapped index of the record positions of prefix ranges in the data files of a dataset.
+    The index file is mapped as shared memory, so that all processes using the dataset share one copy
+    and the positions found by one of them are reused by the others.
+    Each position is stored together with the identity of the data file it was found in,
+    so that the positions of replaced data files are never used.
+    """
+
+    IDENTITY_FORMAT: str = ">QQ"
+    """The format of a data file identity, which is its inode number and modification time."""
+
+    POSITION_FORMAT: str = ">II"
+    """The format of the record indices of the first record of a range and the record following the range."""
+
+    ENTRY_SIZE: int = struct.calcsize(IDENTITY_FORMAT) + struct.calcsize(
+        POSITION_FORMAT
+    )
+    """The size of the index entry of a prefix in bytes."""
+
+    def __init__(self, path: str):
+        """
+        Initialize a new RangeIndex instance. The index file is created if it does not exist.
+        The index is closed when the instance is no longer referenced.
+        :param path: The path to the index file.
+        """
+        self.__write_lock: threading.Lock = threading.Lock()
+        size = PWNED_PREFIX_CAPACITY * self.ENTRY_SIZE
+        self.__file: BinaryIO = os.fdopen(
+            os.open(path, os.O_RDWR | os.O_CREAT, 0o644), "r+b"
+        )
+        try:
+            # The index file is sparse, so that only the used entries take space.
+            if os.fstat(self.__file.fileno()).st_size < size:
+                os.ftruncate(self.__file.fileno(), size)
+            self.__map: mmap.mmap = mmap.mmap(self.__file.fileno(), size)
+        except Exception:
+            self.__file.close()
+            raise
+
+    @staticmethod
+    def identify(file: BinaryIO) -> bytes:
+        """
+        Get the identity of a file, which changes whenever another file is placed at its path.
+
+        :param file: The open file.
+        :return: The file identity.
+        """
+        stat = os.fstat(file.fileno())
+        return struct.pack(RangeIndex.IDENTITY_FORMAT, stat.st_ino, stat.st_mtime_ns)
+
+    def get(self, prefix_index: int, file_identity: bytes) -> Optional[Tuple[int, int]]:
+        """
+        Get the record positions of a range.
+
+        :param prefix_index: The prefix index of the range.
+        :param file_identity: The identity of the data file that contains the range.
+        :return: The record indices of the first record of the range and the record following the range
+          or None if they are not indexed for the data file.
+        """
+        offset = prefix_index * self.ENTRY_SIZE
+        identity_size = struct.calcsize(self.IDENTITY_FORMAT)
+        if self.__map[offset : offset + identity_size] != file_identity:
+            return None
+        positions = struct.unpack_from(
+            self.POSITION_FORMAT, self.__map, offset + identity_size
+        )
+        # The entry may have been rewritten while it was being read.
+        if self.__map[offset : offset + identity_size] != file_identity:
+            return None
+        return positions
+
+    def set(
+        self, prefix_index: int, file_identity: bytes, positions: Tuple[int, int]
+    ) -> None:
+        """
+        Set the record positions of a range.
+
+        :param prefix_index: The prefix index of the range.
+        :param file_identity: The identity of the data file that contains the range.
+        :param positions: The record indices of the first record of the range and the record following the range.
+        """
+        offset = prefix_index * self.ENTRY_SIZE
+        identity_size = struct.calcsize(self.IDENTITY_FORMAT)
+        with self.__write_lock:
+            if fcntl is not None:
+                fcntl.lockf(
+                    self.__file, fcntl.LOCK_EX, self.ENTRY_SIZE, offset, os.SEEK_SET
+                )
+            try:
+                # The entry is marked as unknown until it is consistent.
+                self.__map[offset : offset + identity_size] = bytes(identity_size)
+                struct.pack_into(
+                    self.POSITION_FORMAT, self.__map, offset + identity_size, *positions
+                )
+                self.__map[offset : offset + identity_size] = file_identity
+            finally:
+                if fcntl is not None:
+                    fcntl.lockf(
+                        self.__file,
+                        fcntl.LOCK_UN,
+                        self.ENTRY_SIZE,
+                        offset,
+                        os.SEEK_SET,
+                    )
+
+    def close(self) -> None:
+        """Unmap and close the index file."""
+        self.__map.close()
+        self.__file.close()
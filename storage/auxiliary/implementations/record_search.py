@@ -1,48 +1,138 @@
-from typing import BinaryIO
+import time
+from typing import BinaryIO, Callable, Optional, Tuple
 
 from storage.auxiliary.filetools import join_paths
+from storage.auxiliary.implementations.range_index import RangeIndex
 from storage.auxiliary.implementations.record_converter import PwnedRecordConverter
+from storage.models.lookup import LookupPhase, LookupTrace
+from storage.models.pwned import PWNED_PREFIX_LENGTH
 
 
 class PwnedRecordSearch:
     """Pwned data file search."""
 
-    def __init__(self, pwned_converter: PwnedRecordConverter):
+    def __init__(
+        self,
+        pwned_converter: PwnedRecordConverter,
+        observe_phase: Optional[Callable[[LookupPhase, float], None]] = None,
+        count_index_lookup: Optional[Callable[[bool], None]] = None,
+    ):
         """
         Initialize a new PwnedRecordSearch instance.
+
         :param pwned_converter: A Pwned password leak record converter.
+        :param observe_phase: The callback that receives the duration in seconds of each phase of range retrieval.
+        :param count_index_lookup: The callback that receives whether range positions have been found in the index.
         """
         self.__converter: PwnedRecordConverter = pwned_converter
+        self.__observe_phase: Optional[Callable[[LookupPhase, float], None]] = (
+            observe_phase
+        )
+        self.__count_index_lookup: Optional[Callable[[bool], None]] = count_index_lookup
 
-    def get_range(self, hash_prefix: str, active_dataset_dir: str) -> str:
+    def get_range(
+        self,
+        hash_prefix: str,
+        active_dataset_dir: str,
+        range_index: Optional[RangeIndex] = None,
+    ) -> str:
         """
         Retrieve the Pwned password leak record range from the file for a hash prefix.
 
         :param hash_prefix: The hash prefix.
         :param active_dataset_dir: The directory path for the currently used dataset.
+        :param range_index: The index of range positions in the dataset to use and fill, if any.
         :return: The range as plain text.
         """
         file_code = hash_prefix[: self.__converter.dropped_prefix_length]
+        data_file_path = join_paths(active_dataset_dir, f"{file_code}.dat")
+        start_time = time.perf_counter()
+        with open(data_file_path, "rb") as data_file:
+            open_end_time = time.perf_counter()
+            if range_index is None:
+                left_index, right_index = self.__find_range(hash_prefix, data_file)
+            else:
+                left_index, right_index = self.__find_indexed_range(
+                    hash_prefix, data_file, range_index
+                )
+            search_end_time = time.perf_counter()
+            records = self.__load_range(left_index, right_index, file_code, data_file)
+        trace = LookupTrace.current()
+        if trace is not None:
+            trace.add_count("records", right_index - left_index)
+        if self.__observe_phase is not None:
+            self.__observe_phase(LookupPhase.OPEN, open_end_time - start_time)
+            self.__observe_phase(LookupPhase.SEARCH, search_end_time - open_end_time)
+            self.__observe_phase(
+                LookupPhase.DECODE, time.perf_counter() - search_end_time
+            )
+        return records
+
+    def find_range_position(self, hash_prefix: str, data_file_path: str) -> int:
+        """
+        Find the position of the first record in a data file whose hash is not less than a hash prefix.
+
+        :param hash_prefix: The hash prefix.
+        :param data_file_path: The path to the data file.
+        :return: The position in bytes.
+        """
         desired_stored_bytes = self.__converter.desired_stored_prefix_bytes(hash_prefix)
         has_desired_stored_prefix_odd_length = (
             self.__converter.has_desired_stored_prefix_odd_length(hash_prefix)
         )
-        data_file_path = join_paths(active_dataset_dir, f"{file_code}.dat")
         with open(data_file_path, "rb") as data_file:
-            left_index = self.__find_boundary(
+            record_index = self.__find_boundary(
                 desired_stored_bytes,
                 has_desired_stored_prefix_odd_length,
                 data_file,
                 is_left_boundary=True,
             )
-            right_index = self.__find_boundary(
-                desired_stored_bytes,
-                has_desired_stored_prefix_odd_length,
-                data_file,
-                is_left_boundary=False,
-                left_offset=left_index,
-            )
-            return self.__load_range(left_index, right_index, file_code, data_file)
+        return record_index * self.__converter.record_size
+
+    def __find_range(
+        self,
+        hash_prefix: str,
+        file: BinaryIO,
+        left_offset: int = 0,
+        right_offset: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        desired_stored_bytes = self.__converter.desired_stored_prefix_bytes(hash_prefix)
+        has_desired_stored_prefix_odd_length = (
+            self.__converter.has_desired_stored_prefix_odd_length(hash_prefix)
+        )
+        left_index = self.__find_boundary(
+            desired_stored_bytes,
+            has_desired_stored_prefix_odd_length,
+            file,
+            is_left_boundary=True,
+            left_offset=left_offset,
+            right_offset=right_offset,
+        )
+        right_index = self.__find_boundary(
+            desired_stored_bytes,
+            has_desired_stored_prefix_odd_length,
+            file,
+            is_left_boundary=False,
+            left_offset=left_index,
+            right_offset=right_offset,
+        )
+        return left_index, right_index
+
+    def __find_indexed_range(
+        self, hash_prefix: str, file: BinaryIO, range_index: RangeIndex
+    ) -> Tuple[int, int]:
+        indexed_prefix = hash_prefix[:PWNED_PREFIX_LENGTH]
+        prefix_index = int(indexed_prefix, 16)
+        file_identity = RangeIndex.identify(file)
+        positions = range_index.get(prefix_index, file_identity)
+        if self.__count_index_lookup is not None:
+            self.__count_index_lookup(positions is not None)
+        if positions is None:
+            positions = self.__find_range(indexed_prefix, file)
+            range_index.set(prefix_index, file_identity, positions)
+        if len(hash_prefix) == len(indexed_prefix):
+            return positions
+        return self.__find_range(hash_prefix, file, *positions)
 
     def __load_range(
         self, left_index: int, right_index: int, dropped_prefix: str, file: BinaryIO
@@ -63,16 +153,22 @@ class PwnedRecordSearch:
         file: BinaryIO,
         is_left_boundary: bool,
         left_offset: int = 0,
+        right_offset: Optional[int] = None,
     ) -> int:
         record_size = self.__converter.record_size
         prefix_beginning_size = len(desired_stored_bytes)
         left = left_offset
-        right = 1
-        file.seek(0)
-        while file.read(1):
-            right *= 2
-            file.seek(record_size * right)
+        right = right_offset
+        probe_quantity = 0
+        if right is None:
+            right = 1
+            file.seek(0)
+            while file.read(1):
+                probe_quantity += 1
+                right *= 2
+                file.seek(record_size * right)
         while left < right:
+            probe_quantity += 1
             mid = (left + right) // 2
             file.seek(record_size * mid)
             if not file.read(1):
@@ -92,4 +188,7 @@ class PwnedRecordSearch:
                 left = mid + 1
             else:
                 right = mid
+        trace = LookupTrace.current()
+        if trace is not None:
+            trace.add_count("probes", probe_quantity)
         return left
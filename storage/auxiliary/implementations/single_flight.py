@@ -0,0 +1,52 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key, so that a single call is performed
+    and all concurrent callers receive its result.
+    """
+
+    def __init__(self):
+        """Initialize a new SingleFlight instance."""
+        self.__flights: Dict[Hashable, asyncio.Future] = dict()
+        self.__call_quantity: int = 0
+        self.__shared_call_quantity: int = 0
+
+    @property
+    def call_quantity(self) -> int:
+        """
+        Get the quantity of calls that have been made.
+        :return: The quantity of calls.
+        """
+        return self.__call_quantity
+
+    @property
+    def shared_call_quantity(self) -> int:
+        """
+        Get the quantity of calls that have received the result of a call already in flight.
+        :return: The quantity of shared calls.
+        """
+        return self.__shared_call_quantity
+
+    async def run(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> T:
+        """
+        Perform a call unless a call with the same key is already in flight, and wait for its result.
+
+        :param key: The key of the call.
+        :param function: The function that starts the call.
+        :return: The result of the call.
+        """
+        self.__call_quantity += 1
+        flight = self.__flights.get(key)
+        if flight is not None:
+            self.__shared_call_quantity += 1
+        else:
+            flight = asyncio.ensure_future(function())
+            self.__flights[key] = flight
+            flight.add_done_callback(lambda _: self.__flights.pop(key, None))
+        # A cancelled caller must not cancel the call for other callers.
+        return await asyncio.shield(flight)
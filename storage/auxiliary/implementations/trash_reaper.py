@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import os
+import time
+from typing import List, Optional, Tuple
+
+from storage.auxiliary.filetools import (
+    is_dir,
+    join_paths,
+    list_dir,
+    make_dir_if_not_exists,
+    remove_dir,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TrashReaper:
+    """
+    Removes directories moved to the trash directory in the background at a limited rate,
+    so that removal of large datasets does not saturate the disk.
+    """
+
+    DEFAULT_BATCH_SIZE: int = 1000
+    """The quantity of files removed at once if the file removal rate is not limited."""
+
+    BATCH_DURATION_SECONDS: float = 0.1
+    """The preferred duration of removing a batch of files if the file removal rate is limited."""
+
+    def __init__(
+        self,
+        trash_dir: str,
+        file_rate: Optional[int] = None,
+        byte_rate: Optional[int] = None,
+    ):
+        """
+        Initialize a new TrashReaper instance.
+
+        :param trash_dir: The path to the trash directory.
+        :param file_rate: The maximum quantity of files removed per second. Not limited by default.
+        :param byte_rate: The maximum size of files in bytes removed per second. Not limited by default.
+        """
+        self.__trash_dir: str = trash_dir
+        self.__file_rate: Optional[int] = file_rate
+        self.__byte_rate: Optional[int] = byte_rate
+        self.__task: Optional[asyncio.Task] = None
+        self.__total_file_quantity: int = 0
+        self.__removed_file_quantity: int = 0
+
+    @property
+    def progress(self) -> Optional[int]:
+        """
+        Get the progress percentage of the ongoing removal.
+        :return: The progress percentage or None if nothing is being removed.
+        """
+        if not self.is_running:
+            return None
+        return 100 * self.__removed_file_quantity // max(self.__total_file_quantity, 1)
+
+    @property
+    def is_running(self) -> bool:
+        """
+        Check if the removal is ongoing.
+        :return: True if the removal is ongoing, False otherwise.
+        """
+        return self.__task is not None and not self.__task.done()
+
+    def retire(self, path: str) -> None:
+        """
+        Move a directory to the trash directory and start the removal.
+        :param path: The path to the directory.
+        """
+        if not is_dir(path):
+            return
+        make_dir_if_not_exists(self.__trash_dir)
+        trash_name = f"{os.path.basename(path)}.{time.time_ns()}"
+        os.rename(path, join_paths(self.__trash_dir, trash_name))
+        self.start()
+
+    def start(self) -> None:
+        """Start the removal if the trash directory is not empty and the removal is not ongoing."""
+        if self.is_running:
+            return
+        if not is_dir(self.__trash_dir) or not list_dir(self.__trash_dir):
+            return
+        self.__task = asyncio.create_task(self.__purge_safely())
+
+    async def wait(self) -> None:
+        """Wait until the ongoing removal finishes."""
+        if self.__task is not None:
+            await self.__task
+
+    async def close(self) -> None:
+        """
+        Stop the ongoing removal and wait until it stops.
+        The remaining directories are removed when the removal is started next time.
+        """
+        if self.__task is None:
+            return
+        self.__task.cancel()
+        try:
+            await self.__task
+        except asyncio.CancelledError:
+            pass
+
+    async def __purge_safely(self) -> None:
+        try:
+            await self.__purge()
+        except Exception:
+            logger.exception("Failed to remove retired data.")
+
+    async def __purge(self) -> None:
+        self.__total_file_quantity = 0
+        self.__removed_file_quantity = 0
+        removed_byte_quantity = 0
+        start_time = time.monotonic()
+        while True:
+            trash_names = await asyncio.to_thread(list_dir, self.__trash_dir)
+            if not trash_names:
+                return
+            for trash_name in trash_names:
+                trash_path = join_paths(self.__trash_dir, trash_name)
+                if not is_dir(trash_path):
+                    await asyncio.to_thread(os.remove, trash_path)
+                    continue
+                file_names = await asyncio.to_thread(list_dir, trash_path)
+                self.__total_file_quantity += len(file_names)
+                batch_size = self.__get_batch_size()
+                for batch_index in range(0, len(file_names), batch_size):
+                    batch_paths = [
+                        join_paths(trash_path, file_name)
+                        for file_name in file_names[
+                            batch_index : batch_index + batch_size
+                        ]
+                    ]
+                    removed_quantity, removed_size = await asyncio.to_thread(
+                        self.__remove_files, batch_paths
+                    )
+                    self.__removed_file_quantity += removed_quantity
+                    removed_byte_quantity += removed_size
+                    await asyncio.sleep(
+                        self.__get_pause(
+                            removed_byte_quantity, time.monotonic() - start_time
+                        )
+                    )
+                await asyncio.to_thread(remove_dir, trash_path)
+
+    def __get_batch_size(self) -> int:
+        if self.__file_rate is None:
+            return self.DEFAULT_BATCH_SIZE
+        return max(1, int(self.__file_rate * self.BATCH_DURATION_SECONDS))
+
+    def __get_pause(self, removed_byte_quantity: int, elapsed_seconds: float) -> float:
+        expected_seconds = 0.0
+        if self.__file_rate is not None:
+            expected_seconds = self.__removed_file_quantity / self.__file_rate
+        if self.__byte_rate is not None:
+            expected_seconds = max(
+                expected_seconds, removed_byte_quantity / self.__byte_rate
+            )
+        return max(0.0, expected_seconds - elapsed_seconds)
+
+    @staticmethod
+    def __remove_files(paths: List[str]) -> Tuple[int, int]:
+        removed_size = 0
+        for path in paths:
+            if os.path.isdir(path):
+                remove_dir(path)
+                continue
+            removed_size += os.path.getsize(path)
+            os.remove(path)
+        return len(paths), removed_size
@@ -1,8 +1,10 @@
 import time
-from typing import List, Optional
+from typing import Dict, Optional
 
+from storage.auxiliary.models.prefix_bitmap import PrefixBitmap
+from storage.auxiliary.models.revision_meter import RevisionMeter
 from storage.models.pwned import PWNED_PREFIX_CAPACITY
-from storage.models.revision import Revision, RevisionStatus
+from storage.models.revision import Revision, RevisionStatus, RevisionThroughput
 
 
 class FunctionalRevision(Revision):
@@ -10,16 +12,16 @@ class FunctionalRevision(Revision):
 
     def __init__(
         self,
-        batch_quantity: int,
         revision: Revision = Revision(),
-        batch_preparation_offsets: Optional[List[int]] = None,
+        prepared_prefixes: Optional[PrefixBitmap] = None,
+        prefix_quantity: int = PWNED_PREFIX_CAPACITY,
     ):
         """
         Initialize a new FunctionalRevision instance.
 
-        :param batch_quantity: Quantity of parallel preparation batches.
-        :param batch_preparation_offsets: Quantities of processed prefixes for preparation batches.
         :param revision: Initial revision.
+        :param prepared_prefixes: Prefixes whose data has been prepared.
+        :param prefix_quantity: The quantity of prefixes whose data is prepared during the revision.
         """
         super().__init__(
             revision.status,
@@ -28,10 +30,13 @@ class FunctionalRevision(Revision):
             revision.end_ts,
             revision.error_message,
         )
-        self.__batch_preparation_offsets: List[int] = (
-            batch_preparation_offsets or [0] * batch_quantity
-        )
-        self.__prepared_prefix_quantity: int = sum(self.__batch_preparation_offsets)
+        self.__prepared_prefixes: PrefixBitmap = prepared_prefixes or PrefixBitmap()
+        self.__prefix_quantity: int = prefix_quantity
+        # The throughput of a revision prepared by another process or before a restart is only known from its export.
+        self.__imported_throughput: Optional[RevisionThroughput] = revision.throughput
+        self.__meter: Optional[RevisionMeter] = None
+        self.__phase_seconds: Dict[RevisionStatus, float] = dict()
+        self.__phase_start_time: float = time.monotonic()
 
     @property
     def progress(self) -> Optional[int]:
@@ -41,7 +46,17 @@ class FunctionalRevision(Revision):
             and not self.has_preparation_failed
         ):
             return None
-        return 100 * self.__prepared_prefix_quantity // PWNED_PREFIX_CAPACITY
+        return 100 * self.__prepared_prefixes.count // self.__prefix_quantity
+
+    @property
+    def throughput(self) -> Optional[RevisionThroughput]:
+        if self.__meter is None:
+            return self.__imported_throughput
+        if not self.is_preparing:
+            return self.__meter.to_dto()
+        return self.__meter.to_dto(
+            self.__prefix_quantity - self.__prepared_prefixes.count
+        )
 
     @property
     def is_idle(self) -> bool:
@@ -123,6 +138,35 @@ class FunctionalRevision(Revision):
         """
         return self._status == RevisionStatus.PREPARATION_FAILED
 
+    @property
+    def meter(self) -> Optional[RevisionMeter]:
+        """
+        Get the meter of the ongoing preparation.
+        :return: The meter or None if no data is being prepared.
+        """
+        return self.__meter if self.is_preparing else None
+
+    @property
+    def phase_seconds(self) -> Dict[RevisionStatus, float]:
+        """
+        Get the durations of the phases since the revision was last started or resumed.
+        :return: The durations in seconds by status.
+        """
+        phase_seconds = dict(self.__phase_seconds)
+        if not self.is_idle:
+            phase_seconds[self._status] = phase_seconds.get(self._status, 0) + (
+                time.monotonic() - self.__phase_start_time
+            )
+        return phase_seconds
+
+    @property
+    def prepared_prefixes(self) -> PrefixBitmap:
+        """
+        Get prefixes whose data has been prepared.
+        :return: The prepared prefixes.
+        """
+        return self.__prepared_prefixes
+
     def indicate_started(self) -> None:
         """Indicate that the preparation has started."""
         self._end_ts = None
@@ -132,50 +176,51 @@ class FunctionalRevision(Revision):
             and self.status != RevisionStatus.PREPARATION_FAILED
         ):
             self._start_ts = int(time.time())
-        self._status = RevisionStatus.PREPARATION
+        self.__phase_seconds = dict()
+        self.__enter_status(RevisionStatus.PREPARATION)
 
     def indicate_prepared(self) -> None:
         """Indicate that the preparation has completed."""
-        self.__clear_progress()
-        self._status = RevisionStatus.TRANSITION
+        self.clear_progress()
+        self.__enter_status(RevisionStatus.TRANSITION)
 
     def indicate_transited(self) -> None:
         """Indicate that the transition has completed."""
-        self._status = RevisionStatus.PURGE
+        self.__enter_status(RevisionStatus.PURGE)
 
     def indicate_stoppage(self) -> None:
         """Indicate that the stoppage has started."""
-        self._status = RevisionStatus.STOPPAGE
+        self.__enter_status(RevisionStatus.STOPPAGE)
 
     def indicate_cancellation(self) -> None:
         """Indicate that the cancellation has started."""
-        self._status = RevisionStatus.CANCELLATION
+        self.__enter_status(RevisionStatus.CANCELLATION)
 
     def indicate_completed(self) -> None:
         """Indicate that the revision has completed successfully."""
         self.__set_end_ts()
-        self._status = RevisionStatus.COMPLETED
+        self.__enter_status(RevisionStatus.COMPLETED)
 
     def indicate_stopped(self) -> None:
         """Indicate that the revision has stopped."""
         self.__set_end_ts()
-        self._status = RevisionStatus.STOPPED
+        self.__enter_status(RevisionStatus.STOPPED)
 
     def indicate_cancelled(self) -> None:
         """Indicate that the revision has cancelled."""
-        self.__clear_progress()
+        self.clear_progress()
         self.__set_end_ts()
-        self._status = RevisionStatus.CANCELLED
+        self.__enter_status(RevisionStatus.CANCELLED)
 
     def indicate_failed(self, error: Exception) -> None:
         """
         Indicate that the revision has failed with the given error.
         :param error: The error associated with the failure.
         """
-        self.__clear_progress()
+        self.clear_progress()
         self.__set_end_ts()
         self._error_message = str(error)
-        self._status = RevisionStatus.FAILED
+        self.__enter_status(RevisionStatus.FAILED)
 
     def indicate_preparation_failed(self, error: Exception) -> None:
         """
@@ -184,32 +229,37 @@ class FunctionalRevision(Revision):
         """
         self.__set_end_ts()
         self._error_message = str(error)
-        self._status = RevisionStatus.PREPARATION_FAILED
-
-    def count_prepared_prefix(self, batch_index: int) -> None:
-        """Increment the count of prepared prefixes."""
-        self.__batch_preparation_offsets[batch_index] += 1
-        self.__prepared_prefix_quantity += 1
+        self.__enter_status(RevisionStatus.PREPARATION_FAILED)
 
-    def get_batch_preparation_offset(self, batch_index: int) -> int:
+    def count_prepared_prefix(self, prefix_index: int) -> None:
         """
-        Get quantity of processed prefixes for a specific preparation batch.
-
-        :param batch_index: Batch index.
-        :return: Processed quantity.
+        Indicate that the data for a prefix has been prepared.
+        :param prefix_index: The prefix index.
         """
-        return self.__batch_preparation_offsets[batch_index]
+        self.__prepared_prefixes.add(prefix_index)
+        if self.meter is not None:
+            self.__meter.count_prepared_prefix()
+
+    def start_metering(self) -> None:
+        """Start measuring the throughput of the preparation from scratch."""
+        self.__meter = RevisionMeter()
 
     def has_progress(self) -> bool:
         """
         Check if the revision has progress.
         :return: True if the revision has progress, False otherwise.
         """
-        return self.__prepared_prefix_quantity != 0
+        return self.__prepared_prefixes.count != 0
+
+    def clear_progress(self) -> None:
+        """Forget all prepared prefixes."""
+        self.__prepared_prefixes = PrefixBitmap()
 
-    def to_dto(self) -> Revision:
+    def to_dto(self, purge_progress: Optional[int] = None) -> Revision:
         """
         Convert the FunctionalRevision to a pure Revision instance.
+
+        :param purge_progress: The progress percentage of the background removal of old data.
         :return: A Revision instance representing the current state of the revision.
         """
         return Revision(
@@ -218,11 +268,18 @@ class FunctionalRevision(Revision):
             self.start_ts,
             self.end_ts,
             self.error_message,
+            purge_progress,
+            self.throughput,
         )
 
+    def __enter_status(self, status: RevisionStatus) -> None:
+        now = time.monotonic()
+        if not self.is_idle:
+            self.__phase_seconds[self._status] = self.__phase_seconds.get(
+                self._status, 0
+            ) + (now - self.__phase_start_time)
+        self.__phase_start_time = now
+        self._status = status
+
     def __set_end_ts(self) -> None:
         self._end_ts = int(time.time())
-
-    def __clear_progress(self):
-        self.__batch_preparation_offsets = [0] * len(self.__batch_preparation_offsets)
-        self.__prepared_prefix_quantity = 0
@@ -0,0 +1,61 @@
+import threading
+from bisect import bisect_left
+from typing import List, Sequence
+
+from storage.models.metrics import HistogramValue
+
+
+class Histogram:
+    """
+    Counts observed values in buckets.
+    Values can be observed from several threads.
+    """
+
+    DEFAULT_LATENCY_BOUNDS: Sequence[float] = (
+        0.0001,
+        0.00025,
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+        2.5,
+        5,
+    )
+    """The default upper bounds of the buckets for latencies in seconds."""
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_LATENCY_BOUNDS):
+        """
+        Initialize a new Histogram instance.
+        :param bounds: The inclusive upper bounds of the buckets in ascending order.
+        """
+        self.__bounds: List[float] = list(bounds)
+        self.__bucket_counts: List[int] = [0] * (len(self.__bounds) + 1)
+        self.__total: float = 0
+        self.__lock: threading.Lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """
+        Count a value in its bucket.
+        :param value: The value.
+        """
+        bucket_index = bisect_left(self.__bounds, value)
+        with self.__lock:
+            self.__bucket_counts[bucket_index] += 1
+            self.__total += value
+
+    def to_value(self) -> HistogramValue:
+        """
+        Get the current distribution of the observed values.
+        :return: The distribution.
+        """
+        with self.__lock:
+            return HistogramValue(
+                list(self.__bounds), list(self.__bucket_counts), self.__total
+            )
@@ -0,0 +1,107 @@
+import re
+from typing import List, Optional, Tuple
+
+from storage.models.pwned import PWNED_PREFIX_CAPACITY
+
+
+class PrefixBitmap:
+    """A set of hash prefix indices stored as a bitmap."""
+
+    BYTE_SIZE: int = PWNED_PREFIX_CAPACITY // 8
+    """The size of the bitmap in bytes."""
+
+    __NOT_FULL_BYTE_PATTERN = re.compile(b"[^\xff]")
+    __NOT_EMPTY_BYTE_PATTERN = re.compile(b"[^\x00]")
+
+    def __init__(self, content: Optional[bytes] = None):
+        """
+        Initialize a new PrefixBitmap instance.
+        :param content: The bitmap content. An empty bitmap is created by default.
+        """
+        if content is not None and len(content) != self.BYTE_SIZE:
+            raise ValueError("The bitmap content has an invalid size.")
+        self.__content: bytearray = bytearray(content or self.BYTE_SIZE)
+        self.__count: int = int.from_bytes(self.__content, "big").bit_count()
+
+    @property
+    def count(self) -> int:
+        """
+        Get the quantity of prefixes in the set.
+        :return: The quantity of prefixes.
+        """
+        return self.__count
+
+    def contains(self, prefix_index: int) -> bool:
+        """
+        Check if a prefix is in the set.
+
+        :param prefix_index: The prefix index.
+        :return: True if the prefix is in the set, False otherwise.
+        """
+        return self.__content[prefix_index >> 3] & (0x80 >> (prefix_index & 7)) != 0
+
+    def add(self, prefix_index: int) -> None:
+        """
+        Add a prefix to the set.
+        :param prefix_index: The prefix index.
+        """
+        if not self.contains(prefix_index):
+            self.__content[prefix_index >> 3] |= 0x80 >> (prefix_index & 7)
+            self.__count += 1
+
+    def find(
+        self, first_prefix_index: int, end_prefix_index: int, is_contained: bool
+    ) -> int:
+        """
+        Find the first prefix within a range that is either contained or not contained in the set.
+
+        :param first_prefix_index: The index of the first prefix of the range.
+        :param end_prefix_index: The index of the prefix following the last prefix of the range.
+        :param is_contained: Whether to find a contained prefix.
+        :return: The found prefix index or the end prefix index if there is no such prefix.
+        """
+        index = first_prefix_index
+        while index < end_prefix_index and index & 7 != 0:
+            if self.contains(index) == is_contained:
+                return index
+            index += 1
+        if index >= end_prefix_index:
+            return end_prefix_index
+        pattern = (
+            self.__NOT_EMPTY_BYTE_PATTERN
+            if is_contained
+            else self.__NOT_FULL_BYTE_PATTERN
+        )
+        match = pattern.search(self.__content, index >> 3)
+        if match is None:
+            return end_prefix_index
+        index = match.start() << 3
+        while index < end_prefix_index and self.contains(index) != is_contained:
+            index += 1
+        return min(index, end_prefix_index)
+
+    def get_missing_ranges(
+        self, first_prefix_index: int = 0, end_prefix_index: int = PWNED_PREFIX_CAPACITY
+    ) -> List[Tuple[int, int]]:
+        """
+        Get all ranges of consecutive prefixes that are not contained in the set.
+
+        :param first_prefix_index: The index of the first prefix to be checked.
+        :param end_prefix_index: The index of the prefix following the last prefix to be checked.
+        :return: The ranges as pairs of the first prefix index and the following prefix index.
+        """
+        ranges = list()
+        index = first_prefix_index
+        while index < end_prefix_index:
+            first_index = self.find(index, end_prefix_index, is_contained=False)
+            index = self.find(first_index, end_prefix_index, is_contained=True)
+            if first_index < index:
+                ranges.append((first_index, index))
+        return ranges
+
+    def to_bytes(self) -> bytes:
+        """
+        Convert the bitmap to bytes.
+        :return: The bitmap content.
+        """
+        return bytes(self.__content)
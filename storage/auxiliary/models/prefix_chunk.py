@@ -0,0 +1,93 @@
+from typing import Optional
+
+
+class PrefixChunk:
+    """A contiguous range of hash prefix indices which is prepared sequentially."""
+
+    def __init__(
+        self,
+        first_prefix_index: int,
+        end_prefix_index: int,
+        next_prefix_index: Optional[int] = None,
+    ):
+        """
+        Initialize a new PrefixChunk instance.
+
+        :param first_prefix_index: The index of the first prefix of the chunk.
+        :param end_prefix_index: The index of the prefix following the last prefix of the chunk.
+        :param next_prefix_index: The index of the first unprepared prefix of the chunk.
+        """
+        self.__first_prefix_index: int = first_prefix_index
+        self.__end_prefix_index: int = end_prefix_index
+        self.__next_prefix_index: int = (
+            first_prefix_index if next_prefix_index is None else next_prefix_index
+        )
+
+    @property
+    def first_prefix_index(self) -> int:
+        """
+        Get the index of the first prefix of the chunk.
+        :return: The index of the first prefix.
+        """
+        return self.__first_prefix_index
+
+    @property
+    def next_prefix_index(self) -> int:
+        """
+        Get the index of the first unprepared prefix of the chunk.
+        :return: The index of the first unprepared prefix.
+        """
+        return self.__next_prefix_index
+
+    @property
+    def end_prefix_index(self) -> int:
+        """
+        Get the index of the prefix following the last prefix of the chunk.
+        :return: The index of the prefix following the last prefix.
+        """
+        return self.__end_prefix_index
+
+    @property
+    def unprepared_prefix_quantity(self) -> int:
+        """
+        Get the quantity of unprepared prefixes of the chunk.
+        :return: The quantity of unprepared prefixes.
+        """
+        return self.__end_prefix_index - self.__next_prefix_index
+
+    @property
+    def is_prepared(self) -> bool:
+        """
+        Check if all prefixes of the chunk are prepared.
+        :return: True if the chunk is prepared, False otherwise.
+        """
+        return self.__next_prefix_index >= self.__end_prefix_index
+
+    def count_prepared_prefix(self) -> None:
+        """Indicate that the next unprepared prefix of the chunk is prepared."""
+        self.__next_prefix_index += 1
+
+    def split(
+        self, alignment: int = 1, is_alignment_strict: bool = False
+    ) -> Optional["PrefixChunk"]:
+        """
+        Detach about a half of unprepared prefixes from the end of the chunk.
+        The next unprepared prefix always stays in the chunk since it may be being prepared.
+
+        :param alignment: The preferred multiple for the index of the first detached prefix.
+        :param is_alignment_strict: Whether the index of the first detached prefix must be a multiple of the alignment.
+        :return: The detached chunk or None if the chunk is too small to be split.
+        """
+        if self.unprepared_prefix_quantity < 2:
+            return None
+        split_index = (
+            self.__next_prefix_index + (self.unprepared_prefix_quantity + 1) // 2
+        )
+        aligned_split_index = split_index - split_index % alignment
+        if aligned_split_index > self.__next_prefix_index:
+            split_index = aligned_split_index
+        elif is_alignment_strict:
+            return None
+        detached_chunk = PrefixChunk(split_index, self.__end_prefix_index)
+        self.__end_prefix_index = split_index
+        return detached_chunk
@@ -0,0 +1,91 @@
+import heapq
+from array import array
+from typing import List, Optional
+
+from storage.models.pwned import PWNED_PREFIX_CAPACITY
+
+
+class PrefixPopularity:
+    """Request counts of hash prefixes."""
+
+    COUNTER_SIZE: int = 4
+    """The size of a request counter in bytes."""
+
+    MAX_COUNT: int = 2 ** (8 * COUNTER_SIZE) - 1
+    """The count at which a request counter stops growing."""
+
+    def __init__(self, content: Optional[bytes] = None):
+        """
+        Initialize a new PrefixPopularity instance.
+        :param content: The request counts produced with to_bytes. Zero counts are used by default.
+        """
+        if (
+            content is not None
+            and len(content) != self.COUNTER_SIZE * PWNED_PREFIX_CAPACITY
+        ):
+            raise ValueError("The popularity content has an invalid size.")
+        self.__counts: array = array("I")
+        if content is None:
+            self.__counts.frombytes(bytes(self.COUNTER_SIZE * PWNED_PREFIX_CAPACITY))
+        else:
+            self.__counts.frombytes(content)
+
+    def count(self, prefix_index: int) -> None:
+        """
+        Count a request of a prefix.
+        :param prefix_index: The prefix index.
+        """
+        if self.__counts[prefix_index] < self.MAX_COUNT:
+            self.__counts[prefix_index] += 1
+
+    def add(self, other: "PrefixPopularity") -> None:
+        """
+        Add the request counts of another instance.
+        :param other: The other instance.
+        """
+        for prefix_index, count in enumerate(other.__counts):
+            if count > 0:
+                self.__counts[prefix_index] = min(
+                    self.__counts[prefix_index] + count, self.MAX_COUNT
+                )
+
+    def get(self, prefix_index: int) -> int:
+        """
+        Get the request count of a prefix.
+
+        :param prefix_index: The prefix index.
+        :return: The request count.
+        """
+        return self.__counts[prefix_index]
+
+    def get_total(self, first_prefix_index: int, end_prefix_index: int) -> int:
+        """
+        Get the total request count of consecutive prefixes.
+
+        :param first_prefix_index: The index of the first prefix.
+        :param end_prefix_index: The index of the prefix following the last prefix.
+        :return: The total request count.
+        """
+        return sum(self.__counts[first_prefix_index:end_prefix_index])
+
+    def get_most_popular(self, quantity: int) -> List[int]:
+        """
+        Get the most requested prefixes. Prefixes that have never been requested are omitted.
+
+        :param quantity: The maximum quantity of prefixes.
+        :return: The prefix indices from the most requested one.
+        """
+        return [
+            prefix_index
+            for prefix_index in heapq.nlargest(
+                quantity, range(PWNED_PREFIX_CAPACITY), key=self.__counts.__getitem__
+            )
+            if self.__counts[prefix_index] > 0
+        ]
+
+    def to_bytes(self) -> bytes:
+        """
+        Convert the request counts to bytes.
+        :return: The bytes.
+        """
+        return self.__counts.tobytes()
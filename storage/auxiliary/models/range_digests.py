@@ -0,0 +1,97 @@
+import hashlib
+from typing import Optional
+
+from storage.models.pwned import PWNED_PREFIX_CAPACITY
+
+
+class RangeDigests:
+    """Digests of the ranges stored in a dataset."""
+
+    DIGEST_SIZE: int = 8
+    """The size of a range digest in bytes."""
+
+    TIMESTAMP_SIZE: int = 8
+    """The size of the stored revision timestamp in bytes."""
+
+    __UNKNOWN_DIGEST: bytes = bytes(DIGEST_SIZE)
+
+    def __init__(self, revision_ts: int, content: Optional[bytes] = None):
+        """
+        Initialize a new RangeDigests instance.
+
+        :param revision_ts: The timestamp before which no range of the dataset was received.
+        :param content: The digests of all ranges. Unknown digests are used by default.
+        """
+        if (
+            content is not None
+            and len(content) != self.DIGEST_SIZE * PWNED_PREFIX_CAPACITY
+        ):
+            raise ValueError("The range digest content has an invalid size.")
+        self.__revision_ts: int = revision_ts
+        self.__content: bytearray = bytearray(
+            content or self.DIGEST_SIZE * PWNED_PREFIX_CAPACITY
+        )
+
+    @staticmethod
+    def create_hash():
+        """
+        Create a hash object that calculates a range digest from the range records.
+        :return: The hash object.
+        """
+        return hashlib.blake2b(digest_size=RangeDigests.DIGEST_SIZE)
+
+    @staticmethod
+    def from_bytes(content: bytes) -> Optional["RangeDigests"]:
+        """
+        Restore range digests from bytes.
+
+        :param content: The bytes produced with to_bytes.
+        :return: The range digests or None if the content is invalid.
+        """
+        timestamp_size = RangeDigests.TIMESTAMP_SIZE
+        if (
+            len(content)
+            != timestamp_size + RangeDigests.DIGEST_SIZE * PWNED_PREFIX_CAPACITY
+        ):
+            return None
+        revision_ts = int.from_bytes(content[:timestamp_size], "big", signed=False)
+        return RangeDigests(revision_ts, content[timestamp_size:])
+
+    @property
+    def revision_ts(self) -> int:
+        """
+        Get the timestamp before which no range of the dataset was received.
+        :return: The timestamp.
+        """
+        return self.__revision_ts
+
+    def get(self, prefix_index: int) -> Optional[bytes]:
+        """
+        Get the digest of a range.
+
+        :param prefix_index: The prefix index of the range.
+        :return: The digest or None if it is unknown.
+        """
+        offset = prefix_index * self.DIGEST_SIZE
+        digest = bytes(self.__content[offset : offset + self.DIGEST_SIZE])
+        return None if digest == self.__UNKNOWN_DIGEST else digest
+
+    def set(self, prefix_index: int, digest: bytes) -> None:
+        """
+        Set the digest of a range.
+
+        :param prefix_index: The prefix index of the range.
+        :param digest: The digest.
+        """
+        offset = prefix_index * self.DIGEST_SIZE
+        self.__content[offset : offset + self.DIGEST_SIZE] = digest
+
+    def to_bytes(self) -> bytes:
+        """
+        Convert the range digests to bytes.
+        :return: The bytes.
+        """
+        return (
+            self.__revision_ts.to_bytes(self.TIMESTAMP_SIZE, "big", signed=False)
+            + self.__content
+        )
@@ -0,0 +1,170 @@
+import heapq
+import math
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+from storage.auxiliary.numeration import number_to_hex_code
+from storage.models.pwned import PWNED_PREFIX_CAPACITY
+from storage.models.revision import ChunkDuration, RevisionThroughput
+
+
+class RevisionMeter:
+    """
+    Measures the throughput of the preparation of new data.
+    Rates are measured over a sliding window, so they show the current speed rather than the average one.
+    Written data can be counted from several threads.
+    """
+
+    WINDOW_SECONDS: float = 60
+    """The time in seconds over which rates are measured."""
+
+    SAMPLE_INTERVAL_SECONDS: float = 1
+    """The minimum time in seconds between the samples of the window."""
+
+    SLOWEST_CHUNK_QUANTITY: int = 5
+    """The quantity of the slowest prepared chunks that are kept."""
+
+    def __init__(self):
+        """Initialize a new RevisionMeter instance."""
+        self.__prefix_quantity: int = 0
+        self.__record_quantity: int = 0
+        self.__received_byte_quantity: int = 0
+        self.__written_byte_quantity: int = 0
+        self.__range_error_quantity: int = 0
+        self.__network_seconds: float = 0
+        self.__processing_seconds: float = 0
+        self.__throttle_seconds: float = 0
+        self.__slowest_chunks: List[Tuple[float, int, int]] = list()
+        self.__last_count_time: float = time.monotonic()
+        self.__samples: Deque[Tuple[float, int, int]] = deque(
+            [(self.__last_count_time, 0, 0)]
+        )
+        self.__lock: threading.Lock = threading.Lock()
+
+    def count_prepared_prefix(self) -> None:
+        """Count a prepared prefix."""
+        self.__prefix_quantity += 1
+        self.__sample()
+
+    def count_range(
+        self,
+        record_quantity: int,
+        byte_quantity: int,
+        network_seconds: float,
+        processing_seconds: float,
+    ) -> None:
+        """
+        Count a received range.
+
+        :param record_quantity: The quantity of records of the range.
+        :param byte_quantity: The size of the range in bytes.
+        :param network_seconds: The time in seconds spent waiting for the records.
+        :param processing_seconds: The time in seconds spent handling the records.
+        """
+        self.__record_quantity += record_quantity
+        self.__received_byte_quantity += byte_quantity
+        self.__network_seconds += network_seconds
+        self.__processing_seconds += processing_seconds
+        self.__sample()
+
+    def count_range_error(self) -> None:
+        """Count a failed range request."""
+        self.__range_error_quantity += 1
+
+    def count_written(self, size: int) -> None:
+        """
+        Count written data.
+        :param size: The size of the data in bytes.
+        """
+        with self.__lock:
+            self.__written_byte_quantity += size
+
+    def observe_throttle(self, seconds: float) -> None:
+        """
+        Take a wait for the write limit into account.
+        :param seconds: The time of the wait in seconds.
+        """
+        self.__throttle_seconds += seconds
+
+    def observe_chunk(
+        self, first_prefix_index: int, end_prefix_index: int, seconds: float
+    ) -> None:
+        """
+        Take the preparation time of a chunk into account.
+
+        :param first_prefix_index: The index of the first prefix of the chunk.
+        :param end_prefix_index: The index of the prefix following the last prefix of the chunk.
+        :param seconds: The preparation time in seconds.
+        """
+        chunk = (seconds, first_prefix_index, end_prefix_index)
+        if len(self.__slowest_chunks) < self.SLOWEST_CHUNK_QUANTITY:
+            heapq.heappush(self.__slowest_chunks, chunk)
+        else:
+            heapq.heappushpop(self.__slowest_chunks, chunk)
+
+    def to_dto(
+        self, remaining_prefix_quantity: Optional[int] = None
+    ) -> RevisionThroughput:
+        """
+        Get the measured throughput.
+
+        :param remaining_prefix_quantity: The quantity of prefixes that are still to be prepared
+          if the preparation is ongoing. Otherwise, rates are measured until the last counted range or prefix.
+        :return: The throughput.
+        """
+        end_time = (
+            self.__last_count_time
+            if remaining_prefix_quantity is None
+            else time.monotonic()
+        )
+        start_time, start_prefix_quantity, start_record_quantity = self.__samples[0]
+        elapsed_seconds = end_time - start_time
+        prefix_rate = 0
+        record_rate = 0
+        if elapsed_seconds > 0:
+            prefix_rate = (
+                self.__prefix_quantity - start_prefix_quantity
+            ) / elapsed_seconds
+            record_rate = (
+                self.__record_quantity - start_record_quantity
+            ) / elapsed_seconds
+        eta_seconds = None
+        if remaining_prefix_quantity is not None and prefix_rate > 0:
+            eta_seconds = math.ceil(remaining_prefix_quantity / prefix_rate)
+        slowest_chunks = [
+            ChunkDuration(
+                number_to_hex_code(first_prefix_index, PWNED_PREFIX_CAPACITY),
+                end_prefix_index - first_prefix_index,
+                round(seconds, 3),
+            )
+            for seconds, first_prefix_index, end_prefix_index in sorted(
+                self.__slowest_chunks, reverse=True
+            )
+        ]
+        with self.__lock:
+            written_byte_quantity = self.__written_byte_quantity
+        return RevisionThroughput(
+            round(prefix_rate, 1),
+            round(record_rate, 1),
+            self.__received_byte_quantity,
+            written_byte_quantity,
+            self.__range_error_quantity,
+            round(self.__network_seconds, 3),
+            round(self.__processing_seconds, 3),
+            round(self.__throttle_seconds, 3),
+            slowest_chunks,
+            eta_seconds,
+            self.__prefix_quantity,
+            self.__record_quantity,
+        )
+
+    def __sample(self) -> None:
+        now = time.monotonic()
+        self.__last_count_time = now
+        if now - self.__samples[-1][0] < self.SAMPLE_INTERVAL_SECONDS:
+            return
+        self.__samples.append((now, self.__prefix_quantity, self.__record_quantity))
+        while now - self.__samples[0][0] > self.WINDOW_SECONDS:
+            self.__samples.popleft()
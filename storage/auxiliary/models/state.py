@@ -1,5 +1,6 @@
+import asyncio
 from enum import Enum
-from typing import Optional
+from typing import Dict, Optional
 
 
 class DatasetID(Enum):
@@ -28,14 +29,28 @@ class DatasetID(Enum):
 class PwnedStorageState:
     """Pwned storage state."""
 
-    def __init__(self, active_dataset: Optional[DatasetID] = None):
+    def __init__(
+        self,
+        active_dataset: Optional[DatasetID] = None,
+        active_generation: Optional[int] = None,
+    ):
         """
         Initialize a new PwnedStorageState instance.
+
         :param active_dataset: The currently active dataset.
+        :param active_generation: The generation of the active dataset.
         """
         self.__active_dataset: Optional[DatasetID] = active_dataset
+        self.__active_generation: Optional[int] = active_generation
         self.__is_to_be_ignored: bool = False
-        self.__active_requests: int = 0
+        self.__reader_counts: Dict[DatasetID, int] = {
+            dataset: 0 for dataset in DatasetID
+        }
+        self.__release_events: Dict[DatasetID, asyncio.Event] = {
+            dataset: asyncio.Event() for dataset in DatasetID
+        }
+        for release_event in self.__release_events.values():
+            release_event.set()
 
     @property
     def active_dataset(self) -> Optional[DatasetID]:
@@ -53,6 +68,22 @@ class PwnedStorageState:
         """
         self.__active_dataset = value
 
+    @property
+    def active_generation(self) -> Optional[int]:
+        """
+        Get the generation of the active dataset, which is the start timestamp of the revision that prepared it.
+        :return: The generation or None if it is unknown.
+        """
+        return self.__active_generation
+
+    @active_generation.setter
+    def active_generation(self, value: Optional[int]) -> None:
+        """
+        Set the generation of the active dataset.
+        :param value: The generation.
+        """
+        self.__active_generation = value
+
     @property
     def is_to_be_ignored(self) -> bool:
         """
@@ -61,21 +92,41 @@ class PwnedStorageState:
         """
         return self.__is_to_be_ignored
 
-    @property
-    def has_active_requests(self) -> bool:
+    def pin_active_dataset(self) -> DatasetID:
+        """
+        Pin the currently active dataset so that it is not removed until it is released.
+        :return: The pinned dataset.
         """
-        Check if there are active requests.
-        :return: True if there are active requests, False otherwise.
+        dataset = self.__active_dataset
+        if dataset is None:
+            raise RuntimeError("The storage has no active dataset.")
+        self.__reader_counts[dataset] += 1
+        self.__release_events[dataset].clear()
+        return dataset
+
+    def release_dataset(self, dataset: DatasetID) -> None:
         """
-        return self.__active_requests > 0
+        Release a previously pinned dataset.
+        :param dataset: The dataset.
+        """
+        self.__reader_counts[dataset] -= 1
+        if self.__reader_counts[dataset] == 0:
+            self.__release_events[dataset].set()
 
-    def count_started_request(self) -> None:
-        """Increment the count of active requests."""
-        self.__active_requests += 1
+    def is_released(self, dataset: DatasetID) -> bool:
+        """
+        Check if no reader has pinned a dataset.
+        :param dataset: The dataset.
+        :return: True if the dataset is released, False otherwise.
+        """
+        return self.__reader_counts[dataset] == 0
 
-    def count_finished_request(self) -> None:
-        """Decrement the count of active requests."""
-        self.__active_requests -= 1
+    async def wait_for_release(self, dataset: DatasetID) -> None:
+        """
+        Wait until all readers release a dataset.
+        :param dataset: The dataset.
+        """
+        await self.__release_events[dataset].wait()
 
     def mark_to_be_ignored(self) -> None:
         """Mark the state to be ignored."""
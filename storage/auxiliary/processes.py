@@ -0,0 +1,21 @@
+import os
+
+
+def is_process_running(process_id: int) -> bool:
+    """
+    Check if a process of the current host is running.
+    Processes are considered running on platforms other than POSIX.
+
+    :param process_id: The process identifier.
+    :return: True if the process is running, False otherwise.
+    """
+    if os.name != "posix":
+        return True
+    try:
+        # The signal 0 only checks that the process exists.
+        os.kill(process_id, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -1,25 +1,66 @@
-from typing import Dict
+import asyncio
+import logging
+import threading
+from itertools import groupby
+from typing import Collection, Dict, List, Optional, Set, Tuple
 
-from storage.auxiliary.filetools import join_paths
+from storage.auxiliary.filetools import (
+    append_file,
+    get_file_size,
+    is_file,
+    join_paths,
+    list_dir,
+    remove_file,
+    replace_file,
+    truncate_file,
+    write,
+)
+from storage.auxiliary.implementations.data_segment_builder import (
+    DataSegmentBuilder,
+)
+from storage.auxiliary.implementations.generation_map import DataFileGenerationMap
+from storage.auxiliary.implementations.range_index import RangeIndex
 from storage.auxiliary.implementations.record_converter import PwnedRecordConverter
 from storage.auxiliary.implementations.record_search import PwnedRecordSearch
+from storage.auxiliary.models.prefix_chunk import PrefixChunk
 from storage.auxiliary.models.state import DatasetID
 from storage.auxiliary.numeration import number_to_hex_code
 from storage.implementations.storage_base import PwnedStorageBase
-from storage.models.abstract import PwnedRangeProvider
+from storage.models.abstract import PwnedDatasetSource, PwnedRangeProvider
 from storage.models.pwned import PWNED_PREFIX_CAPACITY
-from storage.models.settings import BinaryPwnedStorageSettings
+from storage.models.settings import BinaryPwnedStorageSettings, RevisionSettings
+from storage.models.shard import PrefixShard
+
+logger = logging.getLogger(__name__)
 
 
 class BinaryPwnedStorage(PwnedStorageBase):
     """Stores Pwned password leak records in files in memory-effective binary format."""
 
+    DATA_FILE_EXTENSION: str = "dat"
+    """The extension of data files."""
+
+    SEGMENT_FILE_EXTENSION: str = "part"
+    """The extension of data file segments prepared separately from the beginning of the data file."""
+
+    REPLACEMENT_FILE_EXTENSION: str = "tmp"
+    """The extension of new data files that replace data files of the active dataset."""
+
+    GENERATION_MAP_FILE: str = "generations.map"
+    """The filename for storing the generations of data files in a dataset directory."""
+
+    RANGE_INDEX_FILE: str = "ranges.index"
+    """The filename of the range position index shared by processes in a dataset directory."""
+
     def __init__(
         self,
         resource_dir: str,
         range_provider: PwnedRangeProvider,
         revision_coroutine_quantity: int = PwnedStorageBase.DEFAULT_REVISION_COROUTINE_QUANTITY,
         settings: BinaryPwnedStorageSettings = BinaryPwnedStorageSettings(),
+        revision_settings: RevisionSettings = RevisionSettings(),
+        shard: PrefixShard = PrefixShard(),
+        dataset_source: Optional[PwnedDatasetSource] = None,
     ):
         """
         Initialize a new BinaryPwnedStorage instance.
@@ -28,61 +69,326 @@ class BinaryPwnedStorage(PwnedStorageBase):
         :param range_provider: The instance of the Pwned range provider.
         :param revision_coroutine_quantity: The number of coroutines to be used for requesting hashes during revision.
         :param settings: The settings for the binary storage.
+        :param revision_settings: The revision settings.
+        :param shard: The slice of the prefix space whose ranges are stored.
+          Data files only contain the ranges of the shard.
+        :param dataset_source: The storage whose active dataset is pulled during replication, if any.
         """
         self.__settings: BinaryPwnedStorageSettings = settings
-        super().__init__(resource_dir, range_provider, revision_coroutine_quantity)
+        super().__init__(
+            resource_dir,
+            range_provider,
+            revision_coroutine_quantity,
+            revision_settings,
+            shard,
+            dataset_source,
+        )
         self.__pwned_converter: PwnedRecordConverter = PwnedRecordConverter(
             settings.file_code_length,
             settings.occasion_numeric_type,
         )
         self.__record_search: PwnedRecordSearch = PwnedRecordSearch(
-            self.__pwned_converter
+            self.__pwned_converter,
+            self._observe_lookup_phase,
+            self._count_range_index_lookup,
         )
+        self.__range_index: Optional[Tuple[str, Optional[RangeIndex]]] = None
+        self.__range_index_lock: threading.Lock = threading.Lock()
+        self.__unsynced_builders: Set[DataSegmentBuilder] = set()
+        self.__unsynced_builder_lock: threading.Lock = threading.Lock()
 
     def _get_setting_dict(self) -> Dict:
         return self.__settings.to_dict()
 
-    def _get_range(self, prefix) -> str:
-        return self.__record_search.get_range(prefix, self._active_dataset_dir)
+    def _get_range(self, prefix: str, dataset_dir: str) -> str:
+        return self.__record_search.get_range(
+            prefix, dataset_dir, self.__get_range_index(dataset_dir)
+        )
+
+    @property
+    def _prefix_group_size(self) -> int:
+        return PWNED_PREFIX_CAPACITY // self.__settings.file_quantity
+
+    @property
+    def _is_in_place_preparation_supported(self) -> bool:
+        return True
+
+    async def _prepare_chunk(self, dataset: DatasetID, chunk: PrefixChunk) -> None:
+        dataset_dir = self._get_dataset_dir(dataset)
+        if self._is_dataset_active(dataset):
+            await self.__replace_data_files(dataset_dir, chunk)
+            return
+        builder = None
+        builder_file_index = None
+        try:
+            while not chunk.is_prepared and not self._is_preparation_interrupted:
+                prefix_index = chunk.next_prefix_index
+                file_index = prefix_index // self._prefix_group_size
+                if file_index != builder_file_index:
+                    if builder is not None:
+                        await builder.close()
+                        builder = None
+                    builder = self.__create_segment_builder(
+                        dataset_dir, chunk, file_index
+                    )
+                    builder_file_index = file_index
+                await self.__prepare_range(builder, prefix_index)
+                chunk.count_prepared_prefix()
+        finally:
+            if builder is not None:
+                await builder.close()
+
+    async def _refresh_prefix_group(
+        self,
+        dataset_dir: str,
+        group_index: int,
+        refreshed_prefix_indices: Collection[int],
+    ) -> None:
+        await self.__replace_data_file(
+            dataset_dir, group_index, refreshed_prefix_indices
+        )
 
-    async def _prepare_batch(self, dataset: DatasetID, batch_index: int) -> None:
+    async def _resume_preparation(self, dataset: DatasetID) -> None:
         dataset_dir = self._get_dataset_dir(dataset)
-        file_quantity = self.__settings.file_quantity
-        prefix_group_size = PWNED_PREFIX_CAPACITY // file_quantity
-        coroutine_quantity = self._revision_coroutine_quantity
-        preparation_offset = self._revision.get_batch_preparation_offset(batch_index)
-        first_batch_file_index = file_quantity * batch_index // coroutine_quantity
-        file_offset = preparation_offset // prefix_group_size
-        first_prefix_index = (
-            first_batch_file_index * prefix_group_size + preparation_offset
+        if self._is_dataset_active(dataset):
+            await asyncio.to_thread(lambda: self.__count_replaced_files(dataset_dir))
+            return
+        await asyncio.to_thread(lambda: self.__truncate_unprepared_data(dataset_dir))
+
+    def _is_dataset_file(self, name: str) -> bool:
+        return (
+            name.partition(".")[2] == self.DATA_FILE_EXTENSION
+            or name == self.GENERATION_MAP_FILE
+            or super()._is_dataset_file(name)
         )
-        for file_index in range(
-            first_batch_file_index + file_offset,
-            file_quantity * (batch_index + 1) // coroutine_quantity,
-        ):
-            file_path = join_paths(
-                dataset_dir, f"{number_to_hex_code(file_index, file_quantity)}.dat"
+
+    def _is_dataset_file_mutable(self, name: str) -> bool:
+        return name == self.GENERATION_MAP_FILE
+
+    def _sync_prepared_data(self) -> None:
+        with self.__unsynced_builder_lock:
+            builders = list(self.__unsynced_builders)
+        for builder in builders:
+            # A closed segment receives no more data, so it is synced for the last time.
+            is_closed = builder.is_closed
+            builder.sync()
+            if is_closed:
+                with self.__unsynced_builder_lock:
+                    self.__unsynced_builders.discard(builder)
+
+    async def _finish_preparation(self, dataset: DatasetID) -> None:
+        dataset_dir = self._get_dataset_dir(dataset)
+        await asyncio.to_thread(lambda: self.__merge_segments(dataset_dir))
+
+    async def __prepare_range(
+        self, builder: DataSegmentBuilder, prefix_index: int
+    ) -> None:
+        hash_prefix = number_to_hex_code(prefix_index, PWNED_PREFIX_CAPACITY)
+        if self._is_range_reusable(prefix_index):
+            data = bytearray()
+            is_unchanged = await self._receive_range(
+                prefix_index,
+                hash_prefix,
+                lambda record: data.extend(
+                    self.__pwned_converter.record_to_bytes(record, hash_prefix)
+                ),
+            )
+            if is_unchanged:
+                builder.reuse_range(prefix_index)
+            else:
+                await builder.write_range(prefix_index, data)
+            return
+        await builder.start_range()
+        try:
+            await self._receive_range(
+                prefix_index,
+                hash_prefix,
+                lambda record: builder.write(
+                    self.__pwned_converter.record_to_bytes(record, hash_prefix)
+                ),
             )
-            with open(file_path, "ab") as data_file:
-                for prefix_index in range(
-                    max(file_index * prefix_group_size, first_prefix_index),
-                    (file_index + 1) * prefix_group_size,
-                ):
-                    if (
-                        self._revision.is_cancelling
-                        or self._revision.is_stopping
-                        or self._revision.is_failed
-                        or self._revision.has_preparation_failed
-                    ):
-                        return
-                    hash_prefix = number_to_hex_code(
-                        prefix_index, PWNED_PREFIX_CAPACITY
+        except Exception:
+            builder.discard_range()
+            raise
+        builder.finish_range(prefix_index)
+
+    async def __replace_data_files(self, dataset_dir: str, chunk: PrefixChunk) -> None:
+        generation_map = self.__get_generation_map(dataset_dir)
+        while not chunk.is_prepared and not self._is_preparation_interrupted:
+            file_index = chunk.next_prefix_index // self._prefix_group_size
+            prepared_prefix_indices = await self.__replace_data_file(
+                dataset_dir, file_index
+            )
+            if prepared_prefix_indices is None:
+                return
+            generation_map.set(file_index, self._revision.start_ts)
+            for prefix_index in prepared_prefix_indices:
+                self._revision.count_prepared_prefix(prefix_index)
+                chunk.count_prepared_prefix()
+
+    async def __replace_data_file(
+        self,
+        dataset_dir: str,
+        file_index: int,
+        refreshed_prefix_indices: Optional[Collection[int]] = None,
+    ) -> Optional[List[int]]:
+        data_file_path = self.__get_data_file_path(dataset_dir, file_index)
+        new_data_file_path = f"{data_file_path}.{self.REPLACEMENT_FILE_EXTENSION}"
+        file_first_prefix_index = file_index * self._prefix_group_size
+        file_end_prefix_index = file_first_prefix_index + self._prefix_group_size
+        is_refreshed = refreshed_prefix_indices is not None
+        prepared_prefix_indices = list()
+        remove_file(new_data_file_path)
+        builder = DataSegmentBuilder(
+            new_data_file_path,
+            file_first_prefix_index,
+            file_end_prefix_index,
+            prepared_prefix_indices.append,
+            self.__record_search,
+            (is_refreshed or self._reusable_dataset_dir) and data_file_path,
+            self._count_written,
+            self._revision_settings.write_batch_size,
+        )
+        try:
+            try:
+                for prefix_index in self.__get_stored_prefix_indices(file_index):
+                    if is_refreshed:
+                        if prefix_index not in refreshed_prefix_indices:
+                            builder.reuse_range(prefix_index)
+                            continue
+                    elif self._is_preparation_interrupted:
+                        return None
+                    await self.__prepare_range(builder, prefix_index)
+            finally:
+                await builder.close()
+            # Lookups that have already opened the replaced file keep reading it.
+            await asyncio.to_thread(replace_file, data_file_path, new_data_file_path)
+        finally:
+            remove_file(new_data_file_path)
+        return prepared_prefix_indices
+
+    def __count_replaced_files(self, dataset_dir: str) -> None:
+        generation_map = self.__get_generation_map(dataset_dir)
+        for file_index in generation_map.find(self._revision.start_ts):
+            for prefix_index in self.__get_stored_prefix_indices(file_index):
+                self._revision.count_prepared_prefix(prefix_index)
+
+    def __get_stored_prefix_indices(self, file_index: int) -> range:
+        shard_prefix_indices = self.shard.prefix_indices
+        return range(
+            max(file_index * self._prefix_group_size, shard_prefix_indices.start),
+            min((file_index + 1) * self._prefix_group_size, shard_prefix_indices.stop),
+        )
+
+    def __get_generation_map(self, dataset_dir: str) -> DataFileGenerationMap:
+        return DataFileGenerationMap(join_paths(dataset_dir, self.GENERATION_MAP_FILE))
+
+    def __create_segment_builder(
+        self, dataset_dir: str, chunk: PrefixChunk, file_index: int
+    ) -> DataSegmentBuilder:
+        reusable_dataset_dir = self._reusable_dataset_dir
+        builder = DataSegmentBuilder(
+            self.__get_segment_path(dataset_dir, chunk, file_index),
+            file_index * self._prefix_group_size,
+            (file_index + 1) * self._prefix_group_size,
+            self._revision.count_prepared_prefix,
+            self.__record_search,
+            reusable_dataset_dir
+            and self.__get_data_file_path(reusable_dataset_dir, file_index),
+            self._count_written,
+            self._revision_settings.write_batch_size,
+        )
+        with self.__unsynced_builder_lock:
+            self.__unsynced_builders.add(builder)
+        return builder
+
+    def __get_range_index(self, dataset_dir: str) -> Optional[RangeIndex]:
+        with self.__range_index_lock:
+            if self.__range_index is None or self.__range_index[0] != dataset_dir:
+                # The index of the previous dataset is closed once its lookups are finished.
+                try:
+                    range_index = RangeIndex(
+                        join_paths(dataset_dir, self.RANGE_INDEX_FILE)
                     )
-                    records = await self._range_provider.get_range(hash_prefix)
-                    data_file.write(
-                        b"".join(
-                            self.__pwned_converter.record_to_bytes(record, hash_prefix)
-                            for record in records.split()
-                        )
+                except OSError:
+                    logger.exception(
+                        f"Failed to open the range index of {dataset_dir}."
                     )
-                    self._revision.count_prepared_prefix(batch_index)
+                    range_index = None
+                self.__range_index = (dataset_dir, range_index)
+            return self.__range_index[1]
+
+    def __get_data_file_path(self, dataset_dir: str, file_index: int) -> str:
+        file_code = number_to_hex_code(file_index, self.__settings.file_quantity)
+        return join_paths(dataset_dir, f"{file_code}.{self.DATA_FILE_EXTENSION}")
+
+    def __get_segment_path(
+        self, dataset_dir: str, chunk: PrefixChunk, file_index: int
+    ) -> str:
+        if chunk.first_prefix_index <= file_index * self._prefix_group_size:
+            return self.__get_data_file_path(dataset_dir, file_index)
+        file_code = number_to_hex_code(file_index, self.__settings.file_quantity)
+        first_prefix = number_to_hex_code(
+            chunk.first_prefix_index, PWNED_PREFIX_CAPACITY
+        )
+        return join_paths(
+            dataset_dir, f"{file_code}.{first_prefix}.{self.SEGMENT_FILE_EXTENSION}"
+        )
+
+    def __truncate_segment(self, segment_path: str, hash_prefix: str) -> None:
+        size = get_file_size(segment_path)
+        truncate_file(segment_path, size - size % self.__pwned_converter.record_size)
+        truncate_file(
+            segment_path,
+            self.__record_search.find_range_position(hash_prefix, segment_path),
+        )
+
+    def __truncate_unprepared_data(self, dataset_dir: str) -> None:
+        prepared_prefixes = self._revision.prepared_prefixes
+        for name in list_dir(dataset_dir):
+            file_code, _, extension = name.partition(".")
+            if extension == self.DATA_FILE_EXTENSION:
+                first_prefix_index = None
+            elif extension.endswith(f".{self.SEGMENT_FILE_EXTENSION}"):
+                first_prefix_index = int(extension.partition(".")[0], 16)
+            else:
+                continue
+            file_index = int(file_code, 16)
+            if first_prefix_index is None:
+                first_prefix_index = file_index * self._prefix_group_size
+            file_end_prefix_index = (file_index + 1) * self._prefix_group_size
+            unprepared_prefix_index = prepared_prefixes.find(
+                first_prefix_index, file_end_prefix_index, is_contained=False
+            )
+            segment_path = join_paths(dataset_dir, name)
+            if unprepared_prefix_index == first_prefix_index:
+                # The segment may be a link to a data file of the active dataset.
+                remove_file(segment_path)
+            elif unprepared_prefix_index < file_end_prefix_index:
+                self.__truncate_segment(
+                    segment_path,
+                    number_to_hex_code(unprepared_prefix_index, PWNED_PREFIX_CAPACITY),
+                )
+
+    def __merge_segments(self, dataset_dir: str) -> None:
+        segment_names = sorted(
+            name
+            for name in list_dir(dataset_dir)
+            if name.endswith(f".{self.SEGMENT_FILE_EXTENSION}")
+        )
+        for file_code, file_segment_names in groupby(
+            segment_names, lambda name: name.partition(".")[0]
+        ):
+            file_segment_names = list(file_segment_names)
+            data_file_path = join_paths(
+                dataset_dir, f"{file_code}.{self.DATA_FILE_EXTENSION}"
+            )
+            first_segment_prefix = file_segment_names[0].split(".")[1]
+            # The data file does not exist if the shard begins inside the prefix group.
+            if not is_file(data_file_path):
+                write(data_file_path, "")
+            self.__truncate_segment(data_file_path, first_segment_prefix)
+            for segment_name in file_segment_names:
+                segment_path = join_paths(dataset_dir, segment_name)
+                append_file(data_file_path, segment_path)
+                remove_file(segment_path)
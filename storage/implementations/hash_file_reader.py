@@ -0,0 +1,134 @@
+import asyncio
+from array import array
+from typing import AsyncIterator, List, Optional
+
+from storage.auxiliary.filetools import get_file_size
+from storage.models.abstract import PwnedRangeProvider
+from storage.models.pwned import PWNED_PREFIX_CAPACITY, PWNED_PREFIX_LENGTH
+
+
+class PwnedHashFileReader(PwnedRangeProvider):
+    """
+    Provides Pwned password leak record ranges from the downloadable Pwned hash file.
+    The file must contain SHA-1 hashes in upper case sorted by hash with one HASH:OCCASION record per line.
+    """
+
+    READ_BLOCK_SIZE: int = 16 * 1024 * 1024
+    """The size of blocks in bytes in which the file is read while being indexed."""
+
+    FILE_ENCODING: str = "ascii"
+    """The encoding of the hash file."""
+
+    def __init__(self, path: str):
+        """
+        Initialize a new PwnedHashFileReader instance.
+        :param path: The path to the hash file.
+        """
+        self.__path: str = path
+        self.__range_positions: Optional[array] = None
+        self.__indexing_lock: asyncio.Lock = asyncio.Lock()
+
+    async def get_range(self, hash_prefix: str) -> str:
+        """
+        Read the Pwned password leak record range for a hash prefix.
+
+        :param hash_prefix: The hash prefix.
+        :return: The range as plain text.
+        """
+        return "\n".join(await self.__read_records(hash_prefix))
+
+    async def stream_range(
+        self, hash_prefix: str, modified_since_ts: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Read the Pwned password leak record range for a hash prefix and iterate over its records.
+        The whole file is indexed once when a range is requested for the first time.
+
+        :param hash_prefix: The hash prefix.
+        :param modified_since_ts: Ignored since the file has no modification time for ranges.
+        :return: An asynchronous iterator over the range records.
+        """
+        for record in await self.__read_records(hash_prefix):
+            yield record
+
+    async def __read_records(self, hash_prefix: str) -> List[str]:
+        range_positions = await self.__get_range_positions()
+        prefix_index = int(hash_prefix, 16)
+        position = range_positions[prefix_index]
+        size = range_positions[prefix_index + 1] - position
+        if size == 0:
+            return list()
+        data = await asyncio.to_thread(self.__read, position, size)
+        return [
+            line.strip()[PWNED_PREFIX_LENGTH:].decode(self.FILE_ENCODING)
+            for line in data.split(b"\n")
+            if line.strip()
+        ]
+
+    def __read(self, position: int, size: int) -> bytes:
+        with open(self.__path, "rb") as file:
+            file.seek(position)
+            return file.read(size)
+
+    async def __get_range_positions(self) -> array:
+        if self.__range_positions is None:
+            async with self.__indexing_lock:
+                if self.__range_positions is None:
+                    self.__range_positions = await asyncio.to_thread(self.__index)
+        return self.__range_positions
+
+    def __index(self) -> array:
+        range_positions = array("q", [-1]) * (PWNED_PREFIX_CAPACITY + 1)
+        last_prefix_index = -1
+        block_position = 0
+        remainder = b""
+        with open(self.__path, "rb") as file:
+            while True:
+                data = file.read(self.READ_BLOCK_SIZE)
+                block = remainder + data
+                block_end = len(block) if not data else block.rfind(b"\n") + 1
+                last_prefix_index = self.__index_block(
+                    block, block_end, block_position, last_prefix_index, range_positions
+                )
+                remainder = block[block_end:]
+                block_position += block_end
+                if not data:
+                    break
+        range_positions[PWNED_PREFIX_CAPACITY] = get_file_size(self.__path)
+        for prefix_index in range(PWNED_PREFIX_CAPACITY - 1, -1, -1):
+            if range_positions[prefix_index] < 0:
+                range_positions[prefix_index] = range_positions[prefix_index + 1]
+        return range_positions
+
+    @staticmethod
+    def __index_block(
+        block: bytes,
+        block_end: int,
+        block_position: int,
+        last_prefix_index: int,
+        range_positions: array,
+    ) -> int:
+        line_position = 0
+        is_next_prefix_searched = True
+        while line_position < block_end:
+            line_prefix = block[line_position : line_position + PWNED_PREFIX_LENGTH]
+            if line_prefix.strip():
+                prefix_index = int(line_prefix, 16)
+                if prefix_index < last_prefix_index:
+                    raise ValueError("The hash file is not sorted.")
+                if prefix_index > last_prefix_index:
+                    range_positions[prefix_index] = block_position + line_position
+                    last_prefix_index = prefix_index
+                    is_next_prefix_searched = True
+                if is_next_prefix_searched and prefix_index + 1 < PWNED_PREFIX_CAPACITY:
+                    next_prefix = f"\n{prefix_index + 1:0{PWNED_PREFIX_LENGTH}X}"
+                    next_line_position = block.find(
+                        next_prefix.encode(), line_position, block_end
+                    )
+                    if next_line_position >= 0:
+                        line_position = next_line_position + 1
+                        continue
+                    # The next prefix is absent in the block, so lines are checked one by one.
+                    is_next_prefix_searched = False
+            line_position = block.find(b"\n", line_position, block_end) + 1 or block_end
+        return last_prefix_index
@@ -1,5 +1,5 @@
 import asyncio
-from typing import List
+from typing import AsyncIterator, List, Optional
 
 from storage.auxiliary import hasher
 from storage.implementations.requester import PwnedRequester
@@ -41,8 +41,22 @@ class MockedPwnedRequester(PwnedRequester):
         if hash_prefix in self.__required_prefixes:
             return await super().get_range(hash_prefix)
         await asyncio.sleep(0)
+        return "\n".join(self.__get_fictive_records(hash_prefix))
+
+    async def stream_range(
+        self, hash_prefix: str, modified_since_ts: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        hash_prefix = hash_prefix.upper()
+        if hash_prefix in self.__required_prefixes:
+            async for record in super().stream_range(hash_prefix, modified_since_ts):
+                yield record
+            return
+        await asyncio.sleep(0)
+        for record in self.__get_fictive_records(hash_prefix):
+            yield record
+
+    def __get_fictive_records(self, hash_prefix: str) -> List[str]:
         num = int(hash_prefix, base=16)
         offset = (num + 3234) % 54347 % (self.RECORD_QUANTITY * 9 // 11 + 1) + 1
         amount = (num + 2832) % 71203 % 8235 % 4 + 1
-        records = self.__records[offset : offset + amount]
-        return "\n".join(records)
+        return self.__records[offset : offset + amount]
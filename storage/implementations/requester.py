@@ -1,12 +1,14 @@
 import asyncio
 import ssl
-from typing import List
+from email.utils import formatdate
+from http import HTTPStatus
+from typing import AsyncIterator, List, Optional
 
 import aiohttp
 import certifi
 from aiohttp import ClientResponseError
 
-from storage.models.abstract import PwnedRangeProvider
+from storage.models.abstract import PwnedRangeProvider, RangeNotModifiedError
 
 
 class PwnedRequester(PwnedRangeProvider):
@@ -18,6 +20,9 @@ class PwnedRequester(PwnedRangeProvider):
     RETRY_DELAYS: List[int] = [0, 30, 60, 120]
     """List of time delays (in seconds) for retry attempts."""
 
+    RESPONSE_ENCODING: str = "ascii"
+    """The encoding of range API responses."""
+
     def __init__(self, user_agent: str):
         """
         Initialize a new PwnedRequester instance.
@@ -57,6 +62,41 @@ class PwnedRequester(PwnedRangeProvider):
                 response.raise_for_status()
                 return (await response.text()).replace("\r\n", "\n")
 
+    async def stream_range(
+        self, hash_prefix: str, modified_since_ts: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Request the Pwned password leak record range for a hash prefix
+        and iterate over its records while the response body is being received.
+
+        :param hash_prefix: The hash prefix to query.
+        :param modified_since_ts: The timestamp for the If-Modified-Since request header.
+          RangeNotModifiedError is raised if the API responds that the range has not been modified.
+        :return: An asynchronous iterator over the range records.
+        """
+        url = f"{self.PWNED_RANGE_API_BASE_URI}{hash_prefix}"
+        headers = {"user-agent": self.__user_agent}
+        if modified_since_ts is not None:
+            headers["if-modified-since"] = formatdate(modified_since_ts, usegmt=True)
+        ssl_context = ssl.create_default_context(cafile=certifi.where())
+        tcp_connector = aiohttp.TCPConnector(ssl=ssl_context)
+        async with aiohttp.ClientSession(connector=tcp_connector) as session:
+            async with session.get(url, headers=headers) as response:
+                if response.status == HTTPStatus.NOT_MODIFIED:
+                    raise RangeNotModifiedError(hash_prefix)
+                response.raise_for_status()
+                incomplete_line = b""
+                async for chunk in response.content.iter_any():
+                    lines = (incomplete_line + chunk).split(b"\n")
+                    incomplete_line = lines.pop()
+                    for line in lines:
+                        record = line.strip()
+                        if record:
+                            yield record.decode(self.RESPONSE_ENCODING)
+                record = incomplete_line.strip()
+                if record:
+                    yield record.decode(self.RESPONSE_ENCODING)
+
     @staticmethod
     async def __wait_for_delay(delay: int) -> None:
         await asyncio.sleep(delay)
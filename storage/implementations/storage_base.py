@@ -1,30 +1,84 @@
 import asyncio
+import contextvars
+import hashlib
 import json
+import logging
+import os
+import threading
+import time
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
 from json import JSONDecodeError
-from typing import Dict
+from typing import (
+    AsyncIterator,
+    BinaryIO,
+    Callable,
+    Collection,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
 
+from storage.auxiliary import hasher
 from storage.auxiliary.filetools import (
+    copy_file,
+    get_file_size,
+    is_dir,
     is_file,
     join_paths,
+    link_file,
+    list_dir,
     make_dir_if_not_exists,
-    make_empty_dir,
     read,
-    remove_dir,
     remove_file,
+    sync_dir,
+    sync_file,
     write,
+    write_atomically,
+)
+from storage.auxiliary.implementations.command_channel import CommandChannel
+from storage.auxiliary.implementations.dataset_archive import (
+    DatasetArchiveReader,
+    DatasetArchiveWriter,
 )
+from storage.auxiliary.implementations.io_governor import IOGovernor
+from storage.auxiliary.implementations.leader_lock import LeaderLock
+from storage.auxiliary.implementations.lookup_profiler import LookupProfiler
+from storage.auxiliary.implementations.prefix_scheduler import PrefixScheduler
+from storage.auxiliary.implementations.single_flight import SingleFlight
+from storage.auxiliary.implementations.trash_reaper import TrashReaper
 from storage.auxiliary.models.functional_revision import FunctionalRevision
+from storage.auxiliary.models.histogram import Histogram
+from storage.auxiliary.models.prefix_bitmap import PrefixBitmap
+from storage.auxiliary.models.prefix_chunk import PrefixChunk
+from storage.auxiliary.models.prefix_popularity import PrefixPopularity
+from storage.auxiliary.models.range_digests import RangeDigests
+from storage.auxiliary.models.revision_meter import RevisionMeter
 from storage.auxiliary.models.state import DatasetID, PwnedStorageState
+from storage.auxiliary.processes import is_process_running
 from storage.models.abstract import (
+    PrefixNotOwnedError,
+    PwnedDatasetSource,
     PwnedRangeProvider,
     PwnedStorage,
+    RangeNotModifiedError,
+    RollbackResult,
     UpdateCancellationResponse,
     UpdatePauseResponse,
     UpdateResponse,
     UpdateResult,
 )
-from storage.models.revision import Revision
+from storage.models.lookup import LookupPhase, LookupStatistics, LookupTrace
+from storage.models.manifest import DatasetFile, DatasetManifest
+from storage.models.metrics import Metric, MetricType
+from storage.models.pwned import PWNED_PREFIX_LENGTH
+from storage.models.revision import Revision, RevisionHistoryEntry, RevisionStatus
+from storage.models.settings import RevisionSettings
+from storage.models.shard import PrefixShard
+
+logger = logging.getLogger(__name__)
 
 
 class PreparationError(Exception):
@@ -40,34 +94,126 @@ class PwnedStorageBase(PwnedStorage):
     DEFAULT_REVISION_COROUTINE_QUANTITY: int = 64
     """Default quantity of coroutines to be used during update."""
 
-    STATE_WAIT_TIME_SECONDS: float = 0.5
-    """Wait time in seconds between state checks."""
-
     IMPLEMENTATION_FILE: str = "implementation.json"
     """The filename for storing implementation information."""
 
     REVISION_INFO_FILE: str = "revision.json"
     """The filename for storing revision information."""
 
+    REVISION_HISTORY_FILE: str = "revision-history.jsonl"
+    """The filename of the append-only log of finished revision runs, one JSON object per line."""
+
     STATE_FILE: str = "state.json"
     """The filename for storing state information."""
 
+    PREPARATION_CHECKPOINT_FILE: str = "preparation.bitmap"
+    """The filename for storing the bitmap of prepared prefixes."""
+
+    PREPARATION_CHECKPOINT_INTERVAL_SECONDS: float = 30
+    """Time in seconds between exports of prepared prefixes during preparation."""
+
+    INTERRUPTED_PREPARATION_MESSAGE: str = (
+        "The preparation was interrupted unexpectedly."
+    )
+    """The error message for a preparation that was interrupted without being stopped."""
+
+    TRASH_DIR: str = "trash"
+    """The name of the directory where retired datasets are removed in the background."""
+
+    GENERATIONS_DIR: str = "generations"
+    """The name of the directory where previous datasets are retained for rollback."""
+
+    RANGE_DIGEST_FILE: str = "ranges.digest"
+    """The filename for storing range digests in a dataset directory."""
+
     IMPLEMENTATION_NAME_KEY: str = "name"
     """The key in the implementation information JSON file to identify the implementation name."""
 
+    SHARD_KEY: str = "shard"
+    """The key in the implementation information JSON file to identify the stored shard."""
+
     DEFAULT_DATASET: DatasetID = DatasetID.A
     """The default dataset to be used."""
 
+    PREPARATION_CHUNK_SIZE: int = 4096
+    """The quantity of prefixes in initially scheduled preparation chunks."""
+
+    POPULAR_PREPARATION_CHUNK_SIZE: int = 256
+    """The quantity of prefixes in initially scheduled preparation chunks if they are ordered by popularity."""
+
+    POPULARITY_FILE: str = "popularity.counts"
+    """The filename for storing request counts of prefixes."""
+
+    FOLLOWER_POPULARITY_DIR: str = "popularity"
+    """The name of the directory where followers export their request counts of prefixes for the leader."""
+
+    POPULARITY_EXPORT_INTERVAL_SECONDS: float = 60
+    """Time in seconds between exports of request counts of prefixes."""
+
+    LOOKUP_THREAD_QUANTITY: int = 8
+    """The quantity of threads that search ranges."""
+
+    BOOTSTRAP_RANGE_CACHE_SIZE: int = 4096
+    """The maximum quantity of ranges requested on demand that are kept until the first dataset is prepared."""
+
+    LEADER_LOCK_FILE: str = "leader.lock"
+    """The filename of the lock held by the process that runs revisions if the storage is shared by processes."""
+
+    COMMAND_DIR: str = "commands"
+    """The name of the directory where processes pass commands to the leader process."""
+
+    COORDINATION_INTERVAL_SECONDS: float = 1
+    """Time in seconds between checks for commands by the leader and for state changes by followers."""
+
+    FOLLOWER_ACKNOWLEDGEMENT_TIMEOUT_SECONDS: float = 30
+    """The maximum time in seconds to wait for followers to stop reading a dataset after another dataset is activated."""
+
+    FORWARDING_TIMEOUT_SECONDS: float = 600
+    """The maximum time in seconds to wait for the leader to execute a forwarded command."""
+
+    REPLICATION_CHUNK_SIZE: int = 1024 * 1024
+    """The size in bytes of the pieces in which dataset files are transferred during replication."""
+
+    ARCHIVE_MANIFEST_FILE: str = "manifest.json"
+    """The last member of dataset archives, which describes the dataset files preceding it."""
+
+    RETIREMENT_PHASE: str = "retirement"
+    """The name of the purge phase in the revision history, which does not include the removal of retired data."""
+
+    PROFILE_DIR: str = "profiles"
+    """The name of the directory where sampled lookup profiles and thread stacks are dumped."""
+
+    __FOLLOWER_POPULARITY_FILE_SUFFIX: str = ".counts"
+
     class __JsonKeys:
         DATASET = "dataset"
+        GENERATION = "generation"
         IGNORE = "ignore"
-        BATCH_PREPARATION_OFFSETS = "batch_preparation_offsets"
+        RESULT = "result"
+        ERROR = "error"
+        ERROR_MESSAGE = "error_message"
+        FIRST_PREFIX = "first_prefix"
+        LAST_PREFIX = "last_prefix"
+        QUANTITY = "quantity"
+
+    class __Commands:
+        UPDATE = "update"
+        REQUEST_UPDATE = "request_update"
+        PAUSE = "pause"
+        CANCEL = "cancel"
+        ROLLBACK = "rollback"
+        REFRESH = "refresh"
+        REFRESH_HOT_PREFIXES = "refresh_hot_prefixes"
+        REPLICATE = "replicate"
 
     def __init__(
         self,
         resource_dir: str,
         range_provider: PwnedRangeProvider,
         revision_coroutine_quantity: int = DEFAULT_REVISION_COROUTINE_QUANTITY,
+        revision_settings: RevisionSettings = RevisionSettings(),
+        shard: PrefixShard = PrefixShard(),
+        dataset_source: Optional[PwnedDatasetSource] = None,
     ):
         """
         Initialize the Pwned storage base.
@@ -75,39 +221,189 @@ class PwnedStorageBase(PwnedStorage):
         :param resource_dir: The directory path for storing resources.
         :param range_provider: The instance of the Pwned range provider.
         :param revision_coroutine_quantity: The number of coroutines to be used for requesting hashed during revision.
+        :param revision_settings: The revision settings.
+        :param shard: The slice of the prefix space whose ranges are stored.
+        :param dataset_source: The storage whose active dataset is pulled during replication, if any.
         """
         self.__resource_dir: str = resource_dir
+        self.__shard: PrefixShard = shard
+        self.__dataset_source: Optional[PwnedDatasetSource] = dataset_source
         self.__implementation_file_path: str = join_paths(
             resource_dir, self.IMPLEMENTATION_FILE
         )
         self.__revision_file_path: str = join_paths(
             resource_dir, self.REVISION_INFO_FILE
         )
+        self.__revision_history_file_path: str = join_paths(
+            resource_dir, self.REVISION_HISTORY_FILE
+        )
         self.__state_file_path: str = join_paths(resource_dir, self.STATE_FILE)
-        self._range_provider: PwnedRangeProvider = range_provider
-        self._revision: FunctionalRevision = FunctionalRevision(
-            revision_coroutine_quantity
+        self.__checkpoint_file_path: str = join_paths(
+            resource_dir, self.PREPARATION_CHECKPOINT_FILE
         )
+        self._range_provider: PwnedRangeProvider = range_provider
+        self._revision: FunctionalRevision = self.__create_revision()
         self._revision_coroutine_quantity: int = revision_coroutine_quantity
+        self._revision_settings: RevisionSettings = revision_settings
+        self._io_governor: IOGovernor = IOGovernor(
+            revision_settings.write_byte_rate,
+            revision_settings.lookup_latency_target,
+        )
+        self.__reusable_dataset: Optional[DatasetID] = None
+        self.__reusable_digests: Optional[RangeDigests] = None
+        self.__prepared_digests: Optional[RangeDigests] = None
         self.__state: PwnedStorageState = PwnedStorageState()
+        self.__trash_reaper: TrashReaper = TrashReaper(
+            join_paths(resource_dir, self.TRASH_DIR),
+            revision_settings.purge_file_rate,
+            revision_settings.purge_byte_rate,
+        )
+        self.__generations_dir: str = join_paths(resource_dir, self.GENERATIONS_DIR)
+        self.__popularity_file_path: str = join_paths(
+            resource_dir, self.POPULARITY_FILE
+        )
+        self.__follower_popularity_dir: str = join_paths(
+            resource_dir, self.FOLLOWER_POPULARITY_DIR
+        )
+        self.__follower_popularity_file_path: str = join_paths(
+            self.__follower_popularity_dir,
+            f"{os.getpid()}{self.__FOLLOWER_POPULARITY_FILE_SUFFIX}",
+        )
+        self.__prefix_popularity: PrefixPopularity = PrefixPopularity()
+        self.__popularity_export_time: float = time.monotonic()
+        self.__popularity_export_task: Optional[asyncio.Task] = None
+        self.__hot_refresh_task: Optional[asyncio.Task] = None
+        self.__are_background_tasks_resumed: bool = False
+        # Ranges requested on demand are deliberately kept only in the memory of each process.
+        # The revision writes the data files of the pending dataset in prefix order, and the dataset
+        # cannot be read until it is activated, so it cannot take single ranges. The revision requests them anyway.
+        # The cache is needed only until the first dataset is activated, so losing it on a restart
+        # or not sharing it between worker processes costs only repeated requests of the same ranges.
+        self.__bootstrap_ranges: Dict[str, List[str]] = dict()
+        self.__bootstrap_flight: SingleFlight = SingleFlight()
+        self.__lookup_flight: SingleFlight = SingleFlight()
+        self.__lookup_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            self.LOOKUP_THREAD_QUANTITY, "lookup"
+        )
+        self.__is_rollback_ongoing: bool = False
+        self.__is_refresh_ongoing: bool = False
+        self.__is_replication_ongoing: bool = False
+        self.__replication_error_message: Optional[str] = None
+        self.__file_checksums: Dict[str, Tuple[Tuple[int, int, int], str]] = dict()
+        self.__metric_lock: threading.Lock = threading.Lock()
+        self.__lookup_phase_seconds: Dict[LookupPhase, Histogram] = dict()
+        self.__range_index_lookup_counts: Dict[str, int] = dict()
+        self.__in_flight_lookup_quantity: int = 0
+        self.__served_byte_quantity: int = 0
+        self.__bootstrap_cache_hit_quantity: int = 0
+        self.__bootstrap_cache_miss_quantity: int = 0
+        self.__received_range_quantity: int = 0
+        self.__unmodified_range_quantity: int = 0
+        self.__failed_range_quantity: int = 0
+        self.__write_throttle_seconds: Histogram = Histogram()
+        self.__lookup_profiler: Optional[LookupProfiler] = (
+            LookupProfiler(
+                join_paths(resource_dir, self.PROFILE_DIR),
+                revision_settings.lookup_profile_rate,
+            )
+            if revision_settings.lookup_profile_rate > 0
+            else None
+        )
+        self.__leader_lock: LeaderLock = LeaderLock(
+            join_paths(resource_dir, self.LEADER_LOCK_FILE)
+        )
+        self.__command_channel: CommandChannel = CommandChannel(
+            join_paths(resource_dir, self.COMMAND_DIR)
+        )
+        self.__coordination_task: Optional[asyncio.Task] = None
+        self.__acknowledged_state: Optional[Dict] = None
+        self.__is_leader: bool = True
         self.__initialize()
 
     @property
     def revision(self) -> Revision:
-        return self._revision.to_dto()
+        return self._revision.to_dto(self.__trash_reaper.progress)
+
+    async def get_revision_history(
+        self, limit: Optional[int] = None
+    ) -> List[RevisionHistoryEntry]:
+        return await asyncio.to_thread(self.__import_revision_history, limit)
 
     async def get_range(self, prefix: str) -> str:
+        start_time = time.perf_counter()
         prefix = self._validate_prefix(prefix)
-        while self._revision.is_transiting:
-            await self.__wait_a_little()
-        self.__state.count_started_request()
+        if not self.__shard.contains(prefix):
+            raise PrefixNotOwnedError(
+                prefix, PrefixShard.locate(prefix, self.__shard.quantity)
+            )
+        self.__resume_background_tasks()
+        self.__count_request(prefix)
+        self._observe_lookup_phase(
+            LookupPhase.VALIDATION, time.perf_counter() - start_time
+        )
+        self.__in_flight_lookup_quantity += 1
         try:
-            return self._get_range(prefix)
+            if (
+                self.__state.active_dataset is None
+                and self._revision_settings.is_on_demand_bootstrap
+            ):
+                records = await self.__get_bootstrap_range(prefix)
+            else:
+                records = await self.__lookup_flight.run(
+                    (self.__state.active_dataset, prefix),
+                    lambda: self.__look_up(prefix),
+                )
         finally:
-            self.__state.count_finished_request()
+            self.__in_flight_lookup_quantity -= 1
+        self.__served_byte_quantity += len(records)
+        return records
+
+    async def read_range(self, prefix: str) -> str:
+        """
+        Read the range for a hash prefix from the active dataset.
+        Unlike get_range, the read is not counted as a request of the prefix and never requests the range.
+
+        :param prefix: The hash prefix.
+        :return: The range as plain text.
+        :raises PrefixNotOwnedError: If the prefix belongs to another shard.
+        :raises ValueError: If there is no active dataset.
+        """
+        prefix = self._validate_prefix(prefix)
+        if not self.__shard.contains(prefix):
+            raise PrefixNotOwnedError(
+                prefix, PrefixShard.locate(prefix, self.__shard.quantity)
+            )
+        if self.__state.active_dataset is None:
+            raise ValueError("The storage has no active dataset.")
+        return await self.__look_up(prefix)
+
+    @property
+    def lookup_statistics(self) -> LookupStatistics:
+        return LookupStatistics(
+            self.__lookup_flight.call_quantity,
+            self.__lookup_flight.shared_call_quantity,
+        )
+
+    @property
+    def shard(self) -> PrefixShard:
+        return self.__shard
+
+    @property
+    def is_leader(self) -> bool:
+        """
+        Check if this instance runs revisions. If the storage is shared by processes,
+        only one of them is the leader and the others pass their commands to it.
+        :return: True if the instance is the leader, False otherwise.
+        """
+        return self.__is_leader
 
     async def update(self) -> UpdateResult:
-        if not self._revision.is_idle:
+        self.__resume_background_tasks()
+        if not self.__is_leader:
+            return UpdateResult(
+                await self.__forward(self.__Commands.UPDATE, UpdateResult.BUSY)
+            )
+        if self.__is_busy:
             return UpdateResult.BUSY
         self.__export_ignored_revision()
         self._revision.indicate_started()
@@ -120,8 +416,12 @@ class PwnedStorageBase(PwnedStorage):
         return UpdateResult.DONE
 
     def request_update(self) -> UpdateResponse:
-        if not self._revision.is_idle:
+        self.__resume_background_tasks()
+        if self.__is_busy:
             return UpdateResponse.BUSY
+        if not self.__is_leader:
+            self.__command_channel.send(self.__Commands.REQUEST_UPDATE)
+            return UpdateResponse.STARTED
         self.__export_ignored_revision()
         self._revision.indicate_started()
         self.__try_export_revision()
@@ -129,24 +429,341 @@ class PwnedStorageBase(PwnedStorage):
         return UpdateResponse.STARTED
 
     def request_update_pause(self) -> UpdatePauseResponse:
+        self.__resume_background_tasks()
         if not self._revision.is_preparing:
             return UpdatePauseResponse.IRRELEVANT
+        if not self.__is_leader:
+            self.__command_channel.send(self.__Commands.PAUSE)
+            return UpdatePauseResponse.ACCEPTED
         self.__export_ignored_revision()
         self._revision.indicate_stoppage()
         self.__try_export_revision()
         return UpdatePauseResponse.ACCEPTED
 
     def request_update_cancellation(self) -> UpdateCancellationResponse:
+        self.__resume_background_tasks()
         is_initially_stopped = self._revision.is_stopped
         if not self._revision.is_preparing and not is_initially_stopped:
             return UpdateCancellationResponse.IRRELEVANT
+        if not self.__is_leader:
+            self.__command_channel.send(self.__Commands.CANCEL)
+            return UpdateCancellationResponse.ACCEPTED
         self.__export_ignored_revision()
         self._revision.indicate_cancellation()
         self.__try_export_revision()
         if is_initially_stopped:
-            asyncio.create_task(self.__perform_cancellation())
+            asyncio.create_task(self.__cancel_stopped_revision())
         return UpdateCancellationResponse.ACCEPTED
 
+    @property
+    def active_generation(self) -> Optional[int]:
+        return self.__state.active_generation
+
+    @property
+    def retained_generations(self) -> List[int]:
+        if not is_dir(self.__generations_dir):
+            return list()
+        return sorted(
+            (int(name) for name in list_dir(self.__generations_dir) if name.isdigit()),
+            reverse=True,
+        )
+
+    async def rollback(self, generation: int) -> RollbackResult:
+        self.__resume_background_tasks()
+        if not self.__is_leader:
+            return RollbackResult(
+                await self.__forward(
+                    self.__Commands.ROLLBACK,
+                    RollbackResult.BUSY,
+                    {self.__JsonKeys.GENERATION: generation},
+                )
+            )
+        if self.__is_busy or self._revision.has_progress():
+            return RollbackResult.BUSY
+        active_dataset = self.__state.active_dataset
+        generation_dir = join_paths(self.__generations_dir, str(generation))
+        if active_dataset is None or not is_dir(generation_dir):
+            return RollbackResult.NOT_FOUND
+        self.__is_rollback_ongoing = True
+        try:
+            self.__retire_dataset(active_dataset.other)
+            os.rename(generation_dir, self._get_dataset_dir(active_dataset.other))
+            previous_generation = self.__state.active_generation
+            self.__activate_dataset(active_dataset.other, generation)
+            await self.__wait_for_release(active_dataset)
+            self.__retain_dataset(active_dataset, previous_generation)
+        finally:
+            self.__is_rollback_ongoing = False
+        return RollbackResult.DONE
+
+    async def refresh(self, first_prefix: str, last_prefix: str) -> UpdateResult:
+        first_prefix_index = int(self.__validate_refreshed_prefix(first_prefix), 16)
+        end_prefix_index = int(self.__validate_refreshed_prefix(last_prefix), 16) + 1
+        if first_prefix_index >= end_prefix_index:
+            raise ValueError("The first hash prefix must not follow the last one.")
+        shard_prefix_indices = self.__shard.prefix_indices
+        first_prefix_index = max(first_prefix_index, shard_prefix_indices.start)
+        end_prefix_index = min(end_prefix_index, shard_prefix_indices.stop)
+        if first_prefix_index >= end_prefix_index:
+            raise ValueError(
+                "The hash prefixes do not belong to the shard of the storage."
+            )
+        self.__resume_background_tasks()
+        if not self.__is_leader:
+            return UpdateResult(
+                await self.__forward(
+                    self.__Commands.REFRESH,
+                    UpdateResult.BUSY,
+                    {
+                        self.__JsonKeys.FIRST_PREFIX: first_prefix,
+                        self.__JsonKeys.LAST_PREFIX: last_prefix,
+                    },
+                )
+            )
+        return await self.__refresh_safely(range(first_prefix_index, end_prefix_index))
+
+    async def refresh_hot_prefixes(self, quantity: int) -> UpdateResult:
+        """
+        Request the records of the most requested prefixes again and atomically replace their data
+        in the active dataset.
+
+        :param quantity: The quantity of the most requested prefixes.
+        :return: The refresh result.
+        """
+        self.__resume_background_tasks()
+        if not self.__is_leader:
+            return UpdateResult(
+                await self.__forward(
+                    self.__Commands.REFRESH_HOT_PREFIXES,
+                    UpdateResult.BUSY,
+                    {self.__JsonKeys.QUANTITY: quantity},
+                )
+            )
+        return await self.__refresh_safely(
+            set(
+                await asyncio.to_thread(
+                    lambda: self.__sum_popularity().get_most_popular(quantity)
+                )
+            )
+        )
+
+    async def get_manifest(self) -> Optional[DatasetManifest]:
+        if self.__state.active_dataset is None:
+            return None
+        dataset = self.__state.pin_active_dataset()
+        generation = self.__state.active_generation or 0
+        try:
+            files = await asyncio.to_thread(
+                self.__describe_dataset_files, self._get_dataset_dir(dataset)
+            )
+        finally:
+            self.__state.release_dataset(dataset)
+        return DatasetManifest(generation, self.__get_implementation_info(), files)
+
+    def stream_dataset_file(self, name: str, generation: int) -> AsyncIterator[bytes]:
+        active_dataset = self.__state.active_dataset
+        if (
+            active_dataset is None
+            or generation != (self.__state.active_generation or 0)
+            or name != os.path.basename(name)
+            or not self._is_dataset_file(name)
+            or not is_file(join_paths(self._get_dataset_dir(active_dataset), name))
+        ):
+            raise ValueError(f"The active dataset has no file {name}.")
+        return self.__stream_dataset_file(name, generation)
+
+    @property
+    def replication_error_message(self) -> Optional[str]:
+        return self.__replication_error_message
+
+    async def replicate(self) -> UpdateResult:
+        self.__resume_background_tasks()
+        if not self.__is_leader:
+            result = await self.__forward_and_receive(
+                self.__Commands.REPLICATE, UpdateResult.BUSY
+            )
+            self.__replication_error_message = result.get(self.__JsonKeys.ERROR_MESSAGE)
+            return UpdateResult(result[self.__JsonKeys.RESULT])
+        if self.__dataset_source is None:
+            self.__replication_error_message = "No dataset source is configured."
+            return UpdateResult.FAILED
+        if self.__is_busy or self._revision.has_progress():
+            return UpdateResult.BUSY
+        self.__is_replication_ongoing = True
+        self.__replication_error_message = None
+        try:
+            await self.__replicate()
+        except Exception as error:
+            logger.exception("Failed to replicate the dataset.")
+            self.__replication_error_message = str(error) or type(error).__name__
+            return UpdateResult.FAILED
+        finally:
+            self.__is_replication_ongoing = False
+        return UpdateResult.DONE
+
+    async def export_archive(self, archive: BinaryIO) -> bool:
+        if self.__state.active_dataset is None:
+            return False
+        dataset = self.__state.pin_active_dataset()
+        try:
+            await asyncio.to_thread(self.__write_archive, archive, dataset)
+        finally:
+            self.__state.release_dataset(dataset)
+        return True
+
+    async def import_archive(self, archive: BinaryIO) -> UpdateResult:
+        self.__resume_background_tasks()
+        # The archive stream cannot be passed to the leader, so only the leader imports archives.
+        if not self.__is_leader or self.__is_busy or self._revision.has_progress():
+            return UpdateResult.BUSY
+        self.__is_replication_ongoing = True
+        self.__replication_error_message = None
+        try:
+            new_dataset = self.__make_received_dataset_dir()
+            try:
+                generation = await asyncio.to_thread(
+                    self.__read_archive, archive, self._get_dataset_dir(new_dataset)
+                )
+            except Exception:
+                self.__retire_dataset(new_dataset)
+                raise
+            await self.__activate_received_dataset(new_dataset, generation)
+        except Exception as error:
+            logger.exception("Failed to import the dataset archive.")
+            self.__replication_error_message = str(error) or type(error).__name__
+            return UpdateResult.FAILED
+        finally:
+            self.__is_replication_ongoing = False
+        return UpdateResult.DONE
+
+    @property
+    def metrics(self) -> List[Metric]:
+        lookup_phase_samples = [
+            ({"phase": phase.value}, histogram.to_value())
+            for phase, histogram in self.__lookup_phase_seconds.items()
+        ]
+        metrics = [
+            Metric(
+                "pwned_storage_lookup_phase_seconds",
+                MetricType.HISTOGRAM,
+                "Duration of range lookup phases.",
+                lookup_phase_samples,
+            ),
+            Metric.single(
+                "pwned_storage_in_flight_lookups",
+                MetricType.GAUGE,
+                "Quantity of range lookups in progress.",
+                self.__in_flight_lookup_quantity,
+            ),
+            Metric.single(
+                "pwned_storage_served_bytes_total",
+                MetricType.COUNTER,
+                "Size of served ranges in bytes.",
+                self.__served_byte_quantity,
+            ),
+            Metric.single(
+                "pwned_storage_lookups_total",
+                MetricType.COUNTER,
+                "Quantity of range lookups in the active dataset, including coalesced ones.",
+                self.__lookup_flight.call_quantity,
+            ),
+            Metric.single(
+                "pwned_storage_coalesced_lookups_total",
+                MetricType.COUNTER,
+                "Quantity of lookups that received the result of a concurrent lookup of the same prefix.",
+                self.__lookup_flight.shared_call_quantity,
+            ),
+        ]
+        if self.__range_index_lookup_counts:
+            metrics.append(
+                Metric(
+                    "pwned_storage_range_index_lookups_total",
+                    MetricType.COUNTER,
+                    "Quantity of range position lookups in the range index.",
+                    [
+                        ({"result": result}, count)
+                        for result, count in self.__range_index_lookup_counts.items()
+                    ],
+                )
+            )
+        if self._revision_settings.is_on_demand_bootstrap:
+            metrics.append(
+                Metric(
+                    "pwned_storage_bootstrap_cache_lookups_total",
+                    MetricType.COUNTER,
+                    "Quantity of lookups in the cache of ranges requested before the first update.",
+                    [
+                        ({"result": "hit"}, self.__bootstrap_cache_hit_quantity),
+                        ({"result": "miss"}, self.__bootstrap_cache_miss_quantity),
+                    ],
+                )
+            )
+        return metrics + [
+            Metric.single(
+                "pwned_storage_revision_ranges_total",
+                MetricType.COUNTER,
+                "Quantity of ranges received from the range provider during revisions.",
+                self.__received_range_quantity,
+            ),
+            Metric.single(
+                "pwned_storage_revision_unmodified_ranges_total",
+                MetricType.COUNTER,
+                "Quantity of ranges reused since the range provider reported no changes.",
+                self.__unmodified_range_quantity,
+            ),
+            Metric.single(
+                "pwned_storage_revision_range_errors_total",
+                MetricType.COUNTER,
+                "Quantity of failed range requests to the range provider.",
+                self.__failed_range_quantity,
+            ),
+            Metric.single(
+                "pwned_storage_written_bytes_total",
+                MetricType.COUNTER,
+                "Size of data written by revisions in bytes.",
+                self._io_governor.written_byte_quantity,
+            ),
+            Metric(
+                "pwned_storage_write_throttle_seconds",
+                MetricType.HISTOGRAM,
+                "Time each range waited for the write rate limit.",
+                [(dict(), self.__write_throttle_seconds.to_value())],
+            ),
+            Metric.single(
+                "pwned_storage_revision_progress_percent",
+                MetricType.GAUGE,
+                "Progress of the current revision.",
+                self._revision.progress or 0,
+            ),
+            Metric.single(
+                "pwned_storage_active_generation",
+                MetricType.GAUGE,
+                "Generation of the active dataset.",
+                self.__state.active_generation or 0,
+            ),
+        ]
+
+    async def wait_for_purge(self) -> None:
+        """Wait until retired datasets are removed."""
+        self.__resume_background_tasks()
+        await self.__trash_reaper.wait()
+
+    async def close(self) -> None:
+        periodic_tasks = [
+            task
+            for task in [self.__coordination_task, self.__hot_refresh_task]
+            if task is not None
+        ]
+        for task in periodic_tasks:
+            task.cancel()
+        await asyncio.gather(*periodic_tasks, return_exceptions=True)
+        # The export runs in a thread, so it cannot be cancelled.
+        if self.__popularity_export_task is not None:
+            await asyncio.gather(self.__popularity_export_task, return_exceptions=True)
+        if self.__lookup_profiler is not None:
+            self.__lookup_profiler.stop()
+        await self.__trash_reaper.close()
+
     @staticmethod
     def _validate_prefix(prefix: str) -> str:
         if not isinstance(prefix, str):
@@ -158,37 +775,234 @@ class PwnedStorageBase(PwnedStorage):
             raise ValueError("The hash prefix must have a length of 5 or 6 symbols.")
         return prefix
 
-    @staticmethod
-    async def __wait_a_little() -> None:
-        await asyncio.sleep(PwnedStorageBase.STATE_WAIT_TIME_SECONDS)
-
     @abstractmethod
     def _get_setting_dict(self) -> Dict:
         pass
 
     @abstractmethod
-    def _get_range(self, prefix) -> str:
+    def _get_range(self, prefix: str, dataset_dir: str) -> str:
+        pass
+
+    @property
+    @abstractmethod
+    def _prefix_group_size(self) -> int:
+        """The quantity of consecutive prefixes that are stored together."""
         pass
 
     @abstractmethod
-    async def _prepare_batch(self, dataset: DatasetID, batch_index: int) -> None:
+    async def _prepare_chunk(self, dataset: DatasetID, chunk: PrefixChunk) -> None:
+        pass
+
+    @abstractmethod
+    async def _refresh_prefix_group(
+        self,
+        dataset_dir: str,
+        group_index: int,
+        refreshed_prefix_indices: Collection[int],
+    ) -> None:
+        """
+        Request the ranges of a prefix group again and atomically replace the stored group.
+
+        :param dataset_dir: The directory of the active dataset.
+        :param group_index: The index of the prefix group.
+        :param refreshed_prefix_indices: The refreshed prefixes. Other prefixes of the group are kept as is.
+        """
+        pass
+
+    async def _resume_preparation(self, dataset: DatasetID) -> None:
+        pass
+
+    def _observe_lookup_phase(self, phase: LookupPhase, seconds: float) -> None:
+        """
+        Take the duration of a lookup phase into account. Durations can be observed from lookup threads.
+
+        :param phase: The lookup phase.
+        :param seconds: The duration in seconds.
+        """
+        histogram = self.__lookup_phase_seconds.get(phase)
+        if histogram is None:
+            histogram = self.__lookup_phase_seconds.setdefault(phase, Histogram())
+        histogram.observe(seconds)
+        trace = LookupTrace.current()
+        if trace is not None:
+            trace.add_phase(phase, seconds)
+
+    def _count_range_index_lookup(self, is_hit: bool) -> None:
+        """
+        Count a lookup of range positions in the range index. Lookups can be counted from lookup threads.
+        :param is_hit: Whether the positions have been found in the index.
+        """
+        result = "hit" if is_hit else "miss"
+        with self.__metric_lock:
+            self.__range_index_lookup_counts[result] = (
+                self.__range_index_lookup_counts.get(result, 0) + 1
+            )
+
+    def _is_dataset_file(self, name: str) -> bool:
+        """
+        Check if a file of a dataset directory belongs to the dataset, which means that it is replicated.
+
+        :param name: The name of the file.
+        :return: True if the file belongs to the dataset, False if it is temporary or local to the storage.
+        """
+        return name == self.RANGE_DIGEST_FILE
+
+    def _is_dataset_file_mutable(self, name: str) -> bool:
+        """
+        Check if a dataset file is modified in place rather than replaced, so it cannot be shared through hard links.
+
+        :param name: The name of the file.
+        :return: True if the file is modified in place, False otherwise.
+        """
+        return False
+
+    async def _finish_preparation(self, dataset: DatasetID) -> None:
+        pass
+
+    def _sync_prepared_data(self) -> None:
+        """
+        Commit the data of the prepared prefixes written since the previous call to disk.
+        The method is called from a separate thread before a checkpoint is exported.
+        """
         pass
 
     @property
-    def __class_name(self) -> str:
-        return self.__class__.__name__
+    def _is_in_place_preparation_supported(self) -> bool:
+        """Whether data files of the active dataset can be replaced one by one during preparation."""
+        return False
 
     @property
-    def _active_dataset_dir(self) -> str:
-        if self.__state.active_dataset is None:
-            raise RuntimeError("The storage has no active dataset.")
-        return self._get_dataset_dir(self.__state.active_dataset)
+    def _is_preparation_interrupted(self) -> bool:
+        return not self._revision.is_preparing
+
+    @property
+    def _reusable_dataset_dir(self) -> Optional[str]:
+        """The directory of the dataset whose unchanged ranges are reused during preparation."""
+        if self.__reusable_dataset is None:
+            return None
+        return self._get_dataset_dir(self.__reusable_dataset)
+
+    def _is_dataset_active(self, dataset: DatasetID) -> bool:
+        """
+        Check if a dataset is active, which means that it is prepared in place if it is being prepared.
+
+        :param dataset: The dataset.
+        :return: True if the dataset is active, False otherwise.
+        """
+        return self.__state.active_dataset == dataset
+
+    def _is_range_reusable(self, prefix_index: int) -> bool:
+        """
+        Check if a range may be reused from the active dataset if it has not changed.
+
+        :param prefix_index: The prefix index of the range.
+        :return: True if the range is reusable, False otherwise.
+        """
+        return (
+            self.__reusable_digests is not None
+            and self.__reusable_digests.get(prefix_index) is not None
+        )
+
+    async def _receive_range(
+        self, prefix_index: int, hash_prefix: str, on_record: Callable[[str], None]
+    ) -> bool:
+        """
+        Receive the records of a range from the range provider.
+        The request is conditional if the range is reusable.
+
+        :param prefix_index: The prefix index of the range.
+        :param hash_prefix: The hash prefix of the range.
+        :param on_record: The callback that receives each record.
+        :return: True if the range is reusable and has not changed, False otherwise.
+          Records may be passed only partially or not at all if the range has not changed.
+        """
+        meter = self._revision.meter
+        throttle_start_time = time.perf_counter()
+        await self._io_governor.throttle()
+        request_time = time.perf_counter()
+        self.__write_throttle_seconds.observe(request_time - throttle_start_time)
+        if meter is not None:
+            meter.observe_throttle(request_time - throttle_start_time)
+        reusable_digest = None
+        if self._is_range_reusable(prefix_index):
+            reusable_digest = self.__reusable_digests.get(prefix_index)
+        range_hash = (
+            None if self.__prepared_digests is None else RangeDigests.create_hash()
+        )
+        try:
+            if reusable_digest is None:
+                records = self._range_provider.stream_range(hash_prefix)
+            else:
+                records = self._range_provider.stream_range(
+                    hash_prefix, self.__reusable_digests.revision_ts
+                )
+            record_quantity = 0
+            byte_quantity = 0
+            processing_seconds = 0
+            async for record in records:
+                record_time = time.perf_counter()
+                if range_hash is not None:
+                    range_hash.update(record.encode())
+                    range_hash.update(b"\n")
+                on_record(record)
+                record_quantity += 1
+                byte_quantity += len(record) + 1
+                processing_seconds += time.perf_counter() - record_time
+            digest = None if range_hash is None else range_hash.digest()
+            self.__received_range_quantity += 1
+            if meter is not None:
+                meter.count_range(
+                    record_quantity,
+                    byte_quantity,
+                    time.perf_counter() - request_time - processing_seconds,
+                    processing_seconds,
+                )
+        except RangeNotModifiedError:
+            if reusable_digest is None:
+                self.__count_range_error(meter)
+                raise
+            self.__unmodified_range_quantity += 1
+            digest = reusable_digest
+        except Exception:
+            self.__count_range_error(meter)
+            raise
+        if digest is not None:
+            self.__prepared_digests.set(prefix_index, digest)
+        return reusable_digest is not None and digest == reusable_digest
+
+    def _count_written(self, size: int) -> None:
+        """
+        Count data written during a revision.
+        :param size: The size of the data in bytes.
+        """
+        self._io_governor.count_written(size)
+        meter = self._revision.meter
+        if meter is not None:
+            meter.count_written(size)
+
+    def __count_range_error(self, meter: Optional[RevisionMeter]) -> None:
+        self.__failed_range_quantity += 1
+        if meter is not None:
+            meter.count_range_error()
+
+    @property
+    def __is_busy(self) -> bool:
+        return (
+            not self._revision.is_idle
+            or self.__is_rollback_ongoing
+            or self.__is_refresh_ongoing
+            or self.__is_replication_ongoing
+        )
+
+    @property
+    def __class_name(self) -> str:
+        return self.__class__.__name__
 
     def _get_dataset_dir(self, dataset: DatasetID) -> str:
         return join_paths(self.__resource_dir, dataset.dir_name)
 
     async def __update_safely(self) -> None:
-        new_dataset = (self.__state.active_dataset or self.DEFAULT_DATASET.other).other
+        new_dataset = self.__choose_new_dataset()
         try:
             await self.__update(new_dataset)
         except Exception as error:
@@ -199,13 +1013,33 @@ class PwnedStorageBase(PwnedStorage):
                 self._revision.indicate_failed(error)
             self.__try_export_revision()
         if self._revision.is_cancelled or self._revision.is_failed:
-            await self.__try_remove_dataset(new_dataset)
+            if not self._is_dataset_active(new_dataset):
+                self.__retire_dataset(new_dataset)
         if self._revision.is_completed:
-            await self.__try_remove_dataset(new_dataset.other)
+            self.__retire_dataset(new_dataset.other)
+        await self.__record_revision_history_safely()
+
+    async def __cancel_stopped_revision(self) -> None:
+        await self.__perform_cancellation()
+        await self.__record_revision_history_safely()
+
+    def __choose_new_dataset(self) -> DatasetID:
+        active_dataset = self.__state.active_dataset
+        if active_dataset is None:
+            return self.DEFAULT_DATASET
+        # A revision that has prepared data in the other dataset is resumed there.
+        if (
+            self._revision_settings.is_in_place
+            and self._is_in_place_preparation_supported
+            and not is_dir(self._get_dataset_dir(active_dataset.other))
+        ):
+            return active_dataset
+        return active_dataset.other
 
     async def __update(self, new_dataset: DatasetID) -> None:
         await self.__prepare_new_dataset(new_dataset)
         if self._revision.has_preparation_failed:
+            self.__try_export_revision()
             return
         if self._revision.is_stopping:
             self.__export_ignored_revision()
@@ -218,54 +1052,843 @@ class PwnedStorageBase(PwnedStorage):
         self.__export_ignored_revision()
         self._revision.indicate_prepared()
         self.__try_export_revision()
-        while self.__state.has_active_requests:
-            await self.__wait_a_little()
-        self.__state.mark_to_be_ignored()
-        self.__export_state()
-        self.__state.active_dataset = new_dataset
-        self.__state.mark_not_to_be_ignored()
-        self.__export_state()
+        remove_file(self.__checkpoint_file_path)
+        previous_generation = self.__state.active_generation
+        self.__activate_dataset(new_dataset, self._revision.start_ts)
         self.__export_ignored_revision()
         self._revision.indicate_transited()
         self.__try_export_revision()
-        await self.__try_remove_dataset(new_dataset.other)
+        await self.__wait_for_release(new_dataset.other)
+        self.__retain_dataset(new_dataset.other, previous_generation)
         self.__export_ignored_revision()
         self._revision.indicate_completed()
         self.__try_export_revision()
 
+    async def __refresh_safely(
+        self, refreshed_prefix_indices: Collection[int]
+    ) -> UpdateResult:
+        self.__resume_background_tasks()
+        if self.__is_busy:
+            return UpdateResult.BUSY
+        if self.__state.active_dataset is None:
+            return UpdateResult.FAILED
+        self.__is_refresh_ongoing = True
+        try:
+            is_refreshed = await self.__refresh(
+                self._get_dataset_dir(self.__state.active_dataset),
+                refreshed_prefix_indices,
+            )
+        finally:
+            self.__is_refresh_ongoing = False
+        return UpdateResult.DONE if is_refreshed else UpdateResult.FAILED
+
+    async def __refresh(
+        self, dataset_dir: str, refreshed_prefix_indices: Collection[int]
+    ) -> bool:
+        if isinstance(refreshed_prefix_indices, range):
+            refreshed_group_indices = range(
+                refreshed_prefix_indices.start // self._prefix_group_size,
+                (refreshed_prefix_indices.stop - 1) // self._prefix_group_size + 1,
+            )
+        else:
+            refreshed_group_indices = sorted(
+                {
+                    prefix_index // self._prefix_group_size
+                    for prefix_index in refreshed_prefix_indices
+                }
+            )
+        group_indices = iter(refreshed_group_indices)
+        errors: List[Exception] = list()
+
+        async def __run_refresh_coroutine() -> None:
+            for group_index in group_indices:
+                if errors:
+                    return
+                try:
+                    await self._refresh_prefix_group(
+                        dataset_dir, group_index, refreshed_prefix_indices
+                    )
+                except Exception as error:
+                    logger.exception(f"Failed to refresh prefix group {group_index}.")
+                    errors.append(error)
+
+        await asyncio.gather(
+            *[
+                __run_refresh_coroutine()
+                for _ in range(self._revision_coroutine_quantity)
+            ]
+        )
+        return not errors
+
+    @staticmethod
+    def __validate_refreshed_prefix(prefix: str) -> str:
+        prefix = PwnedStorageBase._validate_prefix(prefix)
+        if len(prefix) != PWNED_PREFIX_LENGTH:
+            raise ValueError(
+                f"The hash prefix must have a length of {PWNED_PREFIX_LENGTH} symbols."
+            )
+        return prefix
+
+    async def __replicate(self) -> None:
+        manifest = await self.__dataset_source.get_manifest()
+        if manifest.settings != self.__get_implementation_info():
+            raise ValueError("The dataset source has other implementation settings.")
+        active_dataset = self.__state.active_dataset
+        active_manifest = await self.get_manifest()
+        active_checksums = (
+            dict()
+            if active_manifest is None
+            else {file.name: file.checksum for file in active_manifest.files}
+        )
+        # Files of the active dataset of the source may have been refreshed within the same generation.
+        if active_manifest is not None and active_checksums == {
+            file.name: file.checksum for file in manifest.files
+        }:
+            return
+        new_dataset = self.__make_received_dataset_dir()
+        new_dataset_dir = self._get_dataset_dir(new_dataset)
+        files = iter(manifest.files)
+        errors: List[Exception] = list()
+
+        async def __run_replication_coroutine() -> None:
+            for file in files:
+                if errors:
+                    return
+                try:
+                    if active_checksums.get(file.name) == file.checksum:
+                        # Files modified in place must not be shared with the active dataset.
+                        await asyncio.to_thread(
+                            (
+                                copy_file
+                                if self._is_dataset_file_mutable(file.name)
+                                else link_file
+                            ),
+                            join_paths(new_dataset_dir, file.name),
+                            join_paths(
+                                self._get_dataset_dir(active_dataset), file.name
+                            ),
+                        )
+                    else:
+                        await self.__pull_dataset_file(
+                            file, manifest.generation, new_dataset_dir
+                        )
+                except Exception as error:
+                    errors.append(error)
+
+        await asyncio.gather(
+            *[
+                __run_replication_coroutine()
+                for _ in range(self._revision_coroutine_quantity)
+            ]
+        )
+        if errors:
+            self.__retire_dataset(new_dataset)
+            raise errors[0]
+        await self.__activate_received_dataset(new_dataset, manifest.generation)
+
+    def __make_received_dataset_dir(self) -> DatasetID:
+        active_dataset = self.__state.active_dataset
+        dataset = (
+            self.DEFAULT_DATASET if active_dataset is None else active_dataset.other
+        )
+        self.__retire_dataset(dataset)
+        make_dir_if_not_exists(self._get_dataset_dir(dataset))
+        return dataset
+
+    async def __activate_received_dataset(
+        self, dataset: DatasetID, generation: int
+    ) -> None:
+        await asyncio.to_thread(self.__sync_dataset_dir, dataset)
+        previous_dataset = self.__state.active_dataset
+        previous_generation = self.__state.active_generation
+        self.__activate_dataset(dataset, generation)
+        if previous_dataset is not None:
+            await self.__wait_for_release(previous_dataset)
+            self.__retain_dataset(previous_dataset, previous_generation)
+
+    def __sync_dataset_dir(self, dataset: DatasetID) -> None:
+        dataset_dir = self._get_dataset_dir(dataset)
+        for name in list_dir(dataset_dir):
+            sync_file(join_paths(dataset_dir, name))
+        sync_dir(dataset_dir)
+
+    def __write_archive(self, archive: BinaryIO, dataset: DatasetID) -> None:
+        dataset_dir = self._get_dataset_dir(dataset)
+        implementation_info = self.__get_implementation_info()
+        writer = DatasetArchiveWriter(archive)
+        writer.write_json(self.IMPLEMENTATION_FILE, implementation_info)
+        files = [
+            writer.write_file(join_paths(dataset_dir, name))
+            for name in sorted(list_dir(dataset_dir))
+            if self._is_dataset_file(name)
+        ]
+        # The manifest goes last, since checksums are calculated while the files are written.
+        manifest = DatasetManifest(
+            self.__state.active_generation or 0, implementation_info, files
+        )
+        writer.write_json(self.ARCHIVE_MANIFEST_FILE, manifest.to_json())
+        writer.close()
+
+    def __read_archive(self, archive: BinaryIO, dataset_dir: str) -> int:
+        reader = DatasetArchiveReader(archive)
+        members = reader.members()
+        name, content = next(members, (None, None))
+        if (
+            name != self.IMPLEMENTATION_FILE
+            or reader.read_json(content) != self.__get_implementation_info()
+        ):
+            raise ValueError("The archive has other implementation settings.")
+        files: Dict[str, DatasetFile] = dict()
+        manifest = None
+        for name, content in members:
+            if name == self.ARCHIVE_MANIFEST_FILE:
+                manifest = DatasetManifest.from_json(reader.read_json(content))
+                break
+            if (
+                name != os.path.basename(name)
+                or not self._is_dataset_file(name)
+                or name in files
+            ):
+                raise ValueError(f"The archive member {name} is not a dataset file.")
+            files[name] = reader.copy_file(name, content, join_paths(dataset_dir, name))
+        reader.close()
+        if manifest is None or manifest.settings != self.__get_implementation_info():
+            raise ValueError("The archive has no valid manifest.")
+        if {file.name: (file.size, file.checksum) for file in manifest.files} != {
+            file.name: (file.size, file.checksum) for file in files.values()
+        }:
+            raise ValueError("The archive is corrupted.")
+        return manifest.generation
+
+    async def __pull_dataset_file(
+        self, file: DatasetFile, generation: int, dataset_dir: str
+    ) -> None:
+        checksum = hashlib.sha256()
+        size = 0
+        with open(join_paths(dataset_dir, file.name), "wb") as dataset_file:
+            async for chunk in self.__dataset_source.stream_file(file.name, generation):
+                await self._io_governor.throttle()
+                checksum.update(chunk)
+                size += len(chunk)
+                await asyncio.to_thread(dataset_file.write, chunk)
+                self._io_governor.count_written(len(chunk))
+        if size != file.size or checksum.hexdigest() != file.checksum:
+            raise ValueError(f"The pulled dataset file {file.name} is corrupted.")
+
+    async def __stream_dataset_file(
+        self, name: str, generation: int
+    ) -> AsyncIterator[bytes]:
+        dataset = self.__state.pin_active_dataset()
+        try:
+            # Another dataset may have been activated since the file was requested.
+            if generation != (self.__state.active_generation or 0):
+                raise ValueError(f"The active dataset has no file {name}.")
+            with open(
+                join_paths(self._get_dataset_dir(dataset), name), "rb"
+            ) as dataset_file:
+                while True:
+                    chunk = await asyncio.to_thread(
+                        dataset_file.read, self.REPLICATION_CHUNK_SIZE
+                    )
+                    if not chunk:
+                        return
+                    yield chunk
+        finally:
+            self.__state.release_dataset(dataset)
+
+    async def __record_revision_history_safely(self) -> None:
+        try:
+            await self.__record_revision_history()
+        except Exception:
+            logger.exception("Failed to record the revision history.")
+
+    async def __record_revision_history(self) -> None:
+        revision = self._revision
+        # The run is described before the dataset is measured, since a stopped revision may be cancelled meanwhile.
+        run_description = (
+            revision.status,
+            revision.start_ts,
+            revision.end_ts,
+            {
+                self.__get_phase_name(status): round(seconds, 3)
+                for status, seconds in revision.phase_seconds.items()
+            },
+            revision.throughput,
+            revision.error_message,
+            self.__state.active_generation,
+        )
+        dataset_size = None
+        if self.__state.active_dataset is not None:
+            dataset = self.__state.pin_active_dataset()
+            try:
+                dataset_size = await asyncio.to_thread(
+                    self.__measure_dataset_size, self._get_dataset_dir(dataset)
+                )
+            finally:
+                self.__state.release_dataset(dataset)
+        entry = RevisionHistoryEntry(*run_description, dataset_size)
+        # A single short line is appended at once, so processes never see a partially written entry of another one.
+        write(self.__revision_history_file_path, json.dumps(entry.to_json()) + "\n")
+
+    def __get_phase_name(self, status: RevisionStatus) -> str:
+        # The dataset is only retired during the purge, its removal by the trash reaper is not awaited.
+        if status == RevisionStatus.PURGE:
+            return self.RETIREMENT_PHASE
+        return status.value
+
+    def __import_revision_history(
+        self, limit: Optional[int]
+    ) -> List[RevisionHistoryEntry]:
+        if not is_file(self.__revision_history_file_path):
+            return list()
+        entries = list()
+        for line in read(self.__revision_history_file_path).splitlines():
+            try:
+                entry_json = json.loads(line)
+            except JSONDecodeError:
+                continue
+            entry = (
+                RevisionHistoryEntry.from_json(entry_json)
+                if isinstance(entry_json, dict)
+                else None
+            )
+            if entry is not None:
+                entries.append(entry)
+        if limit is not None:
+            entries = entries[len(entries) - limit :] if limit > 0 else list()
+        return entries
+
+    def __measure_dataset_size(self, dataset_dir: str) -> int:
+        return sum(
+            get_file_size(join_paths(dataset_dir, name))
+            for name in list_dir(dataset_dir)
+            if self._is_dataset_file(name)
+        )
+
+    def __describe_dataset_files(self, dataset_dir: str) -> List[DatasetFile]:
+        files = list()
+        for name in sorted(list_dir(dataset_dir)):
+            if not self._is_dataset_file(name):
+                continue
+            path = join_paths(dataset_dir, name)
+            stat = os.stat(path)
+            identity = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            # Checksums are only calculated again for files that have been replaced or changed.
+            known_checksum = self.__file_checksums.get(path)
+            if known_checksum is None or known_checksum[0] != identity:
+                known_checksum = (identity, hasher.sha256_file(path))
+                self.__file_checksums[path] = known_checksum
+            files.append(DatasetFile(name, stat.st_size, known_checksum[1]))
+        return files
+
+    def __activate_dataset(self, dataset: DatasetID, generation: int) -> None:
+        self.__state.mark_to_be_ignored()
+        self.__export_state()
+        self.__state.active_dataset = dataset
+        self.__state.active_generation = generation
+        self.__state.mark_not_to_be_ignored()
+        self.__export_state()
+        self.__bootstrap_ranges.clear()
+
     async def __perform_cancellation(self):
         self.__export_ignored_revision()
         self._revision.indicate_cancelled()
         self.__try_export_revision()
-        await self.__try_remove_dataset(self.__state.active_dataset.other)
+        remove_file(self.__checkpoint_file_path)
+        self.__retire_dataset(self.__state.active_dataset.other)
 
     async def __prepare_new_dataset(self, dataset: DatasetID) -> None:
-        if not self._revision.has_progress():
-            dataset_dir = self._get_dataset_dir(dataset)
-            await asyncio.to_thread(lambda: make_empty_dir(dataset_dir))
-        await asyncio.gather(
-            *[
-                self.__prepare_batch(dataset, batch_index)
-                for batch_index in range(self._revision_coroutine_quantity)
-            ]
+        dataset_dir = self._get_dataset_dir(dataset)
+        if self._revision.has_progress() and is_dir(dataset_dir):
+            await self._resume_preparation(dataset)
+        else:
+            self._revision.clear_progress()
+            remove_file(self.__checkpoint_file_path)
+            if not self._is_dataset_active(dataset):
+                self.__retire_dataset(dataset)
+            make_dir_if_not_exists(dataset_dir)
+        await asyncio.to_thread(lambda: self.__import_range_digests(dataset))
+        self._revision.start_metering()
+        scheduler = PrefixScheduler(
+            await asyncio.to_thread(self.__create_preparation_chunks),
+            self._prefix_group_size,
+            is_alignment_strict=self._is_dataset_active(dataset),
+        )
+        checkpoint_task = asyncio.create_task(
+            self.__export_checkpoints_periodically(dataset)
         )
-
-    async def __prepare_batch(self, dataset: DatasetID, batch_index: int) -> None:
         try:
-            await self._prepare_batch(dataset, batch_index)
+            await asyncio.gather(
+                *[
+                    self.__run_preparation_coroutine(dataset, scheduler)
+                    for _ in range(self._revision_coroutine_quantity)
+                ]
+            )
+        finally:
+            checkpoint_task.cancel()
+        await self.__export_checkpoint(dataset)
+        self.__reusable_dataset = None
+        self.__reusable_digests = None
+        self.__prepared_digests = None
+        if self._is_preparation_interrupted:
+            return
+        try:
+            await self._finish_preparation(dataset)
         except Exception as error:
             self._revision.indicate_preparation_failed(error)
 
-    async def __try_remove_dataset(self, dataset: DatasetID) -> None:
+    async def __run_preparation_coroutine(
+        self, dataset: DatasetID, scheduler: PrefixScheduler
+    ) -> None:
+        while not self._is_preparation_interrupted:
+            chunk = scheduler.take()
+            if chunk is None:
+                return
+            first_prefix_index = chunk.next_prefix_index
+            start_time = time.perf_counter()
+            try:
+                await self._prepare_chunk(dataset, chunk)
+            except Exception as error:
+                self._revision.indicate_preparation_failed(error)
+            finally:
+                scheduler.release(chunk)
+            meter = self._revision.meter
+            if meter is not None and chunk.is_prepared:
+                meter.observe_chunk(
+                    first_prefix_index,
+                    chunk.end_prefix_index,
+                    time.perf_counter() - start_time,
+                )
+
+    def __create_preparation_chunks(self) -> List[PrefixChunk]:
+        is_popularity_ordered = self._revision_settings.is_popularity_ordered
+        chunk_size = max(
+            (
+                self.POPULAR_PREPARATION_CHUNK_SIZE
+                if is_popularity_ordered
+                else self.PREPARATION_CHUNK_SIZE
+            ),
+            self._prefix_group_size,
+        )
+        prepared_prefixes = self._revision.prepared_prefixes
+        shard_prefix_indices = self.__shard.prefix_indices
+        chunks = [
+            PrefixChunk(first_prefix_index, end_prefix_index)
+            for chunk_index in range(
+                shard_prefix_indices.start // chunk_size,
+                (shard_prefix_indices.stop - 1) // chunk_size + 1,
+            )
+            for first_prefix_index, end_prefix_index in prepared_prefixes.get_missing_ranges(
+                max(chunk_index * chunk_size, shard_prefix_indices.start),
+                min((chunk_index + 1) * chunk_size, shard_prefix_indices.stop),
+            )
+        ]
+        if is_popularity_ordered:
+            popularity = self.__sum_popularity()
+            chunks.sort(
+                key=lambda chunk: popularity.get_total(
+                    chunk.first_prefix_index, chunk.end_prefix_index
+                ),
+                reverse=True,
+            )
+        return chunks
+
+    async def __export_checkpoints_periodically(self, dataset: DatasetID) -> None:
+        while True:
+            await asyncio.sleep(self.PREPARATION_CHECKPOINT_INTERVAL_SECONDS)
+            await self.__export_checkpoint(dataset)
+
+    async def __export_checkpoint(self, dataset: DatasetID) -> None:
+        content = self._revision.prepared_prefixes.to_bytes()
+        # Digests are recorded before prefixes are counted as prepared,
+        # so the digests taken after the bitmap cover all prepared prefixes.
+        digests = self.__prepared_digests
+        digest_content = None if digests is None else digests.to_bytes()
+        dataset_dir = self._get_dataset_dir(dataset)
+        digest_file_path = join_paths(dataset_dir, self.RANGE_DIGEST_FILE)
+
+        def __export() -> None:
+            if digest_content is not None:
+                write_atomically(digest_file_path, digest_content)
+            self._sync_prepared_data()
+            sync_dir(dataset_dir)
+            write_atomically(self.__checkpoint_file_path, content)
+
+        await asyncio.to_thread(__export)
+
+    def __import_range_digests(self, dataset: DatasetID) -> None:
+        digest_file_path = join_paths(
+            self._get_dataset_dir(dataset), self.RANGE_DIGEST_FILE
+        )
+        self.__reusable_dataset = None
+        self.__reusable_digests = None
+        self.__prepared_digests = None
+        if not self._revision_settings.is_incremental:
+            remove_file(digest_file_path)
+            return
+        active_dataset = self.__state.active_dataset
+        if active_dataset is not None:
+            self.__reusable_digests = self.__read_range_digests(
+                join_paths(
+                    self._get_dataset_dir(active_dataset), self.RANGE_DIGEST_FILE
+                )
+            )
+            if self.__reusable_digests is not None:
+                self.__reusable_dataset = active_dataset
+        if self._revision.has_progress():
+            self.__prepared_digests = self.__read_range_digests(digest_file_path)
+        if self.__prepared_digests is None:
+            self.__prepared_digests = RangeDigests(self._revision.start_ts)
+
+    @staticmethod
+    def __read_range_digests(path: str) -> Optional[RangeDigests]:
+        if not is_file(path):
+            return None
+        return RangeDigests.from_bytes(read(path, binary=True))
+
+    def __import_checkpoint(self) -> Optional[PrefixBitmap]:
+        if not is_file(self.__checkpoint_file_path):
+            return None
         try:
-            await asyncio.to_thread(lambda: remove_dir(self._get_dataset_dir(dataset)))
+            return PrefixBitmap(read(self.__checkpoint_file_path, binary=True))
+        except ValueError:
+            return None
+
+    def __retire_dataset(self, dataset: DatasetID) -> None:
+        self.__retire_dir(self._get_dataset_dir(dataset))
+
+    def __retire_dir(self, path: str) -> None:
+        try:
+            self.__trash_reaper.retire(path)
+        except Exception:
+            logger.exception(f"Failed to retire {path}.")
+
+    def __retain_dataset(self, dataset: DatasetID, generation: Optional[int]) -> None:
+        dataset_dir = self._get_dataset_dir(dataset)
+        retained_quantity = self._revision_settings.retained_generation_quantity
+        # A dataset of an unknown generation cannot be rolled back to, so it is not retained.
+        if retained_quantity > 0 and generation is not None and is_dir(dataset_dir):
+            try:
+                make_dir_if_not_exists(self.__generations_dir)
+                os.rename(
+                    dataset_dir, join_paths(self.__generations_dir, str(generation))
+                )
+            except Exception:
+                # The dataset is kept in place, so it is not lost until the next revision reuses its directory.
+                logger.exception(f"Failed to retain generation {generation}.")
+                return
+        self.__retire_dataset(dataset)
+        for retired_generation in self.retained_generations[retained_quantity:]:
+            self.__retire_dir(
+                join_paths(self.__generations_dir, str(retired_generation))
+            )
+
+    def __resume_background_tasks(self) -> None:
+        if self.__are_background_tasks_resumed:
+            return
+        self.__are_background_tasks_resumed = True
+        if self.__lookup_profiler is not None:
+            self.__lookup_profiler.start()
+        if self._revision_settings.is_multi_process:
+            self.__coordination_task = asyncio.create_task(
+                self.__coordinate_periodically()
+            )
+        if self.__is_leader:
+            self.__start_leader_tasks()
+
+    def __start_leader_tasks(self) -> None:
+        self.__trash_reaper.start()
+        if self._revision_settings.hot_prefix_quantity > 0:
+            self.__hot_refresh_task = asyncio.create_task(
+                self.__refresh_hot_prefixes_periodically()
+            )
+
+    async def __coordinate_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.COORDINATION_INTERVAL_SECONDS)
+            try:
+                self.__coordinate()
+            except Exception:
+                logger.exception("Failed to coordinate the storage processes.")
+
+    def __coordinate(self) -> None:
+        if not self.__is_leader and self.__leader_lock.try_acquire():
+            self.__lead()
+        if not self.__is_leader:
+            self.__import_state()
+            self.__acknowledge_state()
+            self.__follow_revision()
+            return
+        for command in self.__command_channel.take_commands():
+            asyncio.create_task(self.__execute_command(*command))
+
+    def __lead(self) -> None:
+        self.__is_leader = True
+        # The previous leader may have exited during a revision, which is then imported as interrupted.
+        self._revision = self.__create_revision()
+        self.__import_revision()
+        self.__import_state()
+        self.__command_channel.withdraw_acknowledgement()
+        follower_popularity = self.__prefix_popularity
+        self.__prefix_popularity = PrefixPopularity()
+        self.__import_popularity()
+        self.__prefix_popularity.add(follower_popularity)
+        remove_file(self.__follower_popularity_file_path)
+        self.__start_leader_tasks()
+
+    async def __forward(
+        self, action: str, timeout_result: Enum, arguments: Optional[Dict] = None
+    ) -> str:
+        return (await self.__forward_and_receive(action, timeout_result, arguments))[
+            self.__JsonKeys.RESULT
+        ]
+
+    async def __forward_and_receive(
+        self, action: str, timeout_result: Enum, arguments: Optional[Dict] = None
+    ) -> Dict:
+        command_id = self.__command_channel.send(action, arguments, is_awaited=True)
+        result = await self.__command_channel.receive_result(
+            command_id, self.FORWARDING_TIMEOUT_SECONDS
+        )
+        if result is None:
+            logger.warning(
+                f"The leader has not executed the command '{action}' in time."
+            )
+            return {self.__JsonKeys.RESULT: timeout_result.value}
+        if self.__JsonKeys.ERROR in result:
+            raise RuntimeError(result[self.__JsonKeys.ERROR])
+        return result
+
+    async def __execute_command(
+        self, command_id: str, action: str, arguments: Dict, is_awaited: bool
+    ) -> None:
+        try:
+            result = {
+                self.__JsonKeys.RESULT: (
+                    await self.__perform_command(action, arguments)
+                ).value
+            }
         except Exception as error:
-            # TODO: Log error.
-            pass
+            logger.exception(f"Failed to execute the forwarded command '{action}'.")
+            result = {self.__JsonKeys.ERROR: str(error)}
+        if (
+            action == self.__Commands.REPLICATE
+            and self.__replication_error_message is not None
+        ):
+            result[self.__JsonKeys.ERROR_MESSAGE] = self.__replication_error_message
+        if is_awaited:
+            self.__command_channel.send_result(command_id, result)
 
-    def __export_implementation_info(self) -> None:
-        info = self._get_setting_dict()
+    async def __perform_command(self, action: str, arguments: Dict) -> Enum:
+        if action == self.__Commands.UPDATE:
+            return await self.update()
+        if action == self.__Commands.REQUEST_UPDATE:
+            return self.request_update()
+        if action == self.__Commands.PAUSE:
+            return self.request_update_pause()
+        if action == self.__Commands.CANCEL:
+            return self.request_update_cancellation()
+        if action == self.__Commands.ROLLBACK:
+            return await self.rollback(arguments[self.__JsonKeys.GENERATION])
+        if action == self.__Commands.REFRESH:
+            return await self.refresh(
+                arguments[self.__JsonKeys.FIRST_PREFIX],
+                arguments[self.__JsonKeys.LAST_PREFIX],
+            )
+        if action == self.__Commands.REFRESH_HOT_PREFIXES:
+            return await self.refresh_hot_prefixes(arguments[self.__JsonKeys.QUANTITY])
+        if action == self.__Commands.REPLICATE:
+            return await self.replicate()
+        raise ValueError(f"Unknown command '{action}'.")
+
+    async def __wait_for_release(self, dataset: DatasetID) -> None:
+        if self._revision_settings.is_multi_process:
+            await self.__wait_for_acknowledgements()
+        await self.__state.wait_for_release(dataset)
+
+    async def __wait_for_acknowledgements(self) -> None:
+        # Followers switch to the activated dataset only when they check the state next time.
+        state = self.__get_acknowledged_state()
+        deadline = time.monotonic() + self.FOLLOWER_ACKNOWLEDGEMENT_TIMEOUT_SECONDS
+        while any(
+            acknowledgement != state
+            for acknowledgement in self.__command_channel.get_acknowledgements()
+        ):
+            if time.monotonic() >= deadline:
+                logger.warning("Followers have not acknowledged the activated dataset.")
+                return
+            await asyncio.sleep(CommandChannel.POLLING_INTERVAL_SECONDS)
+
+    def __acknowledge_state(self) -> None:
+        active_dataset = self.__state.active_dataset
+        if active_dataset is None or not self.__state.is_released(active_dataset.other):
+            return
+        state = self.__get_acknowledged_state()
+        if state == self.__acknowledged_state:
+            return
+        self.__command_channel.acknowledge(state)
+        self.__acknowledged_state = state
+
+    def __get_acknowledged_state(self) -> Dict:
+        active_dataset = self.__state.active_dataset
+        return {
+            self.__JsonKeys.DATASET: (
+                None if active_dataset is None else active_dataset.value
+            ),
+            self.__JsonKeys.GENERATION: self.__state.active_generation,
+        }
+
+    async def __refresh_hot_prefixes_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._revision_settings.hot_refresh_interval)
+            try:
+                await self.refresh_hot_prefixes(
+                    self._revision_settings.hot_prefix_quantity
+                )
+            except Exception:
+                logger.exception("Failed to refresh the most requested prefixes.")
+
+    def __count_request(self, prefix: str) -> None:
+        self.__prefix_popularity.count(int(prefix[:PWNED_PREFIX_LENGTH], 16))
+        if (
+            time.monotonic() - self.__popularity_export_time
+            < self.POPULARITY_EXPORT_INTERVAL_SECONDS
+        ):
+            return
+        if self.__popularity_export_task is not None:
+            if not self.__popularity_export_task.done():
+                return
+        self.__popularity_export_time = time.monotonic()
+        self.__popularity_export_task = asyncio.create_task(
+            asyncio.to_thread(
+                self.__export_popularity,
+                self.__is_leader,
+                self.__prefix_popularity.to_bytes(),
+            )
+        )
+
+    def __export_popularity(self, is_leader: bool, content: bytes) -> None:
+        if is_leader:
+            write_atomically(self.__popularity_file_path, content)
+            return
+        # The leader sums the counts of followers, since followers serve their own share of requests.
+        make_dir_if_not_exists(self.__follower_popularity_dir)
+        write_atomically(self.__follower_popularity_file_path, content)
+
+    def __sum_popularity(self) -> PrefixPopularity:
+        popularity = PrefixPopularity(self.__prefix_popularity.to_bytes())
+        if not is_dir(self.__follower_popularity_dir):
+            return popularity
+        for name in list_dir(self.__follower_popularity_dir):
+            if not name.endswith(self.__FOLLOWER_POPULARITY_FILE_SUFFIX):
+                continue
+            path = join_paths(self.__follower_popularity_dir, name)
+            try:
+                follower_popularity = PrefixPopularity(read(path, binary=True))
+            except (OSError, ValueError):
+                continue
+            popularity.add(follower_popularity)
+            process_id = name[: -len(self.__FOLLOWER_POPULARITY_FILE_SUFFIX)]
+            if not process_id.isdigit() or not is_process_running(int(process_id)):
+                # The counts of exited followers are kept by the leader.
+                self.__prefix_popularity.add(follower_popularity)
+                remove_file(path)
+        return popularity
+
+    async def __look_up(self, prefix: str) -> str:
+        dataset = self.__state.pin_active_dataset()
+        start_time = time.perf_counter()
+        try:
+            # Lookups have their own threads, so that they never wait for revision file operations.
+            # The context is passed to the thread, so that the thread fills the trace of the request.
+            records, end_time = await asyncio.get_running_loop().run_in_executor(
+                self.__lookup_executor,
+                contextvars.copy_context().run,
+                self.__read_range,
+                prefix,
+                self._get_dataset_dir(dataset),
+                start_time,
+            )
+            self._observe_lookup_phase(
+                LookupPhase.RESUME, time.perf_counter() - end_time
+            )
+            return records
+        finally:
+            self.__state.release_dataset(dataset)
+            self._io_governor.observe_lookup(time.perf_counter() - start_time)
+
+    def __read_range(
+        self, prefix: str, dataset_dir: str, submission_time: float
+    ) -> Tuple[str, float]:
+        self._observe_lookup_phase(
+            LookupPhase.QUEUE, time.perf_counter() - submission_time
+        )
+        if self.__lookup_profiler is None:
+            records = self._get_range(prefix, dataset_dir)
+        else:
+            records = self.__lookup_profiler.run(self._get_range, prefix, dataset_dir)
+        return records, time.perf_counter()
+
+    async def __get_bootstrap_range(self, prefix: str) -> str:
+        hash_prefix = prefix[:PWNED_PREFIX_LENGTH]
+        records = self.__bootstrap_ranges.pop(hash_prefix, None)
+        if records is None:
+            self.__bootstrap_cache_miss_quantity += 1
+            records = await self.__bootstrap_flight.run(
+                hash_prefix, lambda: self.__request_bootstrap_range(hash_prefix)
+            )
+        else:
+            self.__bootstrap_cache_hit_quantity += 1
+        if self.__state.active_dataset is None:
+            # The most recently used ranges are kept at the end.
+            self.__bootstrap_ranges[hash_prefix] = records
+            while len(self.__bootstrap_ranges) > self.BOOTSTRAP_RANGE_CACHE_SIZE:
+                del self.__bootstrap_ranges[next(iter(self.__bootstrap_ranges))]
+        if len(prefix) == PWNED_PREFIX_LENGTH:
+            return "\n".join(records)
+        return "\n".join(
+            record
+            for record in records
+            if record.startswith(prefix[PWNED_PREFIX_LENGTH:])
+        )
+
+    async def __request_bootstrap_range(self, hash_prefix: str) -> List[str]:
+        return (await self._range_provider.get_range(hash_prefix)).split()
+
+    def __import_popularity(self) -> None:
+        if not is_file(self.__popularity_file_path):
+            return
+        try:
+            self.__prefix_popularity = PrefixPopularity(
+                read(self.__popularity_file_path, binary=True)
+            )
+        except ValueError:
+            return
+
+    def __create_revision(
+        self,
+        revision: Revision = Revision(),
+        prepared_prefixes: Optional[PrefixBitmap] = None,
+    ) -> FunctionalRevision:
+        return FunctionalRevision(
+            revision, prepared_prefixes, len(self.__shard.prefix_indices)
+        )
+
+    def __get_setting_dict(self) -> Dict:
+        settings = self._get_setting_dict()
+        # The info of storages of all prefixes matches the info exported without shards.
+        settings[self.SHARD_KEY] = (
+            None if self.__shard.is_whole else self.__shard.to_json()
+        )
+        return settings
+
+    def __get_implementation_info(self) -> Dict:
+        info = self.__get_setting_dict()
         info[self.IMPLEMENTATION_NAME_KEY] = self.__class_name
+        return info
+
+    def __export_implementation_info(self) -> None:
+        info = self.__get_implementation_info()
         write(self.__implementation_file_path, json.dumps(info), overwrite=True)
 
     def __export_ignored_revision(self) -> None:
@@ -277,11 +1900,6 @@ class PwnedStorageBase(PwnedStorage):
             info = self._revision.to_dto().to_json()
             if ignore:
                 info[self.__JsonKeys.IGNORE] = True
-            if self._revision.is_idle:
-                info[self.__JsonKeys.BATCH_PREPARATION_OFFSETS] = [
-                    self._revision.get_batch_preparation_offset(batch_index)
-                    for batch_index in range(self._revision_coroutine_quantity)
-                ]
             write(self.__revision_file_path, json.dumps(info), overwrite=True)
             return True
         except Exception:
@@ -291,6 +1909,8 @@ class PwnedStorageBase(PwnedStorage):
         state = dict()
         if self.__state.active_dataset is not None:
             state[self.__JsonKeys.DATASET] = self.__state.active_dataset.value
+        if self.__state.active_generation is not None:
+            state[self.__JsonKeys.GENERATION] = self.__state.active_generation
         if self.__state.is_to_be_ignored:
             state[self.__JsonKeys.IGNORE] = self.__state.is_to_be_ignored
         write(self.__state_file_path, json.dumps(state), overwrite=True)
@@ -309,7 +1929,7 @@ class PwnedStorageBase(PwnedStorage):
             self.IMPLEMENTATION_NAME_KEY
         ) == self.__class_name and all(
             implementation_info.get(key) == value
-            for key, value in self._get_setting_dict().items()
+            for key, value in self.__get_setting_dict().items()
         ):
             return
         remove_file(self.__revision_file_path)
@@ -327,21 +1947,42 @@ class PwnedStorageBase(PwnedStorage):
             return
         if revision_info.get(self.__JsonKeys.IGNORE, False):
             return
-        batch_preparation_offsets = revision_info.get(
-            self.__JsonKeys.BATCH_PREPARATION_OFFSETS
-        )
-        if batch_preparation_offsets is not None:
-            if type(batch_preparation_offsets) != list:
-                return
-            for value in batch_preparation_offsets:
-                if type(value) != int:
-                    return
         revision = Revision.from_json(revision_info)
-        if revision is None or not revision.status.is_idle:
+        if revision is None:
             return
-        self._revision = FunctionalRevision(
-            self._revision_coroutine_quantity, revision, batch_preparation_offsets
-        )
+        if revision.status in [RevisionStatus.PREPARATION, RevisionStatus.STOPPAGE]:
+            revision = Revision(
+                RevisionStatus.PREPARATION_FAILED,
+                revision.progress,
+                revision.start_ts,
+                int(time.time()),
+                self.INTERRUPTED_PREPARATION_MESSAGE,
+            )
+        if not revision.status.is_idle:
+            return
+        prepared_prefixes = None
+        if revision.status in [
+            RevisionStatus.STOPPED,
+            RevisionStatus.PREPARATION_FAILED,
+        ]:
+            prepared_prefixes = self.__import_checkpoint()
+        self._revision = self.__create_revision(revision, prepared_prefixes)
+
+    def __follow_revision(self) -> None:
+        if not is_file(self.__revision_file_path):
+            return
+        try:
+            revision_info = json.loads(read(self.__revision_file_path))
+        except JSONDecodeError:
+            return
+        if not isinstance(revision_info, dict):
+            return
+        if revision_info.get(self.__JsonKeys.IGNORE, False):
+            return
+        revision = Revision.from_json(revision_info)
+        if revision is None:
+            return
+        self._revision = self.__create_revision(revision, self.__import_checkpoint())
 
     def __import_state(self) -> None:
         if not is_file(self.__state_file_path):
@@ -357,9 +1998,21 @@ class PwnedStorageBase(PwnedStorage):
         for dataset in DatasetID:
             if dataset.value == state.get(self.__JsonKeys.DATASET):
                 self.__state.active_dataset = dataset
+        generation = state.get(self.__JsonKeys.GENERATION)
+        if isinstance(generation, int):
+            self.__state.active_generation = generation
 
     def __initialize(self) -> None:
         make_dir_if_not_exists(self.__resource_dir)
+        if self._revision_settings.is_multi_process:
+            self.__is_leader = self.__leader_lock.try_acquire()
         self.__verify_implementation()
-        self.__import_revision()
+        if self.__is_leader:
+            self.__import_revision()
+        else:
+            self.__follow_revision()
         self.__import_state()
+        if self.__is_leader:
+            self.__import_popularity()
+        else:
+            self.__acknowledge_state()
@@ -0,0 +1,25 @@
+from storage.implementations.storage_base import PwnedStorageBase
+from storage.models.abstract import PwnedRangeProvider
+
+
+class PwnedStorageReader(PwnedRangeProvider):
+    """
+    Provides Pwned password leak record ranges from the active dataset of another storage,
+    so that a storage with other settings is built from local data instead of the Pwned API.
+    """
+
+    def __init__(self, storage: PwnedStorageBase):
+        """
+        Initialize a new PwnedStorageReader instance.
+        :param storage: The storage whose active dataset is read.
+        """
+        self.__storage: PwnedStorageBase = storage
+
+    async def get_range(self, hash_prefix: str) -> str:
+        """
+        Read the Pwned password leak record range for a hash prefix from the active dataset of the storage.
+
+        :param hash_prefix: The hash prefix.
+        :return: The range as plain text.
+        """
+        return await self.__storage.read_range(hash_prefix)
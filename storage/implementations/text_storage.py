@@ -1,9 +1,19 @@
-from typing import Dict
+import time
+from typing import Collection, Dict, List
 
-from storage.auxiliary.filetools import join_paths, read, write
+from storage.auxiliary.filetools import (
+    Encoding,
+    join_paths,
+    link_file,
+    read,
+    remove_file,
+    replace_file,
+)
+from storage.auxiliary.models.prefix_chunk import PrefixChunk
 from storage.auxiliary.models.state import DatasetID
 from storage.auxiliary.numeration import number_to_hex_code
 from storage.implementations.storage_base import PwnedStorageBase
+from storage.models.lookup import LookupPhase
 from storage.models.pwned import PWNED_PREFIX_CAPACITY
 
 
@@ -24,25 +34,73 @@ class TextPwnedStorage(PwnedStorageBase):
     def _get_setting_dict(self) -> Dict:
         return dict()
 
-    def _get_range(self, prefix) -> str:
-        return read(join_paths(self._active_dataset_dir, f"{prefix}.txt"))
+    def _get_range(self, prefix: str, dataset_dir: str) -> str:
+        start_time = time.perf_counter()
+        records = read(join_paths(dataset_dir, f"{prefix}.txt"))
+        self._observe_lookup_phase(LookupPhase.SEARCH, time.perf_counter() - start_time)
+        return records
 
-    async def _prepare_batch(self, dataset: DatasetID, batch_index: int) -> None:
+    @property
+    def _prefix_group_size(self) -> int:
+        return 1
+
+    def _is_dataset_file(self, name: str) -> bool:
+        return name.endswith(".txt") or super()._is_dataset_file(name)
+
+    async def _prepare_chunk(self, dataset: DatasetID, chunk: PrefixChunk) -> None:
         dataset_dir = self._get_dataset_dir(dataset)
-        for prefix_index in range(
-            batch_index * PWNED_PREFIX_CAPACITY // self._revision_coroutine_quantity
-            + self._revision.get_batch_preparation_offset(batch_index),
-            (batch_index + 1)
-            * PWNED_PREFIX_CAPACITY
-            // self._revision_coroutine_quantity,
-        ):
-            if (
-                self._revision.is_cancelling
-                or self._revision.is_stopping
-                or self._revision.is_failed
-            ):
-                return
+        while not chunk.is_prepared and not self._is_preparation_interrupted:
+            prefix_index = chunk.next_prefix_index
             hash_prefix = number_to_hex_code(prefix_index, PWNED_PREFIX_CAPACITY)
             file_path = join_paths(dataset_dir, f"{hash_prefix}.txt")
-            write(file_path, await self._range_provider.get_range(hash_prefix))
-            self._revision.count_prepared_prefix(batch_index)
+            # The file may be a link to a file of the active dataset, so it is never rewritten in place.
+            remove_file(file_path)
+            try:
+                await self.__prepare_range_file(file_path, prefix_index, hash_prefix)
+            except Exception:
+                remove_file(file_path)
+                raise
+            self._revision.count_prepared_prefix(prefix_index)
+            chunk.count_prepared_prefix()
+
+    async def _refresh_prefix_group(
+        self,
+        dataset_dir: str,
+        group_index: int,
+        refreshed_prefix_indices: Collection[int],
+    ) -> None:
+        hash_prefix = number_to_hex_code(group_index, PWNED_PREFIX_CAPACITY)
+        file_path = join_paths(dataset_dir, f"{hash_prefix}.txt")
+        new_file_path = f"{file_path}.tmp"
+        remove_file(new_file_path)
+        try:
+            await self.__prepare_range_file(new_file_path, group_index, hash_prefix)
+            replace_file(file_path, new_file_path)
+        finally:
+            remove_file(new_file_path)
+
+    async def __prepare_range_file(
+        self, file_path: str, prefix_index: int, hash_prefix: str
+    ) -> None:
+        if self._is_range_reusable(prefix_index):
+            records: List[str] = list()
+            if await self._receive_range(prefix_index, hash_prefix, records.append):
+                link_file(
+                    file_path,
+                    join_paths(self._reusable_dataset_dir, f"{hash_prefix}.txt"),
+                )
+                return
+            with open(file_path, "w", encoding=Encoding.ASCII.value) as range_file:
+                self._count_written(range_file.write("\n".join(records)))
+            return
+        with open(file_path, "w", encoding=Encoding.ASCII.value) as range_file:
+            separator = ""
+
+            def __write_record(record: str) -> None:
+                nonlocal separator
+                self._count_written(
+                    range_file.write(separator) + range_file.write(record)
+                )
+                separator = "\n"
+
+            await self._receive_range(prefix_index, hash_prefix, __write_record)
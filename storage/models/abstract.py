@@ -1,7 +1,12 @@
 from abc import ABC, abstractmethod
 from enum import Enum
+from typing import AsyncIterator, BinaryIO, List, Optional
 
-from storage.models.revision import Revision
+from storage.models.lookup import LookupStatistics
+from storage.models.manifest import DatasetManifest
+from storage.models.metrics import Metric
+from storage.models.revision import Revision, RevisionHistoryEntry
+from storage.models.shard import PrefixShard
 
 
 class UpdateResult(Enum):
@@ -50,6 +55,36 @@ class UpdatePauseResponse(Enum):
     """There is no ongoing data preparation."""
 
 
+class RollbackResult(Enum):
+    """Possible result of a rollback."""
+
+    DONE = "done"
+    """The rollback has completed successfully."""
+
+    NOT_FOUND = "not_found"
+    """There is no retained dataset of the requested generation."""
+
+    BUSY = "busy"
+    """There is an ongoing update or an unfinished revision that has to be resumed or cancelled first."""
+
+
+class PrefixNotOwnedError(Exception):
+    """Error raised by storages when a hash prefix belongs to a shard stored by another node."""
+
+    def __init__(self, hash_prefix: str, shard_index: int):
+        """
+        Initialize a new PrefixNotOwnedError instance.
+
+        :param hash_prefix: The hash prefix.
+        :param shard_index: The index of the shard that contains the prefix.
+        """
+        super().__init__(
+            f"The hash prefix {hash_prefix} belongs to shard {shard_index}."
+        )
+        self.hash_prefix: str = hash_prefix
+        self.shard_index: int = shard_index
+
+
 class PwnedStorage(ABC):
     """Stores Pwned password leak records."""
 
@@ -62,6 +97,18 @@ class PwnedStorage(ABC):
         """
         ...
 
+    @abstractmethod
+    async def get_revision_history(
+        self, limit: Optional[int] = None
+    ) -> List[RevisionHistoryEntry]:
+        """
+        Get the outcomes of the finished revision runs.
+
+        :param limit: The maximum quantity of the latest runs to get. All runs by default.
+        :return: The outcomes of the runs, the oldest first.
+        """
+        ...
+
     @abstractmethod
     async def get_range(self, prefix: str) -> str:
         """
@@ -69,9 +116,37 @@ class PwnedStorage(ABC):
 
         :param prefix: The hash prefix to query.
         :return: The range as plain text.
+        :raises PrefixNotOwnedError: If the prefix does not belong to the shard of the storage.
         """
         pass
 
+    @property
+    @abstractmethod
+    def shard(self) -> PrefixShard:
+        """
+        Get the slice of the prefix space whose ranges are stored.
+        :return: The shard of the storage.
+        """
+        ...
+
+    @property
+    @abstractmethod
+    def lookup_statistics(self) -> LookupStatistics:
+        """
+        Get the statistics of range lookups. Concurrent lookups of the same prefix are performed once.
+        :return: The lookup statistics.
+        """
+        ...
+
+    @property
+    @abstractmethod
+    def metrics(self) -> List[Metric]:
+        """
+        Get the current metrics of lookups and revisions collected by the storage instance.
+        :return: The metrics.
+        """
+        ...
+
     @abstractmethod
     async def update(self) -> UpdateResult:
         """
@@ -88,6 +163,28 @@ class PwnedStorage(ABC):
         """
         pass
 
+    @abstractmethod
+    async def refresh(self, first_prefix: str, last_prefix: str) -> UpdateResult:
+        """
+        Request the records of a prefix range again and atomically replace the affected data of the active dataset.
+
+        :param first_prefix: The first hash prefix of the range.
+        :param last_prefix: The last hash prefix of the range.
+        :return: The refresh result.
+        """
+        pass
+
+    @abstractmethod
+    async def refresh_hot_prefixes(self, quantity: int) -> UpdateResult:
+        """
+        Request the records of the most requested prefixes again and atomically replace their data
+        in the active dataset.
+
+        :param quantity: The quantity of the most requested prefixes.
+        :return: The refresh result.
+        """
+        pass
+
     @abstractmethod
     def request_update_pause(self) -> UpdatePauseResponse:
         """
@@ -104,6 +201,115 @@ class PwnedStorage(ABC):
         """
         pass
 
+    @property
+    @abstractmethod
+    def active_generation(self) -> Optional[int]:
+        """
+        Get the generation of the active dataset, which is the start timestamp of the revision that prepared it.
+        :return: The generation or None if it is unknown.
+        """
+        pass
+
+    @property
+    @abstractmethod
+    def retained_generations(self) -> List[int]:
+        """
+        Get the generations of previous datasets that are retained for rollback.
+        :return: The generations from the newest to the oldest.
+        """
+        pass
+
+    @abstractmethod
+    async def rollback(self, generation: int) -> RollbackResult:
+        """
+        Make a retained dataset active again.
+        The replaced dataset is retained in its turn, so the rollback can be undone the same way.
+
+        :param generation: The generation of the retained dataset.
+        :return: The rollback result.
+        """
+        pass
+
+    @abstractmethod
+    async def get_manifest(self) -> Optional[DatasetManifest]:
+        """
+        Describe the active dataset for replicas, which pull the files that they do not have yet.
+        :return: The manifest or None if there is no active dataset.
+        """
+        pass
+
+    @abstractmethod
+    def stream_dataset_file(self, name: str, generation: int) -> AsyncIterator[bytes]:
+        """
+        Read a file of the active dataset described by the manifest.
+
+        :param name: The name of the file.
+        :param generation: The generation of the dataset in the manifest.
+        :return: An asynchronous iterator over the file content.
+        :raises ValueError: If the dataset is no longer active or has no such file.
+        """
+        pass
+
+    @abstractmethod
+    async def replicate(self) -> UpdateResult:
+        """
+        Pull the files of the active dataset of the dataset source that differ from the active dataset
+        and make the pulled dataset active.
+        :return: The replication result.
+        """
+        pass
+
+    @abstractmethod
+    async def export_archive(self, archive: BinaryIO) -> bool:
+        """
+        Write the implementation info, the files and the manifest of the active dataset to an archive stream.
+        The archive is written sequentially, so it can be sent to a pipe.
+
+        :param archive: The writable binary stream.
+        :return: True if the dataset has been exported, False if there is no active dataset.
+        """
+        pass
+
+    @abstractmethod
+    async def import_archive(self, archive: BinaryIO) -> UpdateResult:
+        """
+        Read a dataset archive sequentially into the inactive dataset and make the imported dataset active.
+        The archive must be exported from a storage with the same implementation settings.
+
+        :param archive: The readable binary stream.
+        :return: The import result.
+        """
+        pass
+
+    @property
+    @abstractmethod
+    def replication_error_message(self) -> Optional[str]:
+        """
+        Get the reason why the last replication or archive import has failed.
+        :return: The error message or None if it has not failed.
+        """
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        """
+        Stop the background tasks of the storage and wait until they stop.
+        The interrupted removal of retired data is resumed when the storage is used next time.
+        """
+        pass
+
+
+class RangeNotModifiedError(Exception):
+    """Error raised by range providers when a range has not been modified since the requested time."""
+
+    def __init__(self, hash_prefix: str):
+        """
+        Initialize a new RangeNotModifiedError instance.
+        :param hash_prefix: The hash prefix of the range.
+        """
+        super().__init__(f"The range {hash_prefix} has not been modified.")
+        self.hash_prefix: str = hash_prefix
+
 
 class PwnedRangeProvider(ABC):
     """Provides Pwned password leak record ranges"""
@@ -117,3 +323,43 @@ class PwnedRangeProvider(ABC):
         :return: The range as plain text.
         """
         pass
+
+    async def stream_range(
+        self, hash_prefix: str, modified_since_ts: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Iterate over the Pwned password leak records of the range for a hash prefix.
+        The records are produced as soon as they are available, so the range is never buffered as a whole
+        by implementations that support it. By default, the whole range is requested with get_range.
+
+        :param hash_prefix: The hash prefix.
+        :param modified_since_ts: The timestamp to make the request conditional on.
+          Implementations that support conditional requests raise RangeNotModifiedError
+          before producing any record if the range has not been modified since then.
+        :return: An asynchronous iterator over the range records.
+        """
+        for record in (await self.get_range(hash_prefix)).split():
+            yield record
+
+
+class PwnedDatasetSource(ABC):
+    """Provides the active dataset of another storage for replication."""
+
+    @abstractmethod
+    async def get_manifest(self) -> DatasetManifest:
+        """
+        Get the manifest of the active dataset.
+        :return: The manifest.
+        """
+        pass
+
+    @abstractmethod
+    def stream_file(self, name: str, generation: int) -> AsyncIterator[bytes]:
+        """
+        Read a file of the active dataset.
+
+        :param name: The name of the file.
+        :param generation: The generation of the dataset in the manifest.
+        :return: An asynchronous iterator over the file content.
+        """
+        pass
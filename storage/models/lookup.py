@@ -0,0 +1,155 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import Dict, Iterator, Optional
+
+
+class LookupPhase(Enum):
+    """A phase of a range lookup measured separately."""
+
+    VALIDATION = "validation"
+    """Validation of the prefix and accounting of the request."""
+
+    QUEUE = "queue"
+    """Waiting for a lookup thread."""
+
+    OPEN = "open"
+    """Opening of the dataset file."""
+
+    SEARCH = "search"
+    """Search for the range in the dataset."""
+
+    DECODE = "decode"
+    """Conversion of stored records to text."""
+
+    RESUME = "resume"
+    """Waiting for the event loop after the lookup thread has finished."""
+
+
+class LookupTrace:
+    """
+    Timings of the phases and counts of the file operations of a single range request.
+    The trace is activated in the context of the request and filled by the lookup, including its lookup thread.
+    """
+
+    def __init__(self):
+        """Initialize a new LookupTrace instance."""
+        self.__phase_seconds: Dict[LookupPhase, float] = dict()
+        self.__counts: Dict[str, int] = dict()
+        self.__lock: threading.Lock = threading.Lock()
+
+    @property
+    def phase_seconds(self) -> Dict[LookupPhase, float]:
+        """
+        Get the durations of the recorded phases.
+        :return: The durations in seconds by phase.
+        """
+        return dict(self.__phase_seconds)
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        """
+        Get the counts of the recorded operations.
+        :return: The counts by operation name.
+        """
+        return dict(self.__counts)
+
+    @staticmethod
+    def current() -> Optional["LookupTrace"]:
+        """
+        Get the trace activated in the current context.
+        :return: The trace or None if no trace is active.
+        """
+        return _active_lookup_trace.get()
+
+    @contextmanager
+    def activate(self) -> Iterator["LookupTrace"]:
+        """Make the trace current in the context until the block is exited."""
+        token = _active_lookup_trace.set(self)
+        try:
+            yield self
+        finally:
+            _active_lookup_trace.reset(token)
+
+    def add_phase(self, phase: LookupPhase, seconds: float) -> None:
+        """
+        Record the duration of a phase. Durations of a repeated phase are added up.
+
+        :param phase: The phase.
+        :param seconds: The duration in seconds.
+        """
+        with self.__lock:
+            self.__phase_seconds[phase] = self.__phase_seconds.get(phase, 0) + seconds
+
+    def add_count(self, name: str, quantity: int) -> None:
+        """
+        Count operations.
+
+        :param name: The name of the operation.
+        :param quantity: The quantity of operations.
+        """
+        with self.__lock:
+            self.__counts[name] = self.__counts.get(name, 0) + quantity
+
+    def to_server_timing(self, total_seconds: Optional[float] = None) -> str:
+        """
+        Convert the trace to the value of the Server-Timing HTTP header.
+
+        :param total_seconds: The duration of the whole request in seconds, if it is reported.
+        :return: The header value with durations in milliseconds.
+        """
+        metrics = [
+            f"{phase.value};dur={round(seconds * 1000, 3)}"
+            for phase, seconds in self.phase_seconds.items()
+        ]
+        if total_seconds is not None:
+            metrics.append(f"total;dur={round(total_seconds * 1000, 3)}")
+        metrics += [f'{name};desc="{count}"' for name, count in self.counts.items()]
+        return ", ".join(metrics)
+
+
+_active_lookup_trace: ContextVar[Optional[LookupTrace]] = ContextVar(
+    "active_lookup_trace", default=None
+)
+
+
+class LookupStatistics:
+    """Lookup-related statistics."""
+
+    def __init__(self, lookup_quantity: int = 0, coalesced_lookup_quantity: int = 0):
+        """
+        Initialize a new LookupStatistics instance.
+
+        :param lookup_quantity: The quantity of lookups.
+        :param coalesced_lookup_quantity: The quantity of lookups that have received the result
+          of a concurrent lookup of the same prefix instead of searching the range again.
+        """
+        self._lookup_quantity: int = lookup_quantity
+        self._coalesced_lookup_quantity: int = coalesced_lookup_quantity
+
+    @property
+    def lookup_quantity(self) -> int:
+        """
+        Get the quantity of lookups.
+        :return: The quantity of lookups.
+        """
+        return self._lookup_quantity
+
+    @property
+    def coalesced_lookup_quantity(self) -> int:
+        """
+        Get the quantity of lookups that have received the result of a concurrent lookup of the same prefix.
+        :return: The quantity of coalesced lookups.
+        """
+        return self._coalesced_lookup_quantity
+
+    def to_json(self) -> Dict:
+        """
+        Convert the statistics to JSON.
+        :return: The statistics as JSON.
+        """
+        return {
+            "lookups": self._lookup_quantity,
+            "coalesced_lookups": self._coalesced_lookup_quantity,
+        }
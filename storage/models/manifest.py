@@ -0,0 +1,127 @@
+from typing import Dict, List, Optional
+
+
+class DatasetFile:
+    """A file of a published dataset."""
+
+    def __init__(self, name: str, size: int, checksum: str):
+        """
+        Initialize a new DatasetFile instance.
+
+        :param name: The name of the file in the dataset directory.
+        :param size: The size of the file in bytes.
+        :param checksum: The hexadecimal SHA-256 checksum of the file content.
+        """
+        self._name: str = name
+        self._size: int = size
+        self._checksum: str = checksum
+
+    @property
+    def name(self) -> str:
+        """
+        Get the name of the file in the dataset directory.
+        :return: The file name.
+        """
+        return self._name
+
+    @property
+    def size(self) -> int:
+        """
+        Get the size of the file.
+        :return: The size in bytes.
+        """
+        return self._size
+
+    @property
+    def checksum(self) -> str:
+        """
+        Get the SHA-256 checksum of the file content.
+        :return: The hexadecimal checksum.
+        """
+        return self._checksum
+
+    @staticmethod
+    def from_json(json: Dict):
+        name = json.get("name")
+        size = json.get("size")
+        checksum = json.get("checksum")
+        return (
+            DatasetFile(name, size, checksum)
+            if (
+                type(name) == str
+                and type(size) == int
+                and type(checksum) == str
+                # The name is used as a path in the dataset directory.
+                and name not in ["", ".", ".."]
+                and "/" not in name
+                and "\\" not in name
+            )
+            else None
+        )
+
+    def to_json(self) -> Dict:
+        return {"name": self._name, "size": self._size, "checksum": self._checksum}
+
+
+class DatasetManifest:
+    """Description of the files of the active dataset published by a storage for replication."""
+
+    def __init__(self, generation: int, settings: Dict, files: List[DatasetFile]):
+        """
+        Initialize a new DatasetManifest instance.
+
+        :param generation: The generation of the dataset.
+        :param settings: The implementation settings of the storage, which the replicas must have as well.
+        :param files: The files of the dataset.
+        """
+        self._generation: int = generation
+        self._settings: Dict = settings
+        self._files: List[DatasetFile] = files
+
+    @property
+    def generation(self) -> int:
+        """
+        Get the generation of the dataset.
+        :return: The generation.
+        """
+        return self._generation
+
+    @property
+    def settings(self) -> Dict:
+        """
+        Get the implementation settings of the storage.
+        :return: The settings as JSON.
+        """
+        return self._settings
+
+    @property
+    def files(self) -> List[DatasetFile]:
+        """
+        Get the files of the dataset.
+        :return: The files.
+        """
+        return self._files
+
+    @staticmethod
+    def from_json(json: Dict) -> Optional["DatasetManifest"]:
+        generation = json.get("generation")
+        settings = json.get("settings")
+        file_infos = json.get("files")
+        if (
+            type(generation) != int
+            or type(settings) != dict
+            or type(file_infos) != list
+            or not all(type(file_info) == dict for file_info in file_infos)
+        ):
+            return None
+        files = [DatasetFile.from_json(file_info) for file_info in file_infos]
+        if None in files:
+            return None
+        return DatasetManifest(generation, settings, files)
+
+    def to_json(self) -> Dict:
+        return {
+            "generation": self._generation,
+            "settings": self._settings,
+            "files": [file.to_json() for file in self._files],
+        }
@@ -0,0 +1,197 @@
+from enum import Enum
+from typing import Dict, List, Optional, Tuple, Union
+
+
+class MetricType(Enum):
+    """Possible type of a metric."""
+
+    COUNTER = "counter"
+    """A value that only increases."""
+
+    GAUGE = "gauge"
+    """A value that increases and decreases."""
+
+    HISTOGRAM = "histogram"
+    """A distribution of observed values."""
+
+
+class HistogramValue:
+    """Distribution of observed values over buckets."""
+
+    def __init__(self, bounds: List[float], bucket_counts: List[int], total: float):
+        """
+        Initialize a new HistogramValue instance.
+
+        :param bounds: The inclusive upper bounds of the buckets in ascending order.
+        :param bucket_counts: The quantities of values observed in each bucket.
+          The last quantity is of the values above all bounds.
+        :param total: The sum of the observed values.
+        """
+        self._bounds: List[float] = bounds
+        self._bucket_counts: List[int] = bucket_counts
+        self._total: float = total
+
+    @property
+    def bounds(self) -> List[float]:
+        """
+        Get the upper bounds of the buckets.
+        :return: The bounds in ascending order.
+        """
+        return self._bounds
+
+    @property
+    def bucket_counts(self) -> List[int]:
+        """
+        Get the quantities of values observed in each bucket.
+        :return: The quantities, of which the last one is of the values above all bounds.
+        """
+        return self._bucket_counts
+
+    @property
+    def total(self) -> float:
+        """
+        Get the sum of the observed values.
+        :return: The sum.
+        """
+        return self._total
+
+    @property
+    def count(self) -> int:
+        """
+        Get the quantity of the observed values.
+        :return: The quantity.
+        """
+        return sum(self._bucket_counts)
+
+
+MetricValue = Union[int, float, HistogramValue]
+
+MetricSample = Tuple[Dict[str, str], MetricValue]
+
+
+class Metric:
+    """A named measurement with the values for each set of labels."""
+
+    def __init__(
+        self,
+        name: str,
+        metric_type: MetricType,
+        description: str,
+        samples: List[MetricSample],
+    ):
+        """
+        Initialize a new Metric instance.
+
+        :param name: The name of the metric.
+        :param metric_type: The type of the metric.
+        :param description: The description of the metric.
+        :param samples: The values of the metric with their labels.
+        """
+        self._name: str = name
+        self._type: MetricType = metric_type
+        self._description: str = description
+        self._samples: List[MetricSample] = samples
+
+    @staticmethod
+    def single(
+        name: str, metric_type: MetricType, description: str, value: MetricValue
+    ) -> "Metric":
+        """
+        Create a metric with a single value without labels.
+
+        :param name: The name of the metric.
+        :param metric_type: The type of the metric.
+        :param description: The description of the metric.
+        :param value: The value of the metric.
+        :return: The metric.
+        """
+        return Metric(name, metric_type, description, [(dict(), value)])
+
+    @property
+    def name(self) -> str:
+        """
+        Get the name of the metric.
+        :return: The name.
+        """
+        return self._name
+
+    @property
+    def metric_type(self) -> MetricType:
+        """
+        Get the type of the metric.
+        :return: The type.
+        """
+        return self._type
+
+    @property
+    def samples(self) -> List[MetricSample]:
+        """
+        Get the values of the metric with their labels.
+        :return: The samples.
+        """
+        return self._samples
+
+    def get_value(self, labels: Optional[Dict[str, str]] = None) -> MetricValue:
+        """
+        Get the value of the metric for a set of labels.
+
+        :param labels: The labels. No labels by default.
+        :return: The value.
+        :raises KeyError: If there is no value for the labels.
+        """
+        for sample_labels, value in self._samples:
+            if sample_labels == (labels or dict()):
+                return value
+        raise KeyError(labels)
+
+    def to_prometheus(self) -> str:
+        """
+        Convert the metric to the Prometheus text exposition format.
+        :return: The metric lines.
+        """
+        lines = [
+            f"# HELP {self._name} {self._description}",
+            f"# TYPE {self._name} {self._type.value}",
+        ]
+        for labels, value in self._samples:
+            if not isinstance(value, HistogramValue):
+                lines.append(
+                    f"{self._name}{self.__format_labels(labels)} {self.__format_number(value)}"
+                )
+                continue
+            cumulative_count = 0
+            for bound, count in zip(value.bounds + [None], value.bucket_counts):
+                cumulative_count += count
+                bucket_labels = dict(labels)
+                bucket_labels["le"] = (
+                    "+Inf" if bound is None else self.__format_number(bound)
+                )
+                lines.append(
+                    f"{self._name}_bucket{self.__format_labels(bucket_labels)} {cumulative_count}"
+                )
+            lines.append(
+                f"{self._name}_sum{self.__format_labels(labels)} {self.__format_number(value.total)}"
+            )
+            lines.append(
+                f"{self._name}_count{self.__format_labels(labels)} {cumulative_count}"
+            )
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def __format_labels(labels: Dict[str, str]) -> str:
+        if not labels:
+            return ""
+        pairs = ",".join(
+            key
+            + '="'
+            + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            + '"'
+            for key, value in labels.items()
+        )
+        return "{" + pairs + "}"
+
+    @staticmethod
+    def __format_number(value: Union[int, float]) -> str:
+        if isinstance(value, int):
+            return str(value)
+        return repr(float(value))
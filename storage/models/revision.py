@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 
 class RevisionStatus(Enum):
@@ -54,6 +54,266 @@ class RevisionStatus(Enum):
         ]
 
 
+class ChunkDuration:
+    """The time in which a chunk of prefixes has been prepared."""
+
+    def __init__(self, first_prefix: str, prefix_quantity: int, seconds: float):
+        """
+        Initialize a new ChunkDuration instance.
+
+        :param first_prefix: The hash prefix of the first prefix of the chunk.
+        :param prefix_quantity: The quantity of prefixes of the chunk.
+        :param seconds: The preparation time in seconds.
+        """
+        self._first_prefix: str = first_prefix
+        self._prefix_quantity: int = prefix_quantity
+        self._seconds: float = seconds
+
+    @staticmethod
+    def from_json(json: Dict):
+        first_prefix = json.get("first_prefix")
+        prefix_quantity = json.get("prefix_quantity")
+        seconds = json.get("seconds")
+        return (
+            ChunkDuration(first_prefix, prefix_quantity, seconds)
+            if (
+                type(first_prefix) == str
+                and type(prefix_quantity) == int
+                and type(seconds) in [int, float]
+            )
+            else None
+        )
+
+    @property
+    def first_prefix(self) -> str:
+        """
+        Get the hash prefix of the first prefix of the chunk.
+        :return: The hash prefix.
+        """
+        return self._first_prefix
+
+    @property
+    def prefix_quantity(self) -> int:
+        """
+        Get the quantity of prefixes of the chunk.
+        :return: The quantity of prefixes.
+        """
+        return self._prefix_quantity
+
+    @property
+    def seconds(self) -> float:
+        """
+        Get the preparation time of the chunk.
+        :return: The time in seconds.
+        """
+        return self._seconds
+
+    def to_json(self) -> Dict:
+        return {
+            "first_prefix": self._first_prefix,
+            "prefix_quantity": self._prefix_quantity,
+            "seconds": self._seconds,
+        }
+
+
+class RevisionThroughput:
+    """
+    Throughput-related information of the preparation of new data.
+    The times spent waiting for the range provider, handling received records and waiting for the write limit
+    are summed over all revision coroutines and show what limits the preparation.
+    """
+
+    def __init__(
+        self,
+        prefix_rate: float = 0,
+        record_rate: float = 0,
+        received_byte_quantity: int = 0,
+        written_byte_quantity: int = 0,
+        range_error_quantity: int = 0,
+        network_seconds: float = 0,
+        processing_seconds: float = 0,
+        throttle_seconds: float = 0,
+        slowest_chunks: Optional[List[ChunkDuration]] = None,
+        eta_seconds: Optional[int] = None,
+        prefix_quantity: int = 0,
+        record_quantity: int = 0,
+    ):
+        """
+        Initialize a new RevisionThroughput instance.
+
+        :param prefix_rate: The quantity of prefixes prepared per second recently.
+        :param record_rate: The quantity of records received per second recently.
+        :param received_byte_quantity: The size of the received ranges in bytes.
+        :param written_byte_quantity: The size of the written data in bytes.
+        :param range_error_quantity: The quantity of failed range requests.
+        :param network_seconds: The time in seconds spent waiting for the range provider.
+        :param processing_seconds: The time in seconds spent handling received records.
+        :param throttle_seconds: The time in seconds spent waiting for the write limit.
+        :param slowest_chunks: The chunks of prefixes that have taken the longest to prepare, the slowest first.
+        :param eta_seconds: The estimated time in seconds until the preparation is completed.
+        :param prefix_quantity: The quantity of prepared prefixes.
+        :param record_quantity: The quantity of received records.
+        """
+        self._prefix_rate: float = prefix_rate
+        self._record_rate: float = record_rate
+        self._received_byte_quantity: int = received_byte_quantity
+        self._written_byte_quantity: int = written_byte_quantity
+        self._range_error_quantity: int = range_error_quantity
+        self._network_seconds: float = network_seconds
+        self._processing_seconds: float = processing_seconds
+        self._throttle_seconds: float = throttle_seconds
+        self._slowest_chunks: List[ChunkDuration] = slowest_chunks or list()
+        self._eta_seconds: Optional[int] = eta_seconds
+        self._prefix_quantity: int = prefix_quantity
+        self._record_quantity: int = record_quantity
+
+    @staticmethod
+    def from_json(json: Dict):
+        numbers = [
+            json.get(key)
+            for key in [
+                "prefix_rate",
+                "record_rate",
+                "received_byte_quantity",
+                "written_byte_quantity",
+                "range_error_quantity",
+                "network_seconds",
+                "processing_seconds",
+                "throttle_seconds",
+            ]
+        ]
+        chunk_jsons = json.get("slowest_chunks")
+        eta_seconds = json.get("eta_seconds")
+        quantities = [json.get("prefix_quantity"), json.get("record_quantity")]
+        if (
+            any(type(number) not in [int, float] for number in numbers)
+            or any(type(quantity) != int for quantity in quantities)
+            or type(chunk_jsons) != list
+            or (eta_seconds is not None and type(eta_seconds) != int)
+        ):
+            return None
+        slowest_chunks = [
+            ChunkDuration.from_json(chunk_json)
+            for chunk_json in chunk_jsons
+            if type(chunk_json) == dict
+        ]
+        if len(slowest_chunks) != len(chunk_jsons) or None in slowest_chunks:
+            return None
+        return RevisionThroughput(*numbers, slowest_chunks, eta_seconds, *quantities)
+
+    @property
+    def prefix_rate(self) -> float:
+        """
+        Get the quantity of prefixes prepared per second recently.
+        :return: The prefix rate.
+        """
+        return self._prefix_rate
+
+    @property
+    def record_rate(self) -> float:
+        """
+        Get the quantity of records received per second recently.
+        :return: The record rate.
+        """
+        return self._record_rate
+
+    @property
+    def received_byte_quantity(self) -> int:
+        """
+        Get the size of the received ranges.
+        :return: The size in bytes.
+        """
+        return self._received_byte_quantity
+
+    @property
+    def written_byte_quantity(self) -> int:
+        """
+        Get the size of the written data.
+        :return: The size in bytes.
+        """
+        return self._written_byte_quantity
+
+    @property
+    def range_error_quantity(self) -> int:
+        """
+        Get the quantity of failed range requests.
+        :return: The quantity of failed range requests.
+        """
+        return self._range_error_quantity
+
+    @property
+    def network_seconds(self) -> float:
+        """
+        Get the time spent waiting for the range provider.
+        :return: The time in seconds.
+        """
+        return self._network_seconds
+
+    @property
+    def processing_seconds(self) -> float:
+        """
+        Get the time spent handling received records.
+        :return: The time in seconds.
+        """
+        return self._processing_seconds
+
+    @property
+    def throttle_seconds(self) -> float:
+        """
+        Get the time spent waiting for the write limit.
+        :return: The time in seconds.
+        """
+        return self._throttle_seconds
+
+    @property
+    def slowest_chunks(self) -> List[ChunkDuration]:
+        """
+        Get the chunks of prefixes that have taken the longest to prepare.
+        :return: The chunks, the slowest first.
+        """
+        return self._slowest_chunks
+
+    @property
+    def eta_seconds(self) -> Optional[int]:
+        """
+        Get the estimated time until the preparation is completed.
+        :return: The time in seconds or None if it cannot be estimated.
+        """
+        return self._eta_seconds
+
+    @property
+    def prefix_quantity(self) -> int:
+        """
+        Get the quantity of prepared prefixes.
+        :return: The quantity of prefixes.
+        """
+        return self._prefix_quantity
+
+    @property
+    def record_quantity(self) -> int:
+        """
+        Get the quantity of received records.
+        :return: The quantity of records.
+        """
+        return self._record_quantity
+
+    def to_json(self) -> Dict:
+        return {
+            "prefix_rate": self._prefix_rate,
+            "record_rate": self._record_rate,
+            "received_byte_quantity": self._received_byte_quantity,
+            "written_byte_quantity": self._written_byte_quantity,
+            "range_error_quantity": self._range_error_quantity,
+            "network_seconds": self._network_seconds,
+            "processing_seconds": self._processing_seconds,
+            "throttle_seconds": self._throttle_seconds,
+            "slowest_chunks": [chunk.to_json() for chunk in self._slowest_chunks],
+            "eta_seconds": self._eta_seconds,
+            "prefix_quantity": self._prefix_quantity,
+            "record_quantity": self._record_quantity,
+        }
+
+
 class Revision:
     """Update-related information."""
 
@@ -64,6 +324,8 @@ class Revision:
         start_ts: Optional[int] = None,
         end_ts: Optional[int] = None,
         error_message: Optional[str] = None,
+        purge_progress: Optional[int] = None,
+        throughput: Optional[RevisionThroughput] = None,
     ):
         """
         Initialize a new Revision instance.
@@ -73,12 +335,16 @@ class Revision:
         :param start_ts: The start timestamp of the update.
         :param end_ts: The end timestamp of the update.
         :param error_message: The error message associated with the update.
+        :param purge_progress: The progress percentage of the background removal of old data.
+        :param throughput: The throughput of the preparation of new data.
         """
         self._status: RevisionStatus = status
         self._progress: Optional[int] = progress
         self._start_ts: Optional[int] = start_ts
         self._end_ts: Optional[int] = end_ts
         self._error_message: Optional[str] = error_message
+        self._purge_progress: Optional[int] = purge_progress
+        self._throughput: Optional[RevisionThroughput] = throughput
 
     @staticmethod
     def from_json(json: Dict):
@@ -87,18 +353,35 @@ class Revision:
         start_ts = json.get("start_ts")
         end_ts = json.get("end_ts")
         error_message = json.get("error_message")
+        purge_progress = json.get("purge_progress")
+        throughput_json = json.get("throughput")
+        throughput = (
+            RevisionThroughput.from_json(throughput_json)
+            if type(throughput_json) == dict
+            else None
+        )
         status = None
         for revision_status in RevisionStatus:
             if revision_status.value == status_value:
                 status = revision_status
         return (
-            Revision(status, progress, start_ts, end_ts, error_message)
+            Revision(
+                status,
+                progress,
+                start_ts,
+                end_ts,
+                error_message,
+                purge_progress,
+                throughput,
+            )
             if (
                 status is not None
                 and (progress is None or type(progress) == int)
                 and (start_ts is None or type(start_ts) == int)
                 and (end_ts is None or type(end_ts) == int)
                 and (error_message is None or type(error_message) == str)
+                and (purge_progress is None or type(purge_progress) == int)
+                and (throughput_json is None or throughput is not None)
             )
             else None
         )
@@ -143,6 +426,22 @@ class Revision:
         """
         return self._error_message
 
+    @property
+    def purge_progress(self) -> Optional[int]:
+        """
+        Get the progress percentage of the background removal of old data.
+        :return: The progress percentage or None if no data is being removed.
+        """
+        return self._purge_progress
+
+    @property
+    def throughput(self) -> Optional[RevisionThroughput]:
+        """
+        Get the throughput of the preparation of new data.
+        :return: The throughput or None if no data has been prepared.
+        """
+        return self._throughput
+
     def to_json(self) -> Dict:
         return {
             "status": self._status.value,
@@ -150,4 +449,170 @@ class Revision:
             "start_ts": self._start_ts,
             "end_ts": self._end_ts,
             "error_message": self._error_message,
+            "purge_progress": self._purge_progress,
+            "throughput": (
+                None if self._throughput is None else self._throughput.to_json()
+            ),
+        }
+
+
+class RevisionHistoryEntry:
+    """The outcome of a finished revision run."""
+
+    def __init__(
+        self,
+        status: RevisionStatus,
+        start_ts: int,
+        end_ts: int,
+        phase_seconds: Dict[str, float],
+        throughput: Optional[RevisionThroughput] = None,
+        error_message: Optional[str] = None,
+        generation: Optional[int] = None,
+        dataset_size: Optional[int] = None,
+    ):
+        """
+        Initialize a new RevisionHistoryEntry instance.
+
+        :param status: The status in which the run has finished.
+        :param start_ts: The start timestamp of the revision.
+          The start of a resumed revision is the start of its first run.
+        :param end_ts: The end timestamp of the run.
+        :param phase_seconds: The durations of the phases of the run in seconds by status value.
+          The purge phase is recorded as retirement, since it does not include the removal of retired data.
+        :param throughput: The throughput of the preparation of new data during the run.
+        :param error_message: The error message if the run has failed.
+        :param generation: The generation of the active dataset after the run.
+        :param dataset_size: The size of the active dataset in bytes after the run.
+        """
+        self._status: RevisionStatus = status
+        self._start_ts: int = start_ts
+        self._end_ts: int = end_ts
+        self._phase_seconds: Dict[str, float] = phase_seconds
+        self._throughput: Optional[RevisionThroughput] = throughput
+        self._error_message: Optional[str] = error_message
+        self._generation: Optional[int] = generation
+        self._dataset_size: Optional[int] = dataset_size
+
+    @staticmethod
+    def from_json(json: Dict):
+        status_value = json.get("status")
+        start_ts = json.get("start_ts")
+        end_ts = json.get("end_ts")
+        phase_seconds = json.get("phase_seconds")
+        throughput_json = json.get("throughput")
+        error_message = json.get("error_message")
+        generation = json.get("generation")
+        dataset_size = json.get("dataset_size")
+        throughput = (
+            RevisionThroughput.from_json(throughput_json)
+            if type(throughput_json) == dict
+            else None
+        )
+        status = None
+        for revision_status in RevisionStatus:
+            if revision_status.value == status_value:
+                status = revision_status
+        return (
+            RevisionHistoryEntry(
+                status,
+                start_ts,
+                end_ts,
+                phase_seconds,
+                throughput,
+                error_message,
+                generation,
+                dataset_size,
+            )
+            if (
+                status is not None
+                and type(start_ts) == int
+                and type(end_ts) == int
+                and type(phase_seconds) == dict
+                and all(
+                    type(seconds) in [int, float] for seconds in phase_seconds.values()
+                )
+                and (throughput_json is None or throughput is not None)
+                and (error_message is None or type(error_message) == str)
+                and (generation is None or type(generation) == int)
+                and (dataset_size is None or type(dataset_size) == int)
+            )
+            else None
+        )
+
+    @property
+    def status(self) -> RevisionStatus:
+        """
+        Get the status in which the run has finished.
+        :return: The status.
+        """
+        return self._status
+
+    @property
+    def start_ts(self) -> int:
+        """
+        Get the start timestamp of the revision.
+        :return: The start timestamp.
+        """
+        return self._start_ts
+
+    @property
+    def end_ts(self) -> int:
+        """
+        Get the end timestamp of the run.
+        :return: The end timestamp.
+        """
+        return self._end_ts
+
+    @property
+    def phase_seconds(self) -> Dict[str, float]:
+        """
+        Get the durations of the phases of the run.
+        :return: The durations in seconds by status value.
+        """
+        return self._phase_seconds
+
+    @property
+    def throughput(self) -> Optional[RevisionThroughput]:
+        """
+        Get the throughput of the preparation of new data during the run.
+        :return: The throughput or None if no data has been prepared.
+        """
+        return self._throughput
+
+    @property
+    def error_message(self) -> Optional[str]:
+        """
+        Get the error message of the run.
+        :return: The error message or None if the run has not failed.
+        """
+        return self._error_message
+
+    @property
+    def generation(self) -> Optional[int]:
+        """
+        Get the generation of the active dataset after the run.
+        :return: The generation or None if there is no active dataset.
+        """
+        return self._generation
+
+    @property
+    def dataset_size(self) -> Optional[int]:
+        """
+        Get the size of the active dataset after the run.
+        :return: The size in bytes or None if there is no active dataset.
+        """
+        return self._dataset_size
+
+    def to_json(self) -> Dict:
+        return {
+            "status": self._status.value,
+            "start_ts": self._start_ts,
+            "end_ts": self._end_ts,
+            "phase_seconds": self._phase_seconds,
+            "throughput": (
+                None if self._throughput is None else self._throughput.to_json()
+            ),
+            "error_message": self._error_message,
+            "generation": self._generation,
+            "dataset_size": self._dataset_size,
         }
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Dict
+from typing import Dict, Optional
 
 
 class StorageFileQuantity(Enum):
@@ -119,6 +119,34 @@ class BinaryPwnedStorageSettings:
             "numeric_bytes": self.occasion_numeric_type.byte_length,
         }
 
+    @staticmethod
+    def from_dict(settings: Dict) -> Optional["BinaryPwnedStorageSettings"]:
+        """
+        Create settings from a dictionary made by to_dict.
+
+        :param settings: Settings as a dictionary.
+        :return: The settings or None if the dictionary has no valid settings.
+        """
+        file_quantity = next(
+            (
+                quantity
+                for quantity in StorageFileQuantity
+                if quantity.value == settings.get("file_quantity")
+            ),
+            None,
+        )
+        numeric_type = next(
+            (
+                numeric_type
+                for numeric_type in NumericType
+                if numeric_type.value == settings.get("numeric_bytes")
+            ),
+            None,
+        )
+        if file_quantity is None or numeric_type is None:
+            return None
+        return BinaryPwnedStorageSettings(file_quantity, numeric_type)
+
     def __calculate_file_code_length(self) -> int:
         code_length = 0
         file_quantity = self.file_quantity - 1
@@ -126,3 +154,216 @@ class BinaryPwnedStorageSettings:
             file_quantity //= 16
             code_length += 1
         return code_length
+
+
+class RevisionSettings:
+    """Settings for storage revisions."""
+
+    DEFAULT_IS_INCREMENTAL: bool = False
+    """Whether revisions are incremental by default."""
+
+    DEFAULT_PURGE_FILE_RATE: Optional[int] = 1000
+    """The default maximum quantity of retired dataset files removed per second."""
+
+    DEFAULT_PURGE_BYTE_RATE: Optional[int] = None
+    """The default maximum size of retired dataset files in bytes removed per second."""
+
+    DEFAULT_WRITE_BATCH_SIZE: int = 64 * 1024
+    """The default size of buffered revision data in bytes after which it is written to a file."""
+
+    DEFAULT_IS_IN_PLACE: bool = False
+    """Whether revisions replace data files of the active dataset by default."""
+
+    DEFAULT_RETAINED_GENERATION_QUANTITY: int = 0
+    """The default quantity of previous datasets retained for rollback."""
+
+    DEFAULT_IS_POPULARITY_ORDERED: bool = False
+    """Whether revisions prepare the most requested prefixes first by default."""
+
+    DEFAULT_HOT_PREFIX_QUANTITY: int = 0
+    """The default quantity of the most requested prefixes refreshed between revisions."""
+
+    DEFAULT_HOT_REFRESH_INTERVAL: float = 3600
+    """The default time in seconds between refreshes of the most requested prefixes."""
+
+    DEFAULT_IS_ON_DEMAND_BOOTSTRAP: bool = False
+    """Whether ranges are requested on demand until the first dataset is prepared by default."""
+
+    DEFAULT_IS_MULTI_PROCESS: bool = False
+    """Whether the storage is shared by several processes by default."""
+
+    DEFAULT_LOOKUP_PROFILE_RATE: float = 0
+    """The default fraction of profiled lookups."""
+
+    def __init__(
+        self,
+        is_incremental: bool = DEFAULT_IS_INCREMENTAL,
+        *,
+        purge_file_rate: Optional[int] = DEFAULT_PURGE_FILE_RATE,
+        purge_byte_rate: Optional[int] = DEFAULT_PURGE_BYTE_RATE,
+        write_byte_rate: Optional[int] = None,
+        write_batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+        lookup_latency_target: Optional[float] = None,
+        is_in_place: bool = DEFAULT_IS_IN_PLACE,
+        retained_generation_quantity: int = DEFAULT_RETAINED_GENERATION_QUANTITY,
+        is_popularity_ordered: bool = DEFAULT_IS_POPULARITY_ORDERED,
+        hot_prefix_quantity: int = DEFAULT_HOT_PREFIX_QUANTITY,
+        hot_refresh_interval: float = DEFAULT_HOT_REFRESH_INTERVAL,
+        is_on_demand_bootstrap: bool = DEFAULT_IS_ON_DEMAND_BOOTSTRAP,
+        is_multi_process: bool = DEFAULT_IS_MULTI_PROCESS,
+        lookup_profile_rate: float = DEFAULT_LOOKUP_PROFILE_RATE,
+    ):
+        """
+        Initialize a new RevisionSettings instance.
+
+        :param is_incremental: Whether to reuse unchanged ranges of the active dataset during revisions.
+        :param purge_file_rate: The maximum quantity of retired dataset files removed per second.
+          None means no limit.
+        :param purge_byte_rate: The maximum size of retired dataset files in bytes removed per second.
+          None means no limit.
+        :param write_byte_rate: The maximum size of revision data in bytes written per second.
+          None means no limit.
+        :param write_batch_size: The size of buffered revision data in bytes after which it is written to a file.
+        :param lookup_latency_target: The lookup latency in seconds above which revision writes are slowed down.
+          None means that revision writes are not slowed down because of lookups.
+        :param is_in_place: Whether to replace data files of the active dataset one by one during revisions
+          instead of preparing a new dataset, if the storage implementation supports it.
+        :param retained_generation_quantity: The quantity of previous datasets retained for rollback
+          instead of being removed after revisions.
+        :param is_popularity_ordered: Whether to prepare the most requested prefixes first during revisions.
+        :param hot_prefix_quantity: The quantity of the most requested prefixes periodically refreshed
+          in the active dataset. 0 means that prefixes are not refreshed periodically.
+        :param hot_refresh_interval: The time in seconds between refreshes of the most requested prefixes.
+        :param is_on_demand_bootstrap: Whether to serve lookups by requesting ranges on demand
+          until the first dataset is prepared instead of failing.
+        :param is_multi_process: Whether the storage resource directory is shared by several processes,
+          of which only the elected leader runs revisions and the others follow its active dataset.
+        :param lookup_profile_rate: The fraction of lookups profiled, from 0 to 1.
+          Profiles are periodically dumped to the storage resource directory. 0 means no profiling.
+        """
+        self.__is_incremental: bool = is_incremental
+        self.__purge_file_rate: Optional[int] = purge_file_rate
+        self.__purge_byte_rate: Optional[int] = purge_byte_rate
+        self.__write_byte_rate: Optional[int] = write_byte_rate
+        self.__write_batch_size: int = write_batch_size
+        self.__lookup_latency_target: Optional[float] = lookup_latency_target
+        self.__is_in_place: bool = is_in_place
+        self.__retained_generation_quantity: int = retained_generation_quantity
+        self.__is_popularity_ordered: bool = is_popularity_ordered
+        self.__hot_prefix_quantity: int = hot_prefix_quantity
+        self.__hot_refresh_interval: float = hot_refresh_interval
+        self.__is_on_demand_bootstrap: bool = is_on_demand_bootstrap
+        self.__is_multi_process: bool = is_multi_process
+        self.__lookup_profile_rate: float = lookup_profile_rate
+
+    @property
+    def is_incremental(self) -> bool:
+        """
+        Check if revisions reuse unchanged ranges of the active dataset.
+        :return: True if revisions are incremental, False otherwise.
+        """
+        return self.__is_incremental
+
+    @property
+    def purge_file_rate(self) -> Optional[int]:
+        """
+        Get the maximum quantity of retired dataset files removed per second.
+        :return: The file rate or None if it is not limited.
+        """
+        return self.__purge_file_rate
+
+    @property
+    def purge_byte_rate(self) -> Optional[int]:
+        """
+        Get the maximum size of retired dataset files in bytes removed per second.
+        :return: The byte rate or None if it is not limited.
+        """
+        return self.__purge_byte_rate
+
+    @property
+    def write_byte_rate(self) -> Optional[int]:
+        """
+        Get the maximum size of revision data in bytes written per second.
+        :return: The byte rate or None if it is not limited.
+        """
+        return self.__write_byte_rate
+
+    @property
+    def write_batch_size(self) -> int:
+        """
+        Get the size of buffered revision data in bytes after which it is written to a file.
+        :return: The batch size in bytes.
+        """
+        return self.__write_batch_size
+
+    @property
+    def lookup_latency_target(self) -> Optional[float]:
+        """
+        Get the lookup latency above which revision writes are slowed down.
+        :return: The latency in seconds or None if revision writes do not depend on lookups.
+        """
+        return self.__lookup_latency_target
+
+    @property
+    def is_in_place(self) -> bool:
+        """
+        Check if revisions replace data files of the active dataset one by one.
+        :return: True if revisions are in place, False otherwise.
+        """
+        return self.__is_in_place
+
+    @property
+    def retained_generation_quantity(self) -> int:
+        """
+        Get the quantity of previous datasets retained for rollback.
+        :return: The quantity of retained datasets.
+        """
+        return self.__retained_generation_quantity
+
+    @property
+    def is_popularity_ordered(self) -> bool:
+        """
+        Check if revisions prepare the most requested prefixes first.
+        :return: True if revisions are ordered by popularity, False otherwise.
+        """
+        return self.__is_popularity_ordered
+
+    @property
+    def hot_prefix_quantity(self) -> int:
+        """
+        Get the quantity of the most requested prefixes periodically refreshed in the active dataset.
+        :return: The quantity of prefixes or 0 if prefixes are not refreshed periodically.
+        """
+        return self.__hot_prefix_quantity
+
+    @property
+    def hot_refresh_interval(self) -> float:
+        """
+        Get the time between refreshes of the most requested prefixes.
+        :return: The interval in seconds.
+        """
+        return self.__hot_refresh_interval
+
+    @property
+    def is_on_demand_bootstrap(self) -> bool:
+        """
+        Check if lookups are served by requesting ranges on demand until the first dataset is prepared.
+        :return: True if the bootstrap is on demand, False otherwise.
+        """
+        return self.__is_on_demand_bootstrap
+
+    @property
+    def is_multi_process(self) -> bool:
+        """
+        Check if the storage resource directory is shared by several processes.
+        :return: True if the storage is shared by processes, False otherwise.
+        """
+        return self.__is_multi_process
+
+    @property
+    def lookup_profile_rate(self) -> float:
+        """
+        Get the fraction of profiled lookups.
+        :return: The fraction from 0 to 1.
+        """
+        return self.__lookup_profile_rate
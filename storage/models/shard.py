@@ -0,0 +1,123 @@
+from typing import Dict, Optional
+
+from storage.models.pwned import PWNED_PREFIX_CAPACITY, PWNED_PREFIX_LENGTH
+
+
+class PrefixShard:
+    """
+    A slice of the prefix space owned by one of the nodes that share the storage of all prefixes.
+    The prefix space is split into the given quantity of consecutive shards of nearly equal size.
+    """
+
+    def __init__(self, index: int = 0, quantity: int = 1):
+        """
+        Initialize a new PrefixShard instance. By default, the shard contains all prefixes.
+
+        :param index: The index of the shard.
+        :param quantity: The quantity of shards.
+        """
+        if quantity < 1 or PWNED_PREFIX_CAPACITY < quantity:
+            raise ValueError(
+                f"The shard quantity must be between 1 and {PWNED_PREFIX_CAPACITY}."
+            )
+        if index < 0 or quantity <= index:
+            raise ValueError("The shard index must be less than the shard quantity.")
+        self.__index: int = index
+        self.__quantity: int = quantity
+
+    @property
+    def index(self) -> int:
+        """
+        Get the index of the shard.
+        :return: The shard index.
+        """
+        return self.__index
+
+    @property
+    def quantity(self) -> int:
+        """
+        Get the quantity of shards.
+        :return: The shard quantity.
+        """
+        return self.__quantity
+
+    @property
+    def is_whole(self) -> bool:
+        """
+        Check if the shard contains all prefixes.
+        :return: True if the prefix space is not sharded, False otherwise.
+        """
+        return self.__quantity == 1
+
+    @property
+    def prefix_indices(self) -> range:
+        """
+        Get the indices of the prefixes contained in the shard.
+        :return: The range of prefix indices.
+        """
+        return range(
+            self.__get_first_prefix_index(self.__index),
+            self.__get_first_prefix_index(self.__index + 1),
+        )
+
+    def contains(self, hash_prefix: str) -> bool:
+        """
+        Check if the shard contains a hash prefix.
+
+        :param hash_prefix: The valid hash prefix.
+        :return: True if the shard contains the prefix, False otherwise.
+        """
+        return self.locate(hash_prefix, self.__quantity) == self.__index
+
+    def covers(self, shard: "PrefixShard") -> bool:
+        """
+        Check if the shard contains all prefixes of another shard.
+
+        :param shard: The other shard.
+        :return: True if the shard contains all prefixes of the other shard, False otherwise.
+        """
+        return (
+            self.prefix_indices.start <= shard.prefix_indices.start
+            and shard.prefix_indices.stop <= self.prefix_indices.stop
+        )
+
+    @staticmethod
+    def locate(hash_prefix: str, quantity: int) -> int:
+        """
+        Find the shard that contains a hash prefix.
+
+        :param hash_prefix: The valid hash prefix.
+        :param quantity: The quantity of shards.
+        :return: The index of the shard.
+        """
+        prefix_index = int(hash_prefix[:PWNED_PREFIX_LENGTH], 16)
+        return prefix_index * quantity // PWNED_PREFIX_CAPACITY
+
+    def to_json(self) -> Dict:
+        """
+        Convert the shard to JSON.
+        :return: The shard as JSON.
+        """
+        return {"index": self.__index, "quantity": self.__quantity}
+
+    @staticmethod
+    def from_json(json: Optional[Dict]) -> Optional["PrefixShard"]:
+        """
+        Create a shard from JSON made by to_json.
+
+        :param json: The shard as JSON or None for the shard that contains all prefixes.
+        :return: The shard or None if the JSON is not a valid shard.
+        """
+        if json is None:
+            return PrefixShard()
+        index = json.get("index")
+        quantity = json.get("quantity")
+        if type(index) != int or type(quantity) != int:
+            return None
+        try:
+            return PrefixShard(index, quantity)
+        except ValueError:
+            return None
+
+    def __get_first_prefix_index(self, shard_index: int) -> int:
+        return -(-shard_index * PWNED_PREFIX_CAPACITY // self.__quantity)
@@ -1,22 +1,48 @@
 import asyncio
+import io
+import logging
+import os
+import threading
+from typing import Optional
 
 import pytest
 
 from storage.auxiliary import hasher
-from storage.auxiliary.filetools import join_paths
+from storage.auxiliary.filetools import (
+    get_file_size,
+    is_dir,
+    is_file,
+    join_paths,
+    list_dir,
+    remove_file,
+)
 from storage.implementations.binary_storage import BinaryPwnedStorage
 from storage.implementations.mocked_requester import MockedPwnedRequester
-from storage.models.abstract import PwnedRangeProvider, PwnedStorage, UpdateResult
+from storage.models.abstract import (
+    PrefixNotOwnedError,
+    PwnedDatasetSource,
+    PwnedRangeProvider,
+    PwnedStorage,
+    RangeNotModifiedError,
+    RollbackResult,
+    UpdateResult,
+)
+from storage.models.lookup import LookupPhase, LookupTrace
 from storage.models.pwned import PWNED_PREFIX_CAPACITY
 from storage.models.revision import RevisionStatus
 from storage.models.settings import (
     BinaryPwnedStorageSettings,
     NumericType,
+    RevisionSettings,
     StorageFileQuantity,
 )
+from storage.models.shard import PrefixShard
 from tests.shared import temp_dir
 
 NUMERIC_TYPE = NumericType.BYTE
+SMALL_STORAGE_NAME = "small-storage"
+SMALL_SHARD = PrefixShard(0, 64)
+SMALL_PREFIX_QUANTITY = len(SMALL_SHARD.prefix_indices)
 
 
 class RangeRequestCounter(PwnedRangeProvider):
@@ -49,18 +75,120 @@ class UnstableRangeProvider(RangeRequestCounter):
         return await super().get_range(prefix)
 
 
+class InterruptedRangeProvider(RangeRequestCounter):
+    ERROR_MESSAGE = "Range stream interruption by InterruptedRangeProvider."
+    INTERRUPTED_PREFIX = "01ABC"
+    RANGE = "\n".join(f"{str(index) * 35}:{index + 1}" for index in range(5))
+
+    def __init__(self):
+        super().__init__()
+        self.is_interrupted = False
+
+    async def stream_range(self, prefix):
+        async for record in super().stream_range(prefix):
+            yield record
+            if prefix == self.INTERRUPTED_PREFIX and not self.is_interrupted:
+                self.is_interrupted = True
+                raise RuntimeError(self.ERROR_MESSAGE)
+
+
+class StragglingRangeProvider(RangeRequestCounter):
+    STRAGGLING_PREFIX = "03000"
+    DELAY_SECONDS = 1
+
+    async def get_range(self, prefix):
+        if prefix == self.STRAGGLING_PREFIX:
+            await asyncio.sleep(self.DELAY_SECONDS)
+        return await super().get_range(prefix)
+
+
+class ConditionalRangeProvider(RangeRequestCounter):
+    CHANGED_PREFIX = "01234"
+    CHANGED_RANGE = f"{'1' * 35}:2"
+    UNMODIFIED_FILE_CODE = "00"
+
+    def __init__(self):
+        super().__init__()
+        self.unmodified_range_count = 0
+
+    async def get_range(self, prefix):
+        found_range = await super().get_range(prefix)
+        return self.CHANGED_RANGE if prefix == self.CHANGED_PREFIX else found_range
+
+    async def stream_range(self, prefix, modified_since_ts=None):
+        if modified_since_ts is not None and prefix.startswith(
+            self.UNMODIFIED_FILE_CODE
+        ):
+            self.unmodified_range_count += 1
+            raise RangeNotModifiedError(prefix)
+        async for record in super().stream_range(prefix):
+            yield record
+
+
+class StorageDatasetSource(PwnedDatasetSource):
+    def __init__(self, storage: PwnedStorage):
+        self.storage = storage
+        self.streamed_file_names = list()
+
+    async def get_manifest(self):
+        return await self.storage.get_manifest()
+
+    def stream_file(self, name, generation):
+        self.streamed_file_names.append(name)
+        return self.storage.stream_dataset_file(name, generation)
+
+
 def create_range_provider() -> PwnedRangeProvider:
     return MockedPwnedRequester("pwned-checker-tests")
 
 
-def create_storage(temp_dir: str, range_provider: PwnedRangeProvider) -> PwnedStorage:
+def create_storage(
+    temp_dir: str,
+    range_provider: PwnedRangeProvider,
+    revision_settings: Optional[RevisionSettings] = None,
+) -> PwnedStorage:
     resource_dir = join_paths(temp_dir, "storage")
     settings = BinaryPwnedStorageSettings(
         StorageFileQuantity.N_256,
         NUMERIC_TYPE,
     )
     coroutines = 3
-    return BinaryPwnedStorage(resource_dir, range_provider, coroutines, settings)
+    return BinaryPwnedStorage(
+        resource_dir,
+        range_provider,
+        coroutines,
+        settings,
+        revision_settings or RevisionSettings(),
+    )
+
+
+def create_small_storage(
+    temp_dir: str,
+    range_provider: PwnedRangeProvider,
+    revision_settings: Optional[RevisionSettings] = None,
+) -> PwnedStorage:
+    # Behaviour tests revise only a part of the prefix space, so that they run fast.
+    resource_dir = join_paths(temp_dir, SMALL_STORAGE_NAME)
+    settings = BinaryPwnedStorageSettings(
+        StorageFileQuantity.N_256,
+        NUMERIC_TYPE,
+    )
+    coroutines = 3
+    return BinaryPwnedStorage(
+        resource_dir,
+        range_provider,
+        coroutines,
+        settings,
+        revision_settings or RevisionSettings(),
+        SMALL_SHARD,
+    )
+
+
+def get_dataset_dir(temp_dir: str) -> str:
+    dataset_dir = join_paths(temp_dir, SMALL_STORAGE_NAME, "dataset-a")
+    if not is_dir(dataset_dir):
+        dataset_dir = join_paths(temp_dir, SMALL_STORAGE_NAME, "dataset-b")
+    return dataset_dir
 
 
 @pytest.fixture(scope="session")
@@ -168,6 +296,7 @@ async def test_update_pause(temp_dir: str):
     start_ts = storage.revision.start_ts
 
     intermediate_progress = storage.revision.progress
+    await storage.close()
     storage = create_storage(temp_dir, request_counter)
     storage.request_update()
     await __wait_for_progress(intermediate_progress)
@@ -185,6 +314,7 @@ async def test_update_pause(temp_dir: str):
 
     found_range = await storage.get_range("00001")
     assert found_range == request_counter.RANGE
+    await storage.close()
 
 
 @pytest.mark.asyncio
@@ -203,3 +333,657 @@ async def test_data_preparation_failure(temp_dir: str):
 
     found_range = await storage.get_range("00001")
     assert found_range == range_provider.RANGE
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_range_stream_interruption(temp_dir: str):
+    range_provider = InterruptedRangeProvider()
+    storage = create_small_storage(temp_dir, range_provider)
+
+    assert await storage.update() == UpdateResult.FAILED
+    assert storage.revision.status == RevisionStatus.PREPARATION_FAILED
+    assert range_provider.is_interrupted
+
+    assert await storage.update() == UpdateResult.DONE
+    assert storage.revision.status == RevisionStatus.COMPLETED
+
+    found_range = await storage.get_range(range_provider.INTERRUPTED_PREFIX)
+    assert found_range == range_provider.RANGE
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_straggling_range_provider(temp_dir: str):
+    range_provider = StragglingRangeProvider()
+    storage = create_small_storage(temp_dir, range_provider)
+
+    assert await storage.update() == UpdateResult.DONE
+    assert len(range_provider.prefix_request_counts) == SMALL_PREFIX_QUANTITY
+    assert all(count == 1 for count in range_provider.prefix_request_counts.values())
+
+    dataset_dir = get_dataset_dir(temp_dir)
+    assert all(name.endswith(".dat") for name in list_dir(dataset_dir))
+    for prefix in ["03000", "03001", "037FF", "03800", "03FFF"]:
+        found_range = await storage.get_range(prefix)
+        assert found_range == range_provider.RANGE
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_crash_recovery(temp_dir: str):
+    request_counter = RangeRequestCounter()
+    storage = create_small_storage(temp_dir, request_counter)
+    storage.PREPARATION_CHECKPOINT_INTERVAL_SECONDS = 0.05
+
+    checkpoint_file_path = join_paths(
+        temp_dir, SMALL_STORAGE_NAME, BinaryPwnedStorage.PREPARATION_CHECKPOINT_FILE
+    )
+    update_task = asyncio.create_task(storage.update())
+    while (storage.revision.progress or 0) < 30:
+        await asyncio.sleep(0.01)
+    # The next checkpoint covers the progress reached.
+    remove_file(checkpoint_file_path)
+    while not is_file(checkpoint_file_path):
+        await asyncio.sleep(0.01)
+    update_task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await update_task
+    await asyncio.sleep(0.1)
+
+    await storage.close()
+    storage = create_small_storage(temp_dir, request_counter)
+    assert storage.revision.status == RevisionStatus.PREPARATION_FAILED
+    assert storage.revision.progress not in [None, 0]
+    assert await storage.update() == UpdateResult.DONE
+
+    assert len(request_counter.prefix_request_counts) == SMALL_PREFIX_QUANTITY
+    assert sum(request_counter.prefix_request_counts.values()) < 1.5 * (
+        SMALL_PREFIX_QUANTITY
+    )
+    dataset_dir = get_dataset_dir(temp_dir)
+    data_file_sizes = {
+        get_file_size(join_paths(dataset_dir, name)) for name in list_dir(dataset_dir)
+    }
+    assert len(data_file_sizes) == 1
+    found_range = await storage.get_range("02000")
+    assert found_range == request_counter.RANGE
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_incremental_update(temp_dir: str):
+    revision_settings = RevisionSettings(is_incremental=True)
+    request_counter = RangeRequestCounter()
+    storage = create_small_storage(temp_dir, request_counter, revision_settings)
+    assert await storage.update() == UpdateResult.DONE
+    unmodified_file_path = join_paths(get_dataset_dir(temp_dir), "00.dat")
+    unmodified_file_inode = os.stat(unmodified_file_path).st_ino
+
+    range_provider = ConditionalRangeProvider()
+    await storage.close()
+    storage = create_small_storage(temp_dir, range_provider, revision_settings)
+    assert await storage.update() == UpdateResult.DONE
+    assert len(range_provider.prefix_request_counts) < SMALL_PREFIX_QUANTITY
+    assert range_provider.unmodified_range_count == PWNED_PREFIX_CAPACITY // 256
+
+    dataset_dir = get_dataset_dir(temp_dir)
+    assert os.stat(join_paths(dataset_dir, "00.dat")).st_ino == unmodified_file_inode
+    data_file_sizes = {
+        get_file_size(join_paths(dataset_dir, name))
+        for name in list_dir(dataset_dir)
+        if name.endswith(".dat")
+    }
+    assert len(data_file_sizes) == 1
+    for prefix in ["00000", "00FFF", "01233", "01235", "03FFF"]:
+        found_range = await storage.get_range(prefix)
+        assert found_range == request_counter.RANGE
+    found_range = await storage.get_range(range_provider.CHANGED_PREFIX)
+    assert found_range == range_provider.CHANGED_RANGE
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_lookups_during_transition(temp_dir: str):
+    request_counter = RangeRequestCounter()
+    storage = create_small_storage(temp_dir, request_counter)
+    if storage.revision.status != RevisionStatus.COMPLETED:
+        assert await storage.update() == UpdateResult.DONE
+
+    # A lookup of the pinned prefix keeps the previous dataset pinned until it is released.
+    pinned_prefix = "00002"
+    pinned_event = threading.Event()
+    release_event = threading.Event()
+    get_range = storage._get_range
+
+    def get_range_pinned(prefix: str, dataset_dir: str) -> str:
+        if prefix == pinned_prefix:
+            pinned_event.set()
+            release_event.wait()
+        return get_range(prefix, dataset_dir)
+
+    storage._get_range = get_range_pinned
+    pinned_lookup_task = asyncio.create_task(storage.get_range(pinned_prefix))
+    await asyncio.to_thread(pinned_event.wait)
+    previous_dataset_dir = get_dataset_dir(temp_dir)
+
+    update_task = asyncio.create_task(storage.update())
+    while storage.revision.status != RevisionStatus.PURGE:
+        assert not update_task.done()
+        assert await storage.get_range("00001") == request_counter.RANGE
+        await asyncio.sleep(0)
+
+    # The new dataset is active, but the update waits for the pinned lookup.
+    # Lookups are served from the new dataset without waiting for the update.
+    for _ in range(10):
+        assert await storage.get_range("00001") == request_counter.RANGE
+    assert not update_task.done()
+    assert not pinned_lookup_task.done()
+    assert is_dir(previous_dataset_dir)
+
+    release_event.set()
+    assert await pinned_lookup_task == request_counter.RANGE
+    assert await update_task == UpdateResult.DONE
+    assert get_dataset_dir(temp_dir) != previous_dataset_dir
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_in_place_update(temp_dir: str):
+    revision_settings = RevisionSettings(is_incremental=True, is_in_place=True)
+    request_counter = RangeRequestCounter()
+    storage = create_small_storage(temp_dir, request_counter, revision_settings)
+    assert await storage.update() == UpdateResult.DONE
+    dataset_dir = get_dataset_dir(temp_dir)
+    unmodified_file_path = join_paths(dataset_dir, "00.dat")
+    unmodified_file_inode = os.stat(unmodified_file_path).st_ino
+
+    range_provider = ConditionalRangeProvider()
+    await storage.close()
+    storage = create_small_storage(temp_dir, range_provider, revision_settings)
+    update_task = asyncio.create_task(storage.update())
+    while not update_task.done():
+        found_range = await storage.get_range("01234")
+        assert found_range in [request_counter.RANGE, range_provider.CHANGED_RANGE]
+        await asyncio.sleep(0)
+    assert await update_task == UpdateResult.DONE
+    assert range_provider.unmodified_range_count == PWNED_PREFIX_CAPACITY // 256
+
+    assert get_dataset_dir(temp_dir) == dataset_dir
+    assert (
+        sum(
+            is_dir(join_paths(temp_dir, SMALL_STORAGE_NAME, name))
+            for name in ["dataset-a", "dataset-b"]
+        )
+        == 1
+    )
+    assert not any(name.endswith(".tmp") for name in list_dir(dataset_dir))
+    assert os.stat(unmodified_file_path).st_ino == unmodified_file_inode
+    for prefix in ["00000", "00FFF", "01233", "01235", "03FFF"]:
+        found_range = await storage.get_range(prefix)
+        assert found_range == request_counter.RANGE
+    found_range = await storage.get_range(range_provider.CHANGED_PREFIX)
+    assert found_range == range_provider.CHANGED_RANGE
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_generation_rollback(temp_dir: str):
+    revision_settings = RevisionSettings(retained_generation_quantity=2)
+    request_counter = RangeRequestCounter()
+    storage = create_small_storage(temp_dir, request_counter, revision_settings)
+    # Generations are revision start timestamps in seconds, so revisions must start in different seconds.
+    await asyncio.sleep(1)
+    assert await storage.update() == UpdateResult.DONE
+    first_generation = storage.active_generation
+
+    range_provider = ConditionalRangeProvider()
+    await storage.close()
+    storage = create_small_storage(temp_dir, range_provider, revision_settings)
+    await asyncio.sleep(1)
+    assert await storage.update() == UpdateResult.DONE
+    second_generation = storage.active_generation
+    assert second_generation > first_generation
+    assert storage.retained_generations[0] == first_generation
+    assert len(storage.retained_generations) <= 2
+    found_range = await storage.get_range(range_provider.CHANGED_PREFIX)
+    assert found_range == range_provider.CHANGED_RANGE
+
+    assert await storage.rollback(second_generation + 1) == RollbackResult.NOT_FOUND
+    assert await storage.rollback(first_generation) == RollbackResult.DONE
+    assert storage.active_generation == first_generation
+    assert storage.retained_generations[0] == second_generation
+    assert first_generation not in storage.retained_generations
+    found_range = await storage.get_range(range_provider.CHANGED_PREFIX)
+    assert found_range == request_counter.RANGE
+
+    await storage.close()
+    storage = create_small_storage(temp_dir, request_counter, revision_settings)
+    assert storage.active_generation == first_generation
+    found_range = await storage.get_range(range_provider.CHANGED_PREFIX)
+    assert found_range == request_counter.RANGE
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_prefix_range_refresh(temp_dir: str):
+    request_counter = RangeRequestCounter()
+    storage = create_small_storage(temp_dir, request_counter)
+    if storage.revision.status != RevisionStatus.COMPLETED:
+        assert await storage.update() == UpdateResult.DONE
+    dataset_dir = get_dataset_dir(temp_dir)
+    unrelated_file_inode = os.stat(join_paths(dataset_dir, "00.dat")).st_ino
+
+    range_provider = ConditionalRangeProvider()
+    await storage.close()
+    storage = create_small_storage(temp_dir, range_provider)
+    with pytest.raises(ValueError):
+        await storage.refresh("01234", "01230")
+    assert await storage.refresh("01230", "0123F") == UpdateResult.DONE
+    assert len(range_provider.prefix_request_counts) == 16
+
+    assert os.stat(join_paths(dataset_dir, "00.dat")).st_ino == unrelated_file_inode
+    assert not any(name.endswith(".tmp") for name in list_dir(dataset_dir))
+    found_range = await storage.get_range(range_provider.CHANGED_PREFIX)
+    assert found_range == range_provider.CHANGED_RANGE
+    for prefix in ["01000", "0122F", "01235", "01240", "01FFF"]:
+        found_range = await storage.get_range(prefix)
+        assert found_range == request_counter.RANGE
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_hot_prefix_refresh(temp_dir: str):
+    storage = create_small_storage(temp_dir, RangeRequestCounter())
+    if storage.revision.status != RevisionStatus.COMPLETED:
+        assert await storage.update() == UpdateResult.DONE
+
+    # Request counts may have been exported by previous tests.
+    remove_file(
+        join_paths(temp_dir, SMALL_STORAGE_NAME, BinaryPwnedStorage.POPULARITY_FILE)
+    )
+    range_provider = RangeRequestCounter()
+    await storage.close()
+    storage = create_small_storage(temp_dir, range_provider)
+    assert await storage.refresh_hot_prefixes(2) == UpdateResult.DONE
+    assert len(range_provider.prefix_request_counts) == 0
+
+    for prefix in ["01ABC", "01ABC", "02345", "01ABC", "03FFF", "02345"]:
+        await storage.get_range(prefix)
+    assert await storage.refresh_hot_prefixes(2) == UpdateResult.DONE
+    assert range_provider.prefix_request_counts == {"01ABC": 1, "02345": 1}
+    for prefix in ["01ABC", "02345", "03FFF"]:
+        found_range = await storage.get_range(prefix)
+        assert found_range == range_provider.RANGE
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_on_demand_bootstrap(temp_dir: str):
+    range_provider = RangeRequestCounter()
+    storage = BinaryPwnedStorage(
+        join_paths(temp_dir, "bootstrap-storage"),
+        range_provider,
+        settings=BinaryPwnedStorageSettings(StorageFileQuantity.N_256, NUMERIC_TYPE),
+        revision_settings=RevisionSettings(is_on_demand_bootstrap=True),
+    )
+
+    found_ranges = await asyncio.gather(*[storage.get_range("ABCDE") for _ in range(5)])
+    assert found_ranges == [range_provider.RANGE] * 5
+    assert range_provider.prefix_request_counts == {"ABCDE": 1}
+    assert await storage.get_range("ABCDE0") == range_provider.RANGE
+    assert await storage.get_range("ABCDE1") == ""
+    assert range_provider.prefix_request_counts == {"ABCDE": 1}
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_coalesced_lookups(temp_dir: str):
+    storage = create_small_storage(temp_dir, RangeRequestCounter())
+    if storage.revision.status != RevisionStatus.COMPLETED:
+        assert await storage.update() == UpdateResult.DONE
+
+    found_ranges = await asyncio.gather(
+        *[storage.get_range(prefix) for prefix in ["01ABC"] * 5 + ["01ABD"]]
+    )
+    assert found_ranges == [RangeRequestCounter.RANGE] * 6
+    assert storage.lookup_statistics.lookup_quantity == 6
+    assert storage.lookup_statistics.coalesced_lookup_quantity == 4
+    await storage.get_range("01ABC")
+    assert storage.lookup_statistics.coalesced_lookup_quantity == 4
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_multi_process_storage(temp_dir: str, caplog: pytest.LogCaptureFixture):
+    revision_settings = RevisionSettings(is_multi_process=True)
+    range_provider = RangeRequestCounter()
+    storage = create_small_storage(temp_dir, range_provider, revision_settings)
+    storage.COORDINATION_INTERVAL_SECONDS = 0.1
+    if storage.revision.status != RevisionStatus.COMPLETED:
+        assert await storage.update() == UpdateResult.DONE
+    assert storage.is_leader
+    # The leader starts taking commands once it is used.
+    assert await storage.get_range("02345") == RangeRequestCounter.RANGE
+
+    follower_range_provider = RangeRequestCounter()
+    follower = create_small_storage(
+        temp_dir, follower_range_provider, revision_settings
+    )
+    follower.COORDINATION_INTERVAL_SECONDS = 0.1
+    assert not follower.is_leader
+    assert follower.revision.status == RevisionStatus.COMPLETED
+    assert follower.active_generation == storage.active_generation
+    assert await follower.get_range("02345") == RangeRequestCounter.RANGE
+
+    assert await follower.refresh("02340", "0234F") == UpdateResult.DONE
+    assert len(follower_range_provider.prefix_request_counts) == 0
+    assert await follower.rollback(0) == RollbackResult.NOT_FOUND
+
+    # The leader takes the requests served by followers into account.
+    follower.POPULARITY_EXPORT_INTERVAL_SECONDS = 0
+    for _ in range(3):
+        assert await follower.get_range("01ABC") == RangeRequestCounter.RANGE
+        await asyncio.sleep(0.1)
+    range_provider.prefix_request_counts.clear()
+    assert await storage.refresh_hot_prefixes(1) == UpdateResult.DONE
+    assert list(range_provider.prefix_request_counts) == ["01ABC"]
+
+    # The leader retires the previous dataset once the follower acknowledges the new one.
+    with caplog.at_level(logging.WARNING):
+        assert await storage.update() == UpdateResult.DONE
+    assert "acknowledged" not in caplog.text
+    assert follower.active_generation == storage.active_generation
+    await follower.close()
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_sharded_storage(temp_dir: str):
+    range_provider = RangeRequestCounter()
+    # The shard begins and ends inside prefix groups.
+    shard = PrefixShard(7, 60)
+    storage = BinaryPwnedStorage(
+        join_paths(temp_dir, "sharded-storage"),
+        range_provider,
+        settings=BinaryPwnedStorageSettings(StorageFileQuantity.N_256, NUMERIC_TYPE),
+        revision_settings=RevisionSettings(is_in_place=True),
+        shard=shard,
+    )
+    shard_prefixes = {
+        hex(prefix_index)[2:].upper().rjust(5, "0")
+        for prefix_index in shard.prefix_indices
+    }
+
+    assert await storage.update() == UpdateResult.DONE
+    assert set(range_provider.prefix_request_counts) == shard_prefixes
+    for prefix_index in [shard.prefix_indices.start, shard.prefix_indices.stop - 1]:
+        prefix = hex(prefix_index)[2:].upper().rjust(5, "0")
+        assert await storage.get_range(prefix) == RangeRequestCounter.RANGE
+    with pytest.raises(PrefixNotOwnedError) as error_info:
+        await storage.get_range("00000")
+    assert error_info.value.shard_index == 0
+
+    range_provider.prefix_request_counts.clear()
+    assert await storage.update() == UpdateResult.DONE
+    assert set(range_provider.prefix_request_counts) == shard_prefixes
+    first_prefix = hex(shard.prefix_indices.start)[2:].upper().rjust(5, "0")
+    assert await storage.get_range(first_prefix) == RangeRequestCounter.RANGE
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_replication(temp_dir: str):
+    settings = BinaryPwnedStorageSettings(StorageFileQuantity.N_256, NUMERIC_TYPE)
+    revision_settings = RevisionSettings(is_incremental=True)
+    shard = PrefixShard(0, 64)
+    source_range_provider = RangeRequestCounter()
+    source_storage = BinaryPwnedStorage(
+        join_paths(temp_dir, "replication-source"),
+        source_range_provider,
+        settings=settings,
+        revision_settings=revision_settings,
+        shard=shard,
+    )
+    dataset_source = StorageDatasetSource(source_storage)
+    replica_range_provider = RangeRequestCounter()
+    replica = BinaryPwnedStorage(
+        join_paths(temp_dir, "replica"),
+        replica_range_provider,
+        settings=settings,
+        revision_settings=revision_settings,
+        shard=shard,
+        dataset_source=dataset_source,
+    )
+    assert await source_storage.update() == UpdateResult.DONE
+    manifest = await source_storage.get_manifest()
+    assert manifest.generation == source_storage.active_generation
+    assert {file.name for file in manifest.files} == {
+        "00.dat",
+        "01.dat",
+        "02.dat",
+        "03.dat",
+        source_storage.RANGE_DIGEST_FILE,
+    }
+
+    assert await replica.replicate() == UpdateResult.DONE
+    assert replica.active_generation == source_storage.active_generation
+    assert (await replica.get_manifest()).to_json() == manifest.to_json()
+    assert await replica.get_range("01234") == RangeRequestCounter.RANGE
+    assert replica_range_provider.prefix_request_counts == dict()
+    assert len(dataset_source.streamed_file_names) == len(manifest.files)
+
+    dataset_source.streamed_file_names.clear()
+    assert await replica.replicate() == UpdateResult.DONE
+    assert dataset_source.streamed_file_names == list()
+
+    source_range_provider.RANGE = f"{'1' * 35}:2"
+    assert await source_storage.refresh("01234", "01234") == UpdateResult.DONE
+    assert await replica.replicate() == UpdateResult.DONE
+    assert dataset_source.streamed_file_names == ["01.dat"]
+    assert await replica.get_range("01234") == source_range_provider.RANGE
+    assert await replica.get_range("01235") == RangeRequestCounter.RANGE
+
+    other_replica = BinaryPwnedStorage(
+        join_paths(temp_dir, "other-replica"),
+        replica_range_provider,
+        settings=settings,
+        dataset_source=dataset_source,
+    )
+    assert await other_replica.replicate() == UpdateResult.FAILED
+    with pytest.raises(ValueError):
+        source_storage.stream_dataset_file("01.dat", manifest.generation + 1)
+    await other_replica.close()
+    await replica.close()
+    await source_storage.close()
+
+
+@pytest.mark.asyncio
+async def test_archive(temp_dir: str):
+    settings = BinaryPwnedStorageSettings(StorageFileQuantity.N_256, NUMERIC_TYPE)
+    shard = PrefixShard(0, 64)
+    source_storage = BinaryPwnedStorage(
+        join_paths(temp_dir, "archive-source"),
+        RangeRequestCounter(),
+        settings=settings,
+        shard=shard,
+    )
+    archive_path = join_paths(temp_dir, "dataset.tar")
+    with open(archive_path, "wb") as archive:
+        assert not await source_storage.export_archive(archive)
+    assert await source_storage.update() == UpdateResult.DONE
+    with open(archive_path, "wb") as archive:
+        assert await source_storage.export_archive(archive)
+
+    imported_storage = BinaryPwnedStorage(
+        join_paths(temp_dir, "archive-import"),
+        RangeRequestCounter(),
+        settings=settings,
+        shard=shard,
+    )
+    with open(archive_path, "rb") as archive:
+        assert await imported_storage.import_archive(archive) == UpdateResult.DONE
+    assert imported_storage.replication_error_message is None
+    assert imported_storage.active_generation == source_storage.active_generation
+    assert (await imported_storage.get_manifest()).to_json() == (
+        await source_storage.get_manifest()
+    ).to_json()
+    assert await imported_storage.get_range("01234") == RangeRequestCounter.RANGE
+
+    other_storage = BinaryPwnedStorage(
+        join_paths(temp_dir, "archive-other-import"),
+        RangeRequestCounter(),
+        settings=settings,
+    )
+    with open(archive_path, "rb") as archive:
+        assert await other_storage.import_archive(archive) == UpdateResult.FAILED
+    assert other_storage.active_generation is None
+    assert other_storage.replication_error_message is not None
+
+    with open(archive_path, "rb") as archive:
+        truncated_archive = io.BytesIO(archive.read(get_file_size(archive_path) // 2))
+    assert (
+        await imported_storage.import_archive(truncated_archive) == UpdateResult.FAILED
+    )
+    assert await imported_storage.get_range("01234") == RangeRequestCounter.RANGE
+    await other_storage.close()
+    await imported_storage.close()
+    await source_storage.close()
+
+
+@pytest.mark.asyncio
+async def test_metrics(temp_dir: str):
+    range_provider = RangeRequestCounter()
+    storage = BinaryPwnedStorage(
+        join_paths(temp_dir, "metrics"),
+        range_provider,
+        settings=BinaryPwnedStorageSettings(StorageFileQuantity.N_256, NUMERIC_TYPE),
+        shard=PrefixShard(0, 64),
+    )
+    assert await storage.update() == UpdateResult.DONE
+    for _ in range(2):
+        assert await storage.get_range("01234") == RangeRequestCounter.RANGE
+    metrics = {metric.name: metric for metric in storage.metrics}
+
+    lookup_phase_seconds = metrics["pwned_storage_lookup_phase_seconds"]
+    for phase in ["validation", "queue", "search", "decode"]:
+        assert lookup_phase_seconds.get_value({"phase": phase}).count == 2
+    assert metrics["pwned_storage_in_flight_lookups"].get_value() == 0
+    assert metrics["pwned_storage_served_bytes_total"].get_value() == 2 * len(
+        RangeRequestCounter.RANGE
+    )
+    index_lookups = metrics["pwned_storage_range_index_lookups_total"]
+    assert index_lookups.get_value({"result": "miss"}) == 1
+    assert index_lookups.get_value({"result": "hit"}) == 1
+    assert metrics["pwned_storage_revision_ranges_total"].get_value() == len(
+        range_provider.prefix_request_counts
+    )
+    assert metrics["pwned_storage_revision_range_errors_total"].get_value() == 0
+    assert metrics["pwned_storage_written_bytes_total"].get_value() > 0
+    assert metrics["pwned_storage_active_generation"].get_value() == (
+        storage.active_generation
+    )
+    assert "pwned_storage_lookups_total 2\n" in "".join(
+        metric.to_prometheus() for metric in storage.metrics
+    )
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_revision_throughput(temp_dir: str):
+    range_provider = RangeRequestCounter()
+    storage = BinaryPwnedStorage(
+        join_paths(temp_dir, "throughput"),
+        range_provider,
+        settings=BinaryPwnedStorageSettings(StorageFileQuantity.N_256, NUMERIC_TYPE),
+        shard=PrefixShard(0, 64),
+    )
+    assert storage.revision.throughput is None
+    assert await storage.update() == UpdateResult.DONE
+    throughput = storage.revision.throughput
+    range_quantity = len(range_provider.prefix_request_counts)
+    assert throughput.prefix_rate > 0
+    assert throughput.record_rate > 0
+    assert throughput.eta_seconds is None
+    assert throughput.received_byte_quantity == range_quantity * (
+        len(RangeRequestCounter.RANGE) + 1
+    )
+    assert throughput.written_byte_quantity > 0
+    assert throughput.range_error_quantity == 0
+    assert 0 < len(throughput.slowest_chunks) <= 5
+    assert storage.revision.to_json()["throughput"] == throughput.to_json()
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_revision_history(temp_dir: str):
+    resource_dir = join_paths(temp_dir, "history")
+    storage = BinaryPwnedStorage(
+        resource_dir,
+        RangeRequestCounter(),
+        settings=BinaryPwnedStorageSettings(StorageFileQuantity.N_256, NUMERIC_TYPE),
+        shard=PrefixShard(0, 64),
+    )
+    assert await storage.get_revision_history() == []
+    assert await storage.update() == UpdateResult.DONE
+    with open(join_paths(resource_dir, storage.REVISION_HISTORY_FILE), "a") as file:
+        file.write("{\n")
+    await asyncio.sleep(1)
+    assert await storage.update() == UpdateResult.DONE
+
+    history = await storage.get_revision_history()
+    assert len(history) == 2
+    entry = history[-1]
+    assert entry.status == RevisionStatus.COMPLETED
+    assert entry.start_ts > history[0].start_ts
+    assert entry.end_ts >= entry.start_ts
+    assert set(entry.phase_seconds) == {"preparation", "transition", "retirement"}
+    assert entry.generation == storage.active_generation
+    assert entry.dataset_size > 0
+    assert entry.throughput.prefix_quantity == len(storage.shard.prefix_indices)
+    assert entry.throughput.range_error_quantity == 0
+    assert [entry.start_ts for entry in await storage.get_revision_history(1)] == [
+        entry.start_ts
+    ]
+    assert await storage.get_revision_history(0) == []
+
+    storage.request_update()
+    storage.request_update_pause()
+    while storage.revision.status != RevisionStatus.STOPPED:
+        await asyncio.sleep(0)
+    storage.request_update_cancellation()
+    while len(await storage.get_revision_history()) < 4:
+        await asyncio.sleep(0.1)
+    assert [entry.status for entry in await storage.get_revision_history(2)] == [
+        RevisionStatus.STOPPED,
+        RevisionStatus.CANCELLED,
+    ]
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_lookup_trace(temp_dir: str):
+    storage = BinaryPwnedStorage(
+        join_paths(temp_dir, "trace"),
+        RangeRequestCounter(),
+        settings=BinaryPwnedStorageSettings(StorageFileQuantity.N_256, NUMERIC_TYPE),
+        revision_settings=RevisionSettings(lookup_profile_rate=1),
+        shard=PrefixShard(0, 64),
+    )
+    assert await storage.update() == UpdateResult.DONE
+    trace = LookupTrace()
+    with trace.activate():
+        assert await storage.get_range("01234") == RangeRequestCounter.RANGE
+    assert LookupTrace.current() is None
+    assert set(trace.phase_seconds) == {
+        LookupPhase.VALIDATION,
+        LookupPhase.QUEUE,
+        LookupPhase.OPEN,
+        LookupPhase.SEARCH,
+        LookupPhase.DECODE,
+        LookupPhase.RESUME,
+    }
+    assert trace.counts["probes"] > 0
+    assert trace.counts["records"] == 1
+    assert 'records;desc="1"' in trace.to_server_timing()
+    await storage.close()
@@ -0,0 +1,51 @@
+import pytest
+
+from storage.auxiliary import hasher
+from storage.auxiliary.filetools import join_paths, write
+from storage.implementations.hash_file_reader import PwnedHashFileReader
+from storage.models.pwned import PWNED_PREFIX_LENGTH
+
+HASH_FILE_NAME = "pwned-hashes.txt"
+
+
+def create_hash_file(temp_dir: str) -> str:
+    hashes = sorted(hasher.sha1(str(index)) for index in range(2000))
+    hashes += ["F" * 35 + f"{index:05X}" for index in range(3)]
+    lines = [f"{pwned_hash}:{index + 1}" for index, pwned_hash in enumerate(hashes)]
+    path = join_paths(temp_dir, HASH_FILE_NAME)
+    write(path, "\r\n".join(lines), overwrite=True)
+    return path
+
+
+def get_expected_range(path: str, hash_prefix: str) -> str:
+    with open(path) as file:
+        return "\n".join(
+            line.strip()[PWNED_PREFIX_LENGTH:]
+            for line in file
+            if line.startswith(hash_prefix)
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("read_block_size", [64, 1000, 1024 * 1024])
+async def test_file_ranges(tmp_path, read_block_size: int):
+    path = create_hash_file(str(tmp_path))
+    reader = PwnedHashFileReader(path)
+    reader.READ_BLOCK_SIZE = read_block_size
+    prefixes = [hasher.sha1(str(index))[:5] for index in [0, 1, 999, 1999]]
+    for prefix in [*prefixes, "00000", "12345", "FFFFF"]:
+        expected_range = get_expected_range(path, prefix)
+        assert await reader.get_range(prefix) == expected_range
+        records = [record async for record in reader.stream_range(prefix)]
+        assert "\n".join(records) == expected_range
+    assert len((await reader.get_range("FFFFF")).split()) == 3
+    assert await reader.get_range("12345") == ""
+
+
+@pytest.mark.asyncio
+async def test_unsorted_file(tmp_path):
+    path = join_paths(str(tmp_path), HASH_FILE_NAME)
+    write(path, f"{'F' * 40}:1\n{'0' * 40}:1", overwrite=True)
+    reader = PwnedHashFileReader(path)
+    with pytest.raises(ValueError):
+        await reader.get_range("00000")
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from storage.auxiliary.implementations.io_governor import IOGovernor
+
+
+def make_fast_recovering(governor: IOGovernor) -> IOGovernor:
+    governor.BACKOFF_INTERVAL_SECONDS = 0.05
+    governor.RECOVERY_SECONDS = 0.2
+    return governor
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_writes():
+    governor = IOGovernor(write_byte_rate=100_000)
+
+    start_time = time.monotonic()
+    await governor.throttle()
+    assert time.monotonic() - start_time < 0.05
+    governor.count_written(50_000)
+    await governor.throttle()
+    assert time.monotonic() - start_time >= 0.45
+
+
+@pytest.mark.asyncio
+async def test_backoff_on_slow_lookups():
+    governor = make_fast_recovering(
+        IOGovernor(write_byte_rate=1_000_000, lookup_latency_target=0.01)
+    )
+
+    governor.observe_lookup(0.001)
+    assert governor.write_byte_rate == 1_000_000
+    governor.observe_lookup(0.1)
+    assert governor.write_byte_rate == 500_000
+    governor.observe_lookup(0.1)
+    assert governor.write_byte_rate == 500_000
+
+    await asyncio.sleep(0.3)
+    await governor.throttle()
+    assert governor.write_byte_rate == 1_000_000
+
+
+@pytest.mark.asyncio
+async def test_backoff_of_unlimited_writes():
+    governor = make_fast_recovering(IOGovernor(lookup_latency_target=0.01))
+
+    governor.observe_lookup(0.1)
+    assert governor.write_byte_rate == IOGovernor.MIN_WRITE_BYTE_RATE
+
+    await asyncio.sleep(0.3)
+    await governor.throttle()
+    assert governor.write_byte_rate is None
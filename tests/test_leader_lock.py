@@ -0,0 +1,49 @@
+import pytest
+
+from storage.auxiliary.filetools import join_paths, make_dir_if_not_exists
+from storage.auxiliary.implementations.command_channel import CommandChannel
+from storage.auxiliary.implementations.leader_lock import LeaderLock
+from tests.shared import temp_dir
+
+
+def test_leader_election(temp_dir: str):
+    lock_dir = join_paths(temp_dir, "leader-lock")
+    make_dir_if_not_exists(lock_dir)
+    lock_path = join_paths(lock_dir, "leader.lock")
+    leader_lock = LeaderLock(lock_path)
+    follower_lock = LeaderLock(lock_path)
+
+    assert leader_lock.try_acquire()
+    assert leader_lock.try_acquire()
+    assert not follower_lock.try_acquire()
+    assert not follower_lock.is_acquired
+
+    leader_lock.release()
+    assert follower_lock.try_acquire()
+    assert not leader_lock.try_acquire()
+    follower_lock.release()
+
+
+@pytest.mark.asyncio
+async def test_command_channel(temp_dir: str):
+    channel = CommandChannel(join_paths(temp_dir, "commands"))
+    assert channel.take_commands() == list()
+
+    first_command_id = channel.send("rollback", {"generation": 1}, is_awaited=True)
+    second_command_id = channel.send("pause")
+    assert channel.take_commands() == [
+        (first_command_id, "rollback", {"generation": 1}, True),
+        (second_command_id, "pause", dict(), False),
+    ]
+    assert channel.take_commands() == list()
+
+    unanswered_command_id = channel.send("update", is_awaited=True)
+    assert await channel.receive_result(unanswered_command_id, 0.2) is None
+    assert channel.take_commands() == list()
+
+    assert channel.get_acknowledgements() == list()
+    channel.acknowledge({"dataset": "a", "generation": 1})
+    channel.acknowledge({"dataset": "b", "generation": 2})
+    assert channel.get_acknowledgements() == [{"dataset": "b", "generation": 2}]
+    channel.withdraw_acknowledgement()
+    assert channel.get_acknowledgements() == list()
@@ -0,0 +1,74 @@
+import pstats
+
+from storage.auxiliary.filetools import join_paths, list_dir, read
+from storage.auxiliary.implementations.lookup_profiler import LookupProfiler
+from storage.auxiliary.models.histogram import Histogram
+from storage.models.lookup import LookupPhase, LookupTrace
+from storage.models.metrics import Metric, MetricType
+from tests.shared import temp_dir
+
+
+def test_histogram():
+    histogram = Histogram([0.1, 1])
+    for value in [0.05, 0.1, 0.5, 2]:
+        histogram.observe(value)
+    value = histogram.to_value()
+    assert value.bounds == [0.1, 1]
+    assert value.bucket_counts == [2, 1, 1]
+    assert value.count == 4
+    assert value.total == 2.65
+
+
+def test_prometheus_format():
+    counter = Metric.single("served_bytes_total", MetricType.COUNTER, "Bytes.", 42)
+    assert counter.to_prometheus() == (
+        "# HELP served_bytes_total Bytes.\n"
+        "# TYPE served_bytes_total counter\n"
+        "served_bytes_total 42\n"
+    )
+
+    histogram = Histogram([0.5])
+    histogram.observe(0.25)
+    histogram.observe(1)
+    metric = Metric(
+        "lookup_seconds",
+        MetricType.HISTOGRAM,
+        "Latency.",
+        [({"phase": 'a"b'}, histogram.to_value())],
+    )
+    assert metric.get_value({"phase": 'a"b'}).count == 2
+    assert metric.to_prometheus().splitlines()[2:] == [
+        'lookup_seconds_bucket{phase="a\\"b",le="0.5"} 1',
+        'lookup_seconds_bucket{phase="a\\"b",le="+Inf"} 2',
+        'lookup_seconds_sum{phase="a\\"b"} 1.25',
+        'lookup_seconds_count{phase="a\\"b"} 2',
+    ]
+
+
+def test_server_timing():
+    trace = LookupTrace()
+    trace.add_phase(LookupPhase.SEARCH, 0.001)
+    trace.add_phase(LookupPhase.SEARCH, 0.0005)
+    trace.add_count("probes", 3)
+    assert trace.to_server_timing(0.002) == (
+        'search;dur=1.5, total;dur=2.0, probes;desc="3"'
+    )
+
+
+def test_lookup_profiler(temp_dir: str):
+    dump_dir = join_paths(temp_dir, "profiles")
+    profiler = LookupProfiler(dump_dir, 1)
+    assert profiler.run(sorted, [2, 1]) == [1, 2]
+    profiler.dump()
+    profiler.dump()
+    names = sorted(list_dir(dump_dir))
+    profile_names = [
+        name for name in names if name.endswith(LookupProfiler.PROFILE_FILE_EXTENSION)
+    ]
+    stack_names = [
+        name for name in names if name.endswith(LookupProfiler.STACK_FILE_EXTENSION)
+    ]
+    assert len(profile_names) == 1
+    assert len(stack_names) == 2
+    assert pstats.Stats(join_paths(dump_dir, profile_names[0])).total_calls > 0
+    assert "test_lookup_profiler" in read(join_paths(dump_dir, stack_names[0]))
@@ -0,0 +1,35 @@
+import pytest
+
+from storage.auxiliary.models.prefix_bitmap import PrefixBitmap
+from storage.models.pwned import PWNED_PREFIX_CAPACITY
+
+
+def test_bitmap_content():
+    bitmap = PrefixBitmap()
+    for prefix_index in [0, 7, 8, 1000, PWNED_PREFIX_CAPACITY - 1]:
+        bitmap.add(prefix_index)
+        bitmap.add(prefix_index)
+    assert bitmap.count == 5
+    assert bitmap.contains(1000)
+    assert not bitmap.contains(999)
+    restored_bitmap = PrefixBitmap(bitmap.to_bytes())
+    assert restored_bitmap.count == 5
+    assert restored_bitmap.contains(PWNED_PREFIX_CAPACITY - 1)
+    with pytest.raises(ValueError):
+        PrefixBitmap(bytes(10))
+
+
+def test_bitmap_missing_ranges():
+    bitmap = PrefixBitmap()
+    assert bitmap.get_missing_ranges() == [(0, PWNED_PREFIX_CAPACITY)]
+    for prefix_index in [*range(3, 20), *range(64, 1000), 1001]:
+        bitmap.add(prefix_index)
+    assert bitmap.get_missing_ranges(0, 2000) == [
+        (0, 3),
+        (20, 64),
+        (1000, 1001),
+        (1002, 2000),
+    ]
+    assert bitmap.get_missing_ranges(10, 30) == [(20, 30)]
+    assert bitmap.find(10, 30, is_contained=False) == 20
+    assert bitmap.find(100, 200, is_contained=False) == 200
@@ -0,0 +1,24 @@
+import pytest
+
+from storage.auxiliary.models.prefix_popularity import PrefixPopularity
+
+
+def test_prefix_popularity():
+    popularity = PrefixPopularity()
+    for prefix_index in [7, 3, 7, 0xFFFFF, 7, 3]:
+        popularity.count(prefix_index)
+
+    assert popularity.get(7) == 3
+    assert popularity.get(5) == 0
+    assert popularity.get_total(0, 8) == 5
+    assert popularity.get_most_popular(2) == [7, 3]
+    assert popularity.get_most_popular(10) == [7, 3, 0xFFFFF]
+
+    restored_popularity = PrefixPopularity(popularity.to_bytes())
+    assert restored_popularity.get_most_popular(10) == [7, 3, 0xFFFFF]
+    restored_popularity.add(popularity)
+    assert restored_popularity.get(7) == 6
+    assert restored_popularity.get_most_popular(2) == [7, 3]
+
+    with pytest.raises(ValueError):
+        PrefixPopularity(bytes(16))
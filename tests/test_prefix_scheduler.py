@@ -0,0 +1,48 @@
+from storage.auxiliary.implementations.prefix_scheduler import PrefixScheduler
+from storage.auxiliary.models.prefix_chunk import PrefixChunk
+
+
+def test_chunk_split():
+    chunk = PrefixChunk(0, 100)
+    chunk.count_prepared_prefix()
+    detached_chunk = chunk.split()
+    assert chunk.end_prefix_index == detached_chunk.first_prefix_index == 51
+    assert detached_chunk.end_prefix_index == 100
+    aligned_chunk = chunk.split(16)
+    assert aligned_chunk.first_prefix_index == 16
+    assert chunk.end_prefix_index == 16
+    while chunk.unprepared_prefix_quantity > 1:
+        chunk.count_prepared_prefix()
+    assert chunk.split() is None
+    assert PrefixChunk(0, 20).split(16, is_alignment_strict=True) is None
+    assert (
+        PrefixChunk(0, 40).split(16, is_alignment_strict=True).first_prefix_index == 16
+    )
+
+
+def test_scheduler_work_stealing():
+    scheduler = PrefixScheduler([PrefixChunk(0, 8), PrefixChunk(8, 16)])
+    first_chunk = scheduler.take()
+    second_chunk = scheduler.take()
+    assert first_chunk.first_prefix_index == 0
+    assert second_chunk.first_prefix_index == 8
+    second_chunk.count_prepared_prefix()
+    stolen_chunk = scheduler.take()
+    assert stolen_chunk.first_prefix_index == 4
+    assert first_chunk.end_prefix_index == 4
+    while not stolen_chunk.is_prepared:
+        stolen_chunk.count_prepared_prefix()
+    scheduler.release(stolen_chunk)
+    scheduler.release(first_chunk)
+    assert scheduler.take() is first_chunk
+    assert scheduler.take().first_prefix_index == 13
+    assert second_chunk.end_prefix_index == 13
+
+
+def test_scheduler_exhaustion():
+    scheduler = PrefixScheduler([PrefixChunk(0, 2)])
+    chunk = scheduler.take()
+    assert scheduler.take().first_prefix_index == 1
+    assert scheduler.take() is None
+    scheduler.release(chunk)
+    assert scheduler.take() is chunk
@@ -0,0 +1,41 @@
+from storage.auxiliary.filetools import (
+    join_paths,
+    make_dir_if_not_exists,
+    replace_file,
+    write_atomically,
+)
+from storage.auxiliary.implementations.range_index import RangeIndex
+from tests.shared import temp_dir
+
+
+def test_range_index(temp_dir: str):
+    index_dir = join_paths(temp_dir, "range-index")
+    make_dir_if_not_exists(index_dir)
+    index_path = join_paths(index_dir, "ranges.index")
+    data_file_path = join_paths(index_dir, "data.dat")
+    write_atomically(data_file_path, b"data")
+    with open(data_file_path, "rb") as data_file:
+        file_identity = RangeIndex.identify(data_file)
+
+    first_index = RangeIndex(index_path)
+    second_index = RangeIndex(index_path)
+    assert first_index.get(0xABCDE, file_identity) is None
+
+    first_index.set(0xABCDE, file_identity, (12, 345))
+    assert first_index.get(0xABCDE, file_identity) == (12, 345)
+    assert second_index.get(0xABCDE, file_identity) == (12, 345)
+    assert second_index.get(0xABCDF, file_identity) is None
+
+    new_data_file_path = join_paths(index_dir, "data.tmp")
+    write_atomically(new_data_file_path, b"new data")
+    replace_file(data_file_path, new_data_file_path)
+    with open(data_file_path, "rb") as data_file:
+        new_file_identity = RangeIndex.identify(data_file)
+    assert new_file_identity != file_identity
+    assert second_index.get(0xABCDE, new_file_identity) is None
+
+    second_index.set(0xABCDE, new_file_identity, (6, 7))
+    assert first_index.get(0xABCDE, new_file_identity) == (6, 7)
+    assert first_index.get(0xABCDE, file_identity) is None
+    first_index.close()
+    second_index.close()
@@ -0,0 +1,58 @@
+import time
+
+from storage.auxiliary.models.revision_meter import RevisionMeter
+from storage.models.revision import Revision, RevisionStatus, RevisionThroughput
+
+
+def test_throughput():
+    meter = RevisionMeter()
+    time.sleep(0.01)
+    for _ in range(4):
+        meter.count_prepared_prefix()
+    meter.count_range(10, 410, 0.5, 0.25)
+    meter.count_range_error()
+    meter.count_written(100)
+    meter.observe_throttle(0.125)
+    for first_prefix_index in range(RevisionMeter.SLOWEST_CHUNK_QUANTITY + 1):
+        meter.observe_chunk(
+            first_prefix_index, first_prefix_index + 2, first_prefix_index
+        )
+
+    throughput = meter.to_dto(8)
+    assert throughput.prefix_rate > 0
+    assert throughput.record_rate > 0
+    assert throughput.eta_seconds >= 1
+    assert throughput.received_byte_quantity == 410
+    assert throughput.written_byte_quantity == 100
+    assert throughput.range_error_quantity == 1
+    assert throughput.network_seconds == 0.5
+    assert throughput.processing_seconds == 0.25
+    assert throughput.throttle_seconds == 0.125
+    assert [chunk.first_prefix for chunk in throughput.slowest_chunks] == [
+        "00005",
+        "00004",
+        "00003",
+        "00002",
+        "00001",
+    ]
+    assert throughput.slowest_chunks[0].prefix_quantity == 2
+
+    finished_throughput = meter.to_dto()
+    assert finished_throughput.eta_seconds is None
+    time.sleep(0.01)
+    assert meter.to_dto().prefix_rate == finished_throughput.prefix_rate
+
+
+def test_revision_json():
+    meter = RevisionMeter()
+    meter.count_range(10, 410, 0.5, 0.25)
+    meter.observe_chunk(0, 16, 1.5)
+    revision = Revision(RevisionStatus.COMPLETED, throughput=meter.to_dto())
+    imported_revision = Revision.from_json(revision.to_json())
+    assert imported_revision.to_json() == revision.to_json()
+    assert imported_revision.throughput.slowest_chunks[0].seconds == 1.5
+
+    json = revision.to_json()
+    json["throughput"]["slowest_chunks"] = [{"first_prefix": 0}]
+    assert Revision.from_json(json) is None
+    assert RevisionThroughput.from_json({}) is None
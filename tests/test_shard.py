@@ -0,0 +1,43 @@
+import pytest
+
+from storage.models.pwned import PWNED_PREFIX_CAPACITY
+from storage.models.shard import PrefixShard
+
+
+def test_prefix_shard():
+    whole_shard = PrefixShard()
+    assert whole_shard.is_whole
+    assert whole_shard.prefix_indices == range(PWNED_PREFIX_CAPACITY)
+    assert whole_shard.contains("00000") and whole_shard.contains("FFFFF0")
+
+    shards = [PrefixShard(index, 3) for index in range(3)]
+    assert shards[0].prefix_indices.start == 0
+    assert shards[1].prefix_indices.start == shards[0].prefix_indices.stop
+    assert shards[2].prefix_indices.start == shards[1].prefix_indices.stop
+    assert shards[2].prefix_indices.stop == PWNED_PREFIX_CAPACITY
+    for shard in shards:
+        for prefix_index in [shard.prefix_indices.start, shard.prefix_indices.stop - 1]:
+            prefix = hex(prefix_index)[2:].upper().rjust(5, "0")
+            assert shard.contains(prefix)
+            assert PrefixShard.locate(prefix, 3) == shard.index
+    assert not shards[0].contains("FFFFF")
+
+    with pytest.raises(ValueError):
+        PrefixShard(3, 3)
+    with pytest.raises(ValueError):
+        PrefixShard(0, 0)
+
+
+def test_shard_coverage():
+    assert PrefixShard().covers(PrefixShard(5, 7))
+    assert PrefixShard(0, 2).covers(PrefixShard(1, 4))
+    assert not PrefixShard(0, 2).covers(PrefixShard(1, 3))
+    assert not PrefixShard(1, 4).covers(PrefixShard(0, 2))
+
+    assert PrefixShard.from_json(None).is_whole
+    assert PrefixShard.from_json(PrefixShard(3, 8).to_json()).to_json() == {
+        "index": 3,
+        "quantity": 8,
+    }
+    assert PrefixShard.from_json({"index": 8, "quantity": 8}) is None
+    assert PrefixShard.from_json({"index": "1", "quantity": 8}) is None
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from storage.auxiliary.implementations.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_coalesced_calls():
+    single_flight = SingleFlight()
+    call_keys = list()
+
+    async def call(key: str) -> str:
+        call_keys.append(key)
+        await asyncio.sleep(0.01)
+        return key.upper()
+
+    results = await asyncio.gather(
+        *[single_flight.run(key, lambda key=key: call(key)) for key in "aaba"]
+    )
+    assert results == ["A", "A", "B", "A"]
+    assert call_keys == ["a", "b"]
+    assert single_flight.call_quantity == 4
+    assert single_flight.shared_call_quantity == 2
+
+    assert await single_flight.run("a", lambda: call("a")) == "A"
+    assert call_keys == ["a", "b", "a"]
+
+
+@pytest.mark.asyncio
+async def test_shared_failure():
+    single_flight = SingleFlight()
+
+    async def fail() -> None:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("Failure.")
+
+    results = await asyncio.gather(
+        single_flight.run("key", fail),
+        single_flight.run("key", fail),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
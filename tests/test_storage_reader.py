@@ -0,0 +1,62 @@
+import pytest
+
+from storage.auxiliary.filetools import join_paths
+from storage.implementations.binary_storage import BinaryPwnedStorage
+from storage.implementations.hash_file_reader import PwnedHashFileReader
+from storage.implementations.storage_reader import PwnedStorageReader
+from storage.implementations.text_storage import TextPwnedStorage
+from storage.models.abstract import PrefixNotOwnedError, UpdateResult
+from storage.models.pwned import PWNED_PREFIX_LENGTH
+from storage.models.settings import (
+    BinaryPwnedStorageSettings,
+    NumericType,
+    StorageFileQuantity,
+)
+from storage.models.shard import PrefixShard
+from tests.test_hash_file_reader import create_hash_file, get_expected_range
+
+
+@pytest.mark.asyncio
+async def test_storage_conversion(tmp_path):
+    hash_file_path = create_hash_file(str(tmp_path))
+    source_storage = BinaryPwnedStorage(
+        join_paths(str(tmp_path), "source"),
+        PwnedHashFileReader(hash_file_path),
+        settings=BinaryPwnedStorageSettings(
+            StorageFileQuantity.N_256, NumericType.SHORT
+        ),
+        shard=PrefixShard(0, 64),
+    )
+    reader = PwnedStorageReader(source_storage)
+    with pytest.raises(ValueError):
+        await reader.get_range("00000")
+    assert await source_storage.update() == UpdateResult.DONE
+    with pytest.raises(PrefixNotOwnedError):
+        await reader.get_range("FFFFF")
+
+    text_storage = TextPwnedStorage(
+        join_paths(str(tmp_path), "text"), reader, shard=PrefixShard(0, 128)
+    )
+    assert await text_storage.update() == UpdateResult.DONE
+    binary_storage = BinaryPwnedStorage(
+        join_paths(str(tmp_path), "binary"),
+        PwnedStorageReader(text_storage),
+        settings=BinaryPwnedStorageSettings(StorageFileQuantity.N_16, NumericType.BYTE),
+        shard=PrefixShard(1, 256),
+    )
+    assert await binary_storage.update() == UpdateResult.DONE
+
+    with open(hash_file_path) as file:
+        hash_prefixes = {line[:PWNED_PREFIX_LENGTH] for line in file}
+    text_prefixes = [prefix for prefix in hash_prefixes if prefix < "02000"]
+    binary_prefixes = [prefix for prefix in text_prefixes if prefix >= "01000"]
+    assert text_prefixes and binary_prefixes
+    for hash_prefix in text_prefixes + ["01234"]:
+        expected_range = get_expected_range(hash_file_path, hash_prefix)
+        assert await text_storage.get_range(hash_prefix) == expected_range
+    for hash_prefix in binary_prefixes:
+        expected_range = "\n".join(
+            f"{record.split(':')[0]}:{min(int(record.split(':')[1]), 255)}"
+            for record in get_expected_range(hash_file_path, hash_prefix).split()
+        )
+        assert await binary_storage.get_range(hash_prefix) == expected_range
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import pytest
+
+from storage.auxiliary.filetools import (
+    is_dir,
+    join_paths,
+    list_dir,
+    make_dir_if_not_exists,
+    write,
+)
+from storage.auxiliary.implementations.trash_reaper import TrashReaper
+
+FILE_QUANTITY = 50
+
+
+def create_dataset_dir(path: str) -> str:
+    make_dir_if_not_exists(path)
+    for index in range(FILE_QUANTITY):
+        write(join_paths(path, f"{index}.dat"), "0" * 100)
+    return path
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_purge(tmp_path):
+    trash_dir = join_paths(str(tmp_path), "trash")
+    dataset_dir = create_dataset_dir(join_paths(str(tmp_path), "dataset-a"))
+    reaper = TrashReaper(trash_dir, file_rate=200)
+
+    start_time = time.monotonic()
+    reaper.retire(dataset_dir)
+    assert not is_dir(dataset_dir)
+    assert reaper.is_running
+    await asyncio.sleep(0.1)
+    assert reaper.progress is not None and reaper.progress < 100
+    await reaper.wait()
+    assert time.monotonic() - start_time >= FILE_QUANTITY / 200 - 0.05
+    assert reaper.progress is None
+    assert list_dir(trash_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_byte_rate_limited_purge(tmp_path):
+    trash_dir = join_paths(str(tmp_path), "trash")
+    dataset_dir = create_dataset_dir(join_paths(str(tmp_path), "dataset-a"))
+    reaper = TrashReaper(trash_dir, byte_rate=FILE_QUANTITY * 100 * 4)
+
+    start_time = time.monotonic()
+    reaper.retire(dataset_dir)
+    await reaper.wait()
+    assert time.monotonic() - start_time >= 0.2
+    assert list_dir(trash_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_purge_resumption(tmp_path):
+    trash_dir = join_paths(str(tmp_path), "trash")
+    make_dir_if_not_exists(trash_dir)
+    create_dataset_dir(join_paths(trash_dir, "dataset-b.1"))
+    reaper = TrashReaper(trash_dir)
+
+    reaper.start()
+    assert reaper.is_running
+    await reaper.wait()
+    assert list_dir(trash_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_closing(tmp_path):
+    trash_dir = join_paths(str(tmp_path), "trash")
+    dataset_dir = create_dataset_dir(join_paths(str(tmp_path), "dataset-a"))
+    reaper = TrashReaper(trash_dir, file_rate=100)
+
+    reaper.retire(dataset_dir)
+    await asyncio.sleep(0.1)
+    await reaper.close()
+    assert not reaper.is_running
+    assert len(list_dir(trash_dir)) == 1
+
+    reaper = TrashReaper(trash_dir)
+    reaper.start()
+    await reaper.wait()
+    assert list_dir(trash_dir) == []